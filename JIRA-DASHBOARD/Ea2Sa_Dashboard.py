@@ -1,25 +1,33 @@
 import tkinter as tk
-from tkinter import messagebox, scrolledtext, simpledialog
-import threading
+from tkinter import ttk, messagebox, scrolledtext, simpledialog
 import datetime
-import json
 import os
-import requests
+import threading
+import time
 
 from jira_auth import (
-    get_valid_access_token,
-    get_projects,
-    get_issues,
-    get_jira_credentials,
+    get_access_token,
+    get_all_accessible_sites,
+    get_project_catalog,
+    search_projects,
+    get_credentials,
+    load_tokens,
+    invalidate_cache,
 )
+from issue_model import Issue
+from jira_bulk import bulk_create, bulk_transition, issue_fields, summarize
+from issue_store import IssueStore, sync_project
+from task_runner import TaskRunner, CancelToken
+from ui_queue import UIQueue
+from issue_table import VirtualIssueTable, ISSUE_COLUMNS, issue_row
+from last_session import load_last_session, save_last_session
+from prefetch import Prefetcher, PROJECT_JQL
+from metrics import get_metrics
 
-API_URL = "https://api.atlassian.com"
-TOKENS_FILE = "tokens.json"
 
-# ---------------------------
-# Load credentials once
-# ---------------------------
-CLIENT_ID, CLIENT_SECRET, REDIRECT_URI, SCOPES = get_jira_credentials()
+PROJECT_CATALOG_LIMIT = 5000  # projects loaded up front; beyond that the filter asks Jira
+PROJECT_LIST_LIMIT = 1000     # rows shown in the project list at once
+PROJECT_SEARCH_DELAY = 300    # ms of typing pause before a server-side project search
 
 
 # ---------------------------
@@ -27,24 +35,14 @@ CLIENT_ID, CLIENT_SECRET, REDIRECT_URI, SCOPES = get_jira_credentials()
 # ---------------------------
 def get_token_expiry():
     """Return expiry timestamp and datetime if available."""
-    if os.path.exists(TOKENS_FILE):
-        with open(TOKENS_FILE) as f:
-            tokens = json.load(f)
+    tokens = load_tokens()
+    if tokens:
         expires_at = tokens.get("expires_at")
         if expires_at:
             return expires_at, datetime.datetime.fromtimestamp(expires_at)
     return None, None
 
 
-def get_all_accessible_sites(access_token):
-    """Return all Jira sites the user can access."""
-    headers = {"Authorization": f"Bearer {access_token}", "Accept": "application/json"}
-    resp = requests.get(f"{API_URL}/oauth/token/accessible-resources", headers=headers)
-    if resp.status_code != 200:
-        raise Exception(f"Error getting accessible sites: {resp.status_code} {resp.text}")
-    return resp.json()
-
-
 # ---------------------------
 # Tkinter Dashboard class
 # ---------------------------
@@ -52,12 +50,26 @@ class JiraDashboard(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("Ea2Sa Jira Dashboard")
-        self.geometry("950x650")
+        self.geometry("950x800")
 
         # Context variables
         self.cloud_id = None
         self.sites = []
         self.projects = []
+        self.projects_complete = True  # False while loading, or if the catalog is over PROJECT_CATALOG_LIMIT
+        self.project_matches = None    # (query, projects) found by Jira for the filter text
+        self.project_load = 0          # generation of the latest load_projects()
+        self.visible_projects = []     # listbox rows
+        self._project_search_job = None
+        self.current_project = None
+        self.issue_listeners = []  # fn(site, project, issues, deleted) on the Tk thread, per synced page
+        self.token_expires_at = None
+        self._countdown_job = None
+        self.store = IssueStore()
+        # Background threads never touch widgets: results and updates go through self.ui
+        self.ui = UIQueue(self)
+        self.runner = TaskRunner(self, post=self.ui.post)
+        self.prefetcher = Prefetcher(self.store, get_access_token, usage=load_last_session().get("usage"))
 
         # ---- Menu Bar ----
         self.build_menu()
@@ -77,16 +89,49 @@ class JiraDashboard(tk.Tk):
         self.expiry_label.pack(pady=5)
 
         # ---- Project list ----
+        project_bar = tk.Frame(self)
+        project_bar.pack(fill="x", padx=90, pady=(10, 0))
+        tk.Label(project_bar, text="🔎 Projects:").pack(side="left")
+        self.project_filter_var = tk.StringVar()
+        self.project_filter_var.trace_add("write", lambda *_: self.filter_projects())
+        project_entry = tk.Entry(project_bar, textvariable=self.project_filter_var, width=40)
+        project_entry.pack(side="left", padx=5)
+        project_entry.bind("<Escape>", lambda e: self.project_filter_var.set(""))
+        self.project_status = tk.Label(project_bar, text="", fg="gray")
+        self.project_status.pack(side="left")
         self.project_listbox = tk.Listbox(self, width=80, height=10)
-        self.project_listbox.pack(pady=10)
+        self.project_listbox.pack(pady=(5, 10))
         self.project_listbox.bind("<<ListboxSelect>>", self.on_project_select)
 
+        # ---- Issue table ----
+        self.issue_frame = ttk.LabelFrame(self, text="Issues")
+        self.issue_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        filter_bar = tk.Frame(self.issue_frame)
+        filter_bar.pack(fill="x", padx=5, pady=(5, 0))
+        tk.Label(filter_bar, text="🔍 Filter:").pack(side="left")
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add("write", lambda *_: self.apply_filter())
+        filter_entry = tk.Entry(filter_bar, textvariable=self.filter_var, width=50)
+        filter_entry.pack(side="left", padx=5)
+        filter_entry.bind("<Escape>", lambda e: self.filter_var.set(""))
+        self.filter_status = tk.Label(filter_bar, text="", fg="gray")
+        self.filter_status.pack(side="left")
+        self.action_status = tk.Label(filter_bar, text="", fg="blue")
+        self.action_status.pack(side="right")
+        self._filter_status_job = None
+
+        # key, summary, status and assignee are searchable
+        self.issue_table = VirtualIssueTable(self.issue_frame, height=12, search_columns=(0, 1, 2, 3))
+        self.issue_table.pack(fill="both", expand=True, padx=5, pady=5)
+
         # ---- Output area ----
-        self.output = scrolledtext.ScrolledText(self, wrap=tk.WORD, width=110, height=20)
+        self.output = scrolledtext.ScrolledText(self, wrap=tk.WORD, width=110, height=6)
         self.output.pack(padx=10, pady=10)
 
-        # ---- Auto-check tokens ----
-        self.after(500, self.check_existing_tokens)
+        # ---- Last known site & projects first, then resolve everything in the background ----
+        self.show_last_session()
+        self.after_idle(self.startup)
+        self.follow_pushed_events()
 
     # ---------------------------
     # Menu setup
@@ -97,14 +142,24 @@ class JiraDashboard(tk.Tk):
         file_menu = tk.Menu(menubar, tearoff=0)
         file_menu.add_command(label="Authorize / Refresh", command=self.handle_authorization)
         file_menu.add_command(label="Select Site & List Projects", command=self.list_projects)
+        file_menu.add_command(label="Load All Sites & Projects", command=self.load_everything)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.quit)
         menubar.add_cascade(label="File", menu=file_menu)
 
         view_menu = tk.Menu(menubar, tearoff=0)
         view_menu.add_command(label="Clear Output", command=lambda: self.output.delete("1.0", tk.END))
+        view_menu.add_command(label="Forget Cached Sites & Projects", command=invalidate_cache)
+        view_menu.add_command(label="Analytics", command=self.show_analytics)
+        view_menu.add_command(label="Cycle Time", command=self.show_cycle_time)
+        view_menu.add_command(label="Diagnostics", command=self.show_diagnostics)
         menubar.add_cascade(label="View", menu=view_menu)
 
+        actions_menu = tk.Menu(menubar, tearoff=0)
+        actions_menu.add_command(label="Create Issues…", command=self.show_bulk_create)
+        actions_menu.add_command(label="Transition Selected Issues…", command=self.transition_selected)
+        menubar.add_cascade(label="Actions", menu=actions_menu)
+
         help_menu = tk.Menu(menubar, tearoff=0)
         help_menu.add_command(
             label="About Ea2Sa Jira Dashboard",
@@ -117,75 +172,143 @@ class JiraDashboard(tk.Tk):
         menubar.add_cascade(label="Help", menu=help_menu)
         self.config(menu=menubar)
 
+    # ---------------------------
+    # Startup
+    # ---------------------------
+    def show_last_session(self):
+        """Render the site and projects of the previous run (local file, no network)."""
+        session = load_last_session()
+        site = session.get("site")
+        if not site:
+            return
+        self.cloud_id = site["id"]
+        self.projects = session.get("projects", [])
+        self.display_projects(f"📋 {len(self.projects)} project(s) on {site['name']} (last session), refreshing…")
+
+    def startup(self):
+        """Resolve credentials, then token and site, off the Tk thread."""
+        def on_error(e):
+            # Missing credentials: ask on the Tk thread, over this window
+            try:
+                get_credentials(parent=self)
+            except Exception as err:
+                self.output.insert(tk.END, f"⚠️ {err}\n")
+                return
+            self.startup()
+
+        self.runner.submit(
+            lambda: get_credentials(prompt=False), key="credentials",
+            on_done=lambda _: (self.check_existing_tokens(), self.resolve_site()), on_error=on_error,
+        )
+
+    def resolve_site(self):
+        """Keep the last used site if still accessible (or the only one) and refresh its projects."""
+        def fetch_sites():
+            access_token = get_access_token()
+            return access_token, get_all_accessible_sites(access_token)
+
+        def on_done(result):
+            access_token, sites = result
+            self.sites = sites
+            site = next((s for s in sites if s["id"] == self.cloud_id), None)
+            if site is None and len(sites) == 1:
+                site = sites[0]
+            if site:
+                self.use_site(site, access_token)
+            elif sites:
+                self.output.insert(tk.END, "🌐 Choose a site with File > Select Site & List Projects\n")
+
+        self.runner.submit(
+            fetch_sites, key="sites", on_done=on_done,
+            on_error=lambda e: self.output.insert(tk.END, f"⚠️ Could not resolve site: {e}\n"),
+        )
+
     # ---------------------------
     # Token Management
     # ---------------------------
     def check_existing_tokens(self):
         """Try to refresh tokens automatically on startup."""
-        def check():
-            try:
-                access_token = get_valid_access_token(CLIENT_ID, CLIENT_SECRET)
-                if access_token:
-                    self.status_label.config(text="Authorized ✅", fg="green")
-                    expires_at, expiry_dt = get_token_expiry()
-                    if expiry_dt:
-                        self.expiry_label.config(text=f"Token expires at {expiry_dt}")
-                        self.update_countdown(expires_at)
-            except Exception as e:
-                self.output.insert(tk.END, f"⚠️ No valid tokens yet: {e}\n")
-        threading.Thread(target=check, daemon=True).start()
+        def on_done(access_token):
+            if access_token:
+                self.status_label.config(text="Authorized ✅", fg="green")
+                expires_at, expiry_dt = get_token_expiry()
+                if expiry_dt:
+                    self.expiry_label.config(text=f"Token expires at {expiry_dt}")
+                    self.update_countdown(expires_at)
+
+        def on_error(e):
+            self.output.insert(tk.END, f"⚠️ No valid tokens yet: {e}\n")
+
+        self.runner.submit(
+            get_access_token, key="token", on_done=on_done, on_error=on_error,
+        )
 
     def update_countdown(self, expires_at):
-        """Show a live countdown for token expiration."""
+        """Show a live countdown for token expiration (one timer, however often this is called)."""
         if not expires_at:
             return
-        now = datetime.datetime.now().timestamp()
-        remaining = int(expires_at - now)
+        self.token_expires_at = expires_at
+        if self._countdown_job is None:
+            self.tick_countdown()
+
+    def tick_countdown(self):
+        self._countdown_job = None
+        left = self.token_expires_at - datetime.datetime.now().timestamp()
+        remaining = int(left)
         if remaining > 0:
             mins, secs = divmod(remaining, 60)
             hours, mins = divmod(mins, 60)
             self.expiry_label.config(text=f"Token expires in {hours}h {mins}m {secs}s")
-            self.after(1000, lambda: self.update_countdown(expires_at))
+            # Wake up when the displayed second changes
+            self._countdown_job = self.after(int((left - remaining) * 1000) + 1, self.tick_countdown)
         else:
             self.expiry_label.config(text="⚠️ Token expired, attempting refresh...")
             self.auto_refresh()
 
     def auto_refresh(self):
         """Try to refresh automatically when expired."""
-        def do_refresh():
-            try:
-                access_token = get_valid_access_token(CLIENT_ID, CLIENT_SECRET)
-                if access_token:
-                    self.status_label.config(text="Authorized ✅ (auto-refresh)", fg="green")
-                    expires_at, expiry_dt = get_token_expiry()
-                    if expiry_dt:
-                        self.expiry_label.config(text=f"Token refreshed, new expiry: {expiry_dt}")
-                        self.update_countdown(expires_at)
-                else:
-                    self.status_label.config(text="Not Authorized ❌", fg="red")
-                    self.expiry_label.config(text="⚠️ Auto-refresh failed")
-            except Exception as e:
+        def on_done(access_token):
+            if access_token:
+                self.status_label.config(text="Authorized ✅ (auto-refresh)", fg="green")
+                expires_at, expiry_dt = get_token_expiry()
+                if expiry_dt:
+                    self.expiry_label.config(text=f"Token refreshed, new expiry: {expiry_dt}")
+                    self.update_countdown(expires_at)
+            else:
                 self.status_label.config(text="Not Authorized ❌", fg="red")
-                self.expiry_label.config(text=f"⚠️ Auto-refresh failed: {e}")
-        threading.Thread(target=do_refresh, daemon=True).start()
+                self.expiry_label.config(text="⚠️ Auto-refresh failed")
+
+        def on_error(e):
+            self.status_label.config(text="Not Authorized ❌", fg="red")
+            self.expiry_label.config(text=f"⚠️ Auto-refresh failed: {e}")
+
+        self.runner.submit(
+            get_access_token, key="token", on_done=on_done, on_error=on_error,
+        )
 
     def handle_authorization(self):
         """Manual reauthorization."""
-        def run_auth():
-            try:
-                access_token = get_valid_access_token(CLIENT_ID, CLIENT_SECRET)
-                if access_token:
-                    self.status_label.config(text="Authorized ✅", fg="green")
-                    messagebox.showinfo("Success", "You are authorized and tokens are refreshed!")
-                    expires_at, expiry_dt = get_token_expiry()
-                    if expiry_dt:
-                        self.expiry_label.config(text=f"Token expires at {expiry_dt}")
-                        self.update_countdown(expires_at)
-                else:
-                    messagebox.showerror("Error", "Failed to authorize Jira.")
-            except Exception as e:
-                messagebox.showerror("Error", f"Authorization failed: {e}")
-        threading.Thread(target=run_auth, daemon=True).start()
+        try:
+            get_credentials(parent=self)
+        except Exception as e:
+            messagebox.showerror("Error", f"Authorization failed: {e}")
+            return
+
+        def on_done(access_token):
+            if access_token:
+                self.status_label.config(text="Authorized ✅", fg="green")
+                messagebox.showinfo("Success", "You are authorized and tokens are refreshed!")
+                expires_at, expiry_dt = get_token_expiry()
+                if expiry_dt:
+                    self.expiry_label.config(text=f"Token expires at {expiry_dt}")
+                    self.update_countdown(expires_at)
+            else:
+                messagebox.showerror("Error", "Failed to authorize Jira.")
+
+        self.runner.submit(
+            get_access_token, key="token", on_done=on_done,
+            on_error=lambda e: messagebox.showerror("Error", f"Authorization failed: {e}"),
+        )
 
     # ---------------------------
     # Project listing with safe site selection
@@ -193,16 +316,20 @@ class JiraDashboard(tk.Tk):
     def list_projects(self):
         """Fetch accessible sites, then prompt site selection safely."""
         def fetch_sites():
-            try:
-                access_token = get_valid_access_token(CLIENT_ID, CLIENT_SECRET)
-                sites = get_all_accessible_sites(access_token)
-                if not sites:
-                    self.after(0, lambda: messagebox.showwarning("No Sites", "No accessible Jira sites found."))
-                    return
-                self.after(0, lambda: self.select_and_fetch_projects(access_token, sites))
-            except Exception as e:
-                self.after(0, lambda: messagebox.showerror("Error", f"Failed to fetch sites: {e}"))
-        threading.Thread(target=fetch_sites, daemon=True).start()
+            access_token = get_access_token()
+            return access_token, get_all_accessible_sites(access_token)
+
+        def on_done(result):
+            access_token, sites = result
+            if not sites:
+                messagebox.showwarning("No Sites", "No accessible Jira sites found.")
+                return
+            self.select_and_fetch_projects(access_token, sites)
+
+        self.runner.submit(
+            fetch_sites, key="sites", on_done=on_done,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to fetch sites: {e}"),
+        )
 
     def select_and_fetch_projects(self, access_token, sites):
         """Show site selection popup on main thread, then load projects."""
@@ -220,33 +347,116 @@ class JiraDashboard(tk.Tk):
                         idx = 0
                 except Exception:
                     idx = 0
-                self.cloud_id = sites[idx]["id"]
+                self.use_site(sites[idx], access_token)
             else:
-                self.cloud_id = sites[0]["id"]
-
-            threading.Thread(
-                target=lambda: self.load_projects(access_token),
-                daemon=True
-            ).start()
+                self.use_site(sites[0], access_token)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to select site: {e}")
 
+    def use_site(self, site, access_token):
+        """Switch to a site, remember it for the next startup and load its projects."""
+        self.cloud_id = site["id"]
+        save_last_session(site=site)
+        self.load_projects(access_token)
+
     def load_projects(self, access_token):
-        """Fetch and display projects after site selection."""
-        try:
-            projects = get_projects(access_token, self.cloud_id)
+        """Fetch projects page by page after site selection; each page is listed as it arrives."""
+        cloud_id = self.cloud_id
+        self.project_load += 1
+        generation = self.project_load
+        loaded = []
+
+        def on_page(page):  # worker thread
+            loaded.extend(page)
+            projects = list(loaded)
+
+            def show():
+                # A later load (another site, or a refresh of this one) owns the list now
+                if generation == self.project_load and not self.projects_complete:
+                    self.projects = projects
+                    self.render_project_list()
+
+            self.ui.post(show, key="project-pages")
+
+        def on_done(catalog):
+            if generation != self.project_load:
+                return
+            projects, self.projects_complete = catalog
             self.projects = projects
-            self.after(0, self.display_projects)
-        except Exception as e:
-            self.after(0, lambda: messagebox.showerror("Error", f"Failed to fetch projects: {e}"))
+            self.project_matches = None
+            self.display_projects()
+            save_last_session(projects=projects)
+
+        def on_error(e):
+            if generation != self.project_load:
+                return
+            self.projects_complete = True
+            self.render_project_list()
+            messagebox.showerror("Error", f"Failed to fetch projects: {e}")
+
+        self.projects_complete = False
+        self.runner.submit_latest(
+            "projects",
+            lambda token: get_project_catalog(access_token, cloud_id, PROJECT_CATALOG_LIMIT, on_page=on_page),
+            key=("projects", cloud_id), on_done=on_done, on_error=on_error,
+        )
 
-    def display_projects(self):
+    def display_projects(self, message=None):
         """Populate the listbox with projects."""
-        self.project_listbox.delete(0, tk.END)
-        for proj in self.projects:
-            self.project_listbox.insert(tk.END, f"{proj['key']} :: {proj['name']}")
+        self.render_project_list()
         self.output.delete("1.0", tk.END)
-        self.output.insert(tk.END, f"📋 Found {len(self.projects)} project(s) in selected site.\n")
+        self.output.insert(tk.END, (message or f"📋 Found {len(self.projects)} project(s) in selected site.") + "\n")
+
+    def render_project_list(self):
+        """
+        Show the projects whose key or name contains the filter text (at most
+        PROJECT_LIST_LIMIT rows), plus what a server-side search found for
+        projects not loaded yet.
+        """
+        query = self.project_filter_var.get().strip().lower()
+        if query:
+            matches = [p for p in self.projects if query in p["key"].lower() or query in p["name"].lower()]
+            if self.project_matches and self.project_matches[0] == query:
+                known = {p["key"] for p in matches}
+                matches += [p for p in self.project_matches[1] if p["key"] not in known]
+        else:
+            matches = self.projects
+        self.visible_projects = matches[:PROJECT_LIST_LIMIT]
+        self.project_listbox.delete(0, tk.END)
+        self.project_listbox.insert(tk.END, *(f"{p['key']} :: {p['name']}" for p in self.visible_projects))
+
+        text = f"{len(matches)} of {len(self.projects)}" if query else f"{len(self.projects)}"
+        text += " project(s)"
+        if len(matches) > len(self.visible_projects):
+            text += f", first {len(self.visible_projects)} shown"
+        if not self.projects_complete:
+            text += " (loading…)" if len(self.projects) < PROJECT_CATALOG_LIMIT else " (type to search all)"
+        self.project_status.config(text=text)
+
+    def filter_projects(self):
+        """Typeahead: filter the loaded projects now; ask Jira too while the catalog is incomplete."""
+        self.render_project_list()
+        if self._project_search_job:
+            self.after_cancel(self._project_search_job)
+            self._project_search_job = None
+        query = self.project_filter_var.get().strip().lower()
+        if query and not self.projects_complete and self.cloud_id:
+            self._project_search_job = self.after(PROJECT_SEARCH_DELAY, lambda: self.search_projects(query))
+
+    def search_projects(self, query):
+        self._project_search_job = None
+        cloud_id = self.cloud_id
+
+        def on_done(projects):
+            if cloud_id == self.cloud_id and query == self.project_filter_var.get().strip().lower():
+                self.project_matches = (query, projects)
+                self.render_project_list()
+
+        self.runner.submit_latest(
+            "project-search", lambda token: search_projects(get_access_token(), cloud_id, query),
+            key=("project-search", cloud_id, query), on_done=on_done,
+            on_error=lambda e: self.project_status.config(text=f"⚠️ Project search failed: {e}"),
+        )
 
     # ---------------------------
     # Project & issue handling
@@ -256,37 +466,510 @@ class JiraDashboard(tk.Tk):
         if not selection:
             return
         index = selection[0]
-        project_key = self.projects[index]["key"]
-        threading.Thread(target=lambda: self.fetch_issues(project_key), daemon=True).start()
+        project_key = self.visible_projects[index]["key"]
+        self.current_project = project_key
+        self.fetch_issues(project_key)
+
+        # Warm the neighbours and favourites while the user looks at this one
+        self.prefetcher.record_use(self.cloud_id, project_key)
+        self.prefetcher.schedule(self.cloud_id, [p["key"] for p in self.projects], project_key)
+        usage = dict(self.prefetcher.usage)
+        self.runner.submit(lambda: save_last_session(usage=usage), key="save-usage")
+
+    def fetch_issues(self, project_key, force_sync=False):
+        """
+        Show cached issues for the project at once (prefetched LRU, else the
+        store), then sync the delta from Jira unless it was synced moments ago
+        (or `force_sync`, e.g. right after we changed issues ourselves).
+        Only the latest selection renders; superseded fetches stop early.
+        """
+        cloud_id = self.cloud_id
+        cache_key = (cloud_id, project_key, PROJECT_JQL)
+
+        def run(token):
+            with self.prefetcher.user_request(cloud_id, project_key):
+                return load(token)
+
+        def load(token):
+            cached = self.prefetcher.cache.get(cache_key)
+            if cached is None:
+                cached = self.store.get_issues(cloud_id, project_key)
+            if not token.cancelled:
+                self.ui.post(lambda: token.cancelled or self.show_issues(project_key, cached))
+
+            # A prefetch of this project may be under way: let it finish rather than load twice
+            self.prefetcher.wait_for(cloud_id, project_key)
+            if not force_sync and self.prefetcher.is_fresh(cloud_id, project_key):
+                fresh = self.prefetcher.cache.get(cache_key)
+                if fresh is None:  # what we read from the store is current
+                    self.prefetcher.cache.put(cache_key, cached)
+                    return None
+                return None if fresh is cached else fresh
+
+            def on_batch(batch):
+                if token.cancelled:
+                    return
+                # First load: stream pages into the table as they arrive
+                if not cached:
+                    self.ui.post(lambda: token.cancelled or self.issue_table.append(batch))
+                self.ui.post(lambda: self.notify_issue_listeners(cloud_id, project_key, batch))
+
+            access_token = get_access_token()
+            delta = sync_project(
+                self.store, access_token, cloud_id, project_key, cancel_token=token, on_batch=on_batch
+            )
+            if delta is None:
+                return None
+            if delta["deleted"]:
+                self.ui.post(lambda: self.notify_issue_listeners(cloud_id, project_key, [], delta["deleted"]))
+            if cached and not delta["updated"] and not delta["deleted"]:
+                self.prefetcher.cache.put(cache_key, cached)
+                return None
+            issues = self.store.get_issues(cloud_id, project_key)
+            self.prefetcher.cache.put(cache_key, issues)
+            return issues
+
+        def on_done(issues):
+            if issues is not None:
+                self.show_issues(project_key, issues)
+
+        self.runner.submit_latest(
+            "issues", run, key=("issues", cloud_id, project_key), on_done=on_done,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to fetch issues: {e}"),
+        )
+
+    def show_issues(self, project_key, issues):
+        """Replace the table contents; only changed rows are redrawn."""
+        self.issue_frame.config(text=f"🐞 Issues in {project_key} ({len(issues)})")
+        self.issue_table.set_rows(issues)
+        if self.filter_var.get():
+            self.update_filter_status()
 
-    def fetch_issues(self, project_key):
-        """Fetch and display issues for the selected project."""
-        def run():
+    def notify_issue_listeners(self, site, project, issues, deleted=()):
+        for listener in list(self.issue_listeners):
             try:
-                access_token = get_valid_access_token(CLIENT_ID, CLIENT_SECRET)
-                issues = get_issues(access_token, self.cloud_id, project_key)
+                listener(site, project, issues, deleted)
+            except Exception as e:
+                print(f"⚠️ Issue listener failed: {e}")
+
+    def apply_filter(self):
+        """Narrow the issue table to rows matching the filter box (on every keystroke)."""
+        self.issue_table.set_filter(self.filter_var.get())
+        self.update_filter_status()
+
+    def update_filter_status(self):
+        table = self.issue_table
+        if self._filter_status_job:
+            self.after_cancel(self._filter_status_job)
+            self._filter_status_job = None
+        if not self.filter_var.get():
+            self.filter_status.config(text="")
+            return
+        text = f"{table.visible_count} of {len(table)} issue(s)"
+        if table.busy:
+            # Rows are still being loaded or indexed: keep the count current
+            text += " (indexing…)"
+            self._filter_status_job = self.after(200, self.update_filter_status)
+        self.filter_status.config(text=text)
 
-                text = f"🐞 Issues in {project_key}:\n\n"
-                if not issues:
-                    text += "No issues found.\n"
+    # ---------------------------
+    # Pushed updates (webhooks relayed by jira_oauth_flask)
+    # ---------------------------
+    def follow_pushed_events(self):
+        """Apply issue events streamed from JIRA_EVENTS_URL (the Flask app's /api/events), if set."""
+        url = os.getenv("JIRA_EVENTS_URL")
+        if url:
+            threading.Thread(target=self._follow_events, args=(url,), name="jira-events", daemon=True).start()
 
-                for issue in issues:
-                    key = issue.get("key", "<no key>")
-                    fields = issue.get("fields", {})
-                    summary = fields.get("summary", "(no summary)")
-                    status = fields.get("status", {}).get("name", "(no status)")
-                    text += f"- {key}: {summary} (Status: {status})\n"
+    def _follow_events(self, url):
+        from webhooks import iter_events
 
-                self.after(0, lambda: self.output_display(text))
+        last_id, delay = None, 1
+        while True:
+            try:
+                for last_id, event in iter_events(url, last_id):
+                    delay = 1
+                    self.apply_pushed_event(event)
             except Exception as e:
-                err_msg = str(e)
-                self.after(
-                    0,
-                    lambda msg=err_msg: messagebox.showerror(
-                        "Error", f"Failed to fetch issues: {msg}"
-                    ),
-                )
-        threading.Thread(target=run, daemon=True).start()
+                print(f"⚠️ Event stream {url}: {e}")
+            time.sleep(delay)  # reconnect, resuming after the last event seen
+            delay = min(delay * 2, 60)
+
+    def apply_pushed_event(self, event):
+        """Store a pushed change (worker thread), then refresh whatever shows that project."""
+        site, project, kind = event["site"], event["project"], event["event"]
+        issue = Issue.from_dict(event["issue"])
+        if kind == "deleted":
+            self.store.delete_issues(site, [issue.key])
+        elif not self.store.upsert_if_newer(site, project, [issue]):
+            return
+        self.prefetcher.cache.invalidate(site, project)
+        issues, deleted = ([], [issue.key]) if kind == "deleted" else ([issue], [])
+        self.ui.post(lambda: self.on_pushed_issues(site, project, kind, issues, deleted))
+
+    def on_pushed_issues(self, site, project, kind, issues, deleted):
+        self.notify_issue_listeners(site, project, issues, deleted)
+        if site != self.cloud_id or project != self.current_project:
+            return
+        if kind == "updated":
+            self.issue_table.append(issues)  # rows are matched by key: updated in place
+            return
+        # New or removed rows: re-read the project so the table keeps its order
+        self.runner.submit_latest(
+            "pushed-issues", lambda token: self.store.get_issues(site, project),
+            on_done=lambda rows: project == self.current_project and self.show_issues(project, rows),
+        )
+
+    # ---------------------------
+    # Bulk actions
+    # ---------------------------
+    def show_bulk_create(self):
+        """Dialog: one summary per line, created in the selected project in batches."""
+        project_key = self.current_project
+        if not project_key:
+            messagebox.showinfo("Create Issues", "Select a project first.")
+            return
+        window = tk.Toplevel(self)
+        window.title(f"Create Issues in {project_key}")
+        window.geometry("600x420")
+        tk.Label(window, text="One issue summary per line:").pack(anchor="w", padx=10, pady=(10, 0))
+        text = scrolledtext.ScrolledText(window, wrap=tk.NONE, height=15)
+        text.pack(fill="both", expand=True, padx=10, pady=5)
+        row = tk.Frame(window)
+        row.pack(fill="x", padx=10, pady=5)
+        tk.Label(row, text="Issue type:").pack(side="left")
+        issue_type = tk.Entry(row, width=20)
+        issue_type.insert(0, "Task")
+        issue_type.pack(side="left", padx=5)
+
+        def create():
+            summaries = [line.strip() for line in text.get("1.0", tk.END).splitlines() if line.strip()]
+            if not summaries:
+                return
+            kind = issue_type.get().strip() or "Task"
+            issues = [issue_fields(project_key, summary, kind) for summary in summaries]
+            window.destroy()
+            self.run_bulk(
+                f"Create in {project_key}", project_key, len(issues),
+                lambda token, cloud_id, on_result: bulk_create(token, cloud_id, issues, on_result=on_result),
+            )
+
+        tk.Button(row, text="Create", command=create).pack(side="right")
+
+    def transition_selected(self):
+        """Move the issues selected in the table to another status, several at a time."""
+        keys = self.issue_table.selected_keys()
+        if not keys:
+            messagebox.showinfo("Transition Issues", "Select issues in the table first (Shift / Ctrl-click).")
+            return
+        target = simpledialog.askstring(
+            "Transition Issues", f"Move {len(keys)} issue(s) to which status (or transition)?", parent=self
+        )
+        if not target or not target.strip():
+            return
+        # The status shown lets one transitions lookup serve every issue in that status
+        issues = [Issue(key, status=self.issue_table.get_row(key)[2]) for key in keys]
+        self.run_bulk(
+            f"Move to {target.strip()}", self.current_project, len(issues),
+            lambda token, cloud_id, on_result: bulk_transition(
+                token, cloud_id, issues, target.strip(), on_result=on_result),
+        )
+
+    def run_bulk(self, label, project_key, total, job):
+        """Run job(access_token, cloud_id, on_result) in the background with live progress, then re-sync."""
+        cloud_id = self.cloud_id
+        counts = {"ok": 0, "failed": 0, "unknown": 0}
+
+        def on_result(result):  # worker threads (jira_bulk serializes the calls)
+            counts["ok" if result["ok"] else "unknown" if result["unknown"] else "failed"] += 1
+            text = (f"✏️ {label}: {sum(counts.values())}/{total}, {counts['failed']} failed"
+                    f", {counts['unknown']} unknown")
+            self.ui.post(lambda: self.action_status.config(text=text), key="action-status")
+
+        def on_done(results):
+            summary = summarize(results)
+            self.action_status.config(text=f"✅ {label}: {summary['ok']} done, {summary['failed']} failed, "
+                                           f"{summary['unknown']} unknown ({summary['retried']} retried)")
+            for r in [r for r in results if not r["ok"]][:20]:
+                self.output.insert(tk.END, f"⚠️ {label} {r['key'] or '#' + str(r['index'] + 1)}: {r['error']}\n")
+            if project_key == self.current_project and cloud_id == self.cloud_id:
+                self.fetch_issues(project_key, force_sync=True)
+
+        self.action_status.config(text=f"✏️ {label}: 0/{total}")
+        self.runner.submit(
+            lambda: job(get_access_token(), cloud_id, on_result), on_done=on_done,
+            on_error=lambda e: self.action_status.config(text=f"❌ {label} failed: {e}"),
+        )
+
+    # ---------------------------
+    # Cross-site overview
+    # ---------------------------
+    def load_everything(self):
+        """Stream issues of every project on every site into one merged window."""
+        # aiohttp is slow to import; only pay for it when this view is used
+        from jira_async import get_bridge
+        from fanout import fan_out_issues
+
+        window = tk.Toplevel(self)
+        window.title("All Sites & Projects")
+        window.geometry("1100x600")
+        status = tk.Label(window, text="Loading all sites…", font=("Arial", 10), fg="blue")
+        status.pack(pady=5)
+        table = VirtualIssueTable(
+            window,
+            columns=[("Site", "Site", 140), ("Project", "Project", 90)] + ISSUE_COLUMNS,
+            row_fn=lambda issue: (issue.site, issue.project) + issue_row(issue),
+            key_fn=lambda issue: (issue.site, issue.key),
+            height=25,
+        )
+        table.pack(fill="both", expand=True, padx=10, pady=5)
+
+        cancel = CancelToken()
+        window.protocol("WM_DELETE_WINDOW", lambda: (cancel.cancel(), window.destroy()))
+
+        def on_batch(batch):
+            if not cancel.cancelled:
+                self.ui.post(lambda: cancel.cancelled or table.append(batch))
+                # Only the newest count matters: one label update per frame however many batches came
+                self.ui.post(lambda: cancel.cancelled or status.config(text=f"Loading… {len(table)} issue(s)"),
+                             key=(str(status), "text"))
+
+        async def run():
+            bridge = get_bridge()
+            client_id, client_secret, _, _ = get_credentials(prompt=False)
+            access_token = await bridge.get_client().get_valid_access_token(client_id, client_secret)
+            return await fan_out_issues(bridge.get_client(), access_token, on_batch, cancel_token=cancel)
+
+        def on_done(summary):
+            if cancel.cancelled:
+                return
+            text = (f"✅ {summary['issues']} issue(s) from {summary['projects']} project(s) "
+                    f"on {summary['sites']} site(s)")
+            if summary["errors"]:
+                text += f" — ⚠️ {len(summary['errors'])} failed"
+                for site, project, err in summary["errors"]:
+                    self.output.insert(tk.END, f"⚠️ {site} {project or ''}: {err}\n")
+            status.config(text=text)
+
+        get_bridge().submit_to_tk(
+            self, run(), on_done,
+            on_error=lambda e: cancel.cancelled or status.config(text=f"❌ Failed: {e}", fg="red"),
+            post=self.ui.post,
+        )
+
+    # ---------------------------
+    # Analytics
+    # ---------------------------
+    def show_analytics(self):
+        """
+        Status counts, workload, created histogram and open-issue age of the
+        selected project or of every stored project on the site. Loads from
+        the IssueStore in chunks, then follows synced pages as they arrive;
+        each change recomputes everything (at most every 100 ms).
+        """
+        try:
+            # NumPy is only needed (and imported) once this view is used
+            from issue_analytics import IssueColumns, format_summary
+        except ImportError as e:
+            messagebox.showerror("Analytics", f"The analytics view needs NumPy (pip install numpy): {e}")
+            return
+
+        window = tk.Toplevel(self)
+        window.title("Analytics")
+        window.geometry("800x700")
+
+        controls = tk.Frame(window)
+        controls.pack(fill="x", padx=10, pady=5)
+        scope = tk.StringVar(value="project" if self.current_project else "site")
+        bucket = tk.StringVar(value="month")
+        tk.Radiobutton(controls, text="Selected project", variable=scope, value="project",
+                       command=lambda: reload()).pack(side="left")
+        tk.Radiobutton(controls, text="All projects on this site", variable=scope, value="site",
+                       command=lambda: reload()).pack(side="left")
+        tk.Label(controls, text="Created per:").pack(side="left", padx=(15, 5))
+        bucket_box = ttk.Combobox(controls, textvariable=bucket, values=("day", "week", "month"),
+                                  state="readonly", width=7)
+        bucket_box.pack(side="left")
+        bucket_box.bind("<<ComboboxSelected>>", lambda e: schedule_render())
+        tk.Button(controls, text="Reload", command=lambda: reload()).pack(side="right")
+
+        status = tk.Label(window, text="", font=("Arial", 10), fg="blue", anchor="w")
+        status.pack(fill="x", padx=10)
+        report = scrolledtext.ScrolledText(window, wrap=tk.NONE, font=("Courier", 10))
+        report.pack(fill="both", expand=True, padx=10, pady=5)
+
+        columns = IssueColumns()
+        in_scope = set()  # (site, project) shown
+        render_job = None
+        channel = f"analytics-{id(window)}"
+
+        def render():
+            nonlocal render_job
+            render_job = None
+            if not window.winfo_exists():
+                return
+            started = time.perf_counter()
+            summary = columns.summary(bucket=bucket.get())
+            elapsed = (time.perf_counter() - started) * 1000
+            report.delete("1.0", tk.END)
+            report.insert(tk.END, format_summary(summary))
+            names = ", ".join(sorted(p for _, p in in_scope)) or "no project"
+            status.config(text=f"{names[:80]} · computed in {elapsed:.1f} ms")
+
+        def schedule_render():
+            nonlocal render_job
+            if render_job is None and window.winfo_exists():
+                render_job = window.after(100, render)
+
+        def on_issues(site, project, issues, deleted):
+            if (site, project) not in in_scope or not window.winfo_exists():
+                return
+            columns.add(issues, site=site, project=project)
+            columns.discard(site, deleted)
+            schedule_render()
+
+        def reload():
+            site = self.cloud_id
+            if scope.get() == "project" and self.current_project:
+                keys = [self.current_project]
+            else:
+                keys = [p["key"] for p in self.projects]
+            columns.clear()
+            in_scope.clear()
+            in_scope.update((site, key) for key in keys)
+            status.config(text=f"Loading {len(keys)} project(s) from the local store…", fg="blue")
+            schedule_render()
+
+            def load(token):
+                # One project at a time, handed over in chunks so the view fills in progressively
+                for key in keys:
+                    if token.cancelled:
+                        return
+                    issues = self.store.get_issues(site, key)
+                    for i in range(0, len(issues), 5000):
+                        chunk = issues[i:i + 5000]
+                        self.ui.post(lambda c=chunk, k=key: token.cancelled or on_issues(site, k, c, ()))
+
+            self.runner.submit_latest(
+                channel, load, key=(channel, site, tuple(keys)),
+                on_error=lambda e: window.winfo_exists() and status.config(text=f"❌ Failed: {e}", fg="red"),
+            )
+
+        def close():
+            self.issue_listeners.remove(on_issues)
+            self.runner.submit_latest(channel, lambda token: None)  # stops a load still running
+            window.destroy()
+
+        self.issue_listeners.append(on_issues)
+        window.protocol("WM_DELETE_WINDOW", close)
+        reload()
+
+    # ---------------------------
+    # Cycle time
+    # ---------------------------
+    def show_cycle_time(self):
+        """
+        Lead time, cycle time and time in status of the selected project, from
+        changelogs fetched in bulk. The report is recomputed on the worker
+        after every batch and shown as it grows.
+        """
+        from cycle_time import CycleTimeReport, iter_issue_flows, format_report
+
+        project_key = self.current_project
+        if not project_key:
+            messagebox.showinfo("Cycle Time", "Select a project first.")
+            return
+        window = tk.Toplevel(self)
+        window.title(f"Cycle Time — {project_key}")
+        window.geometry("800x500")
+        status = tk.Label(window, text="Loading changelogs…", font=("Arial", 10), fg="blue", anchor="w")
+        status.pack(fill="x", padx=10, pady=5)
+        text = scrolledtext.ScrolledText(window, wrap=tk.NONE, font=("Courier", 10))
+        text.pack(fill="both", expand=True, padx=10, pady=5)
+        channel = f"cycle-time-{id(window)}"
+        cloud_id = self.cloud_id
+
+        def show(report_text, label):
+            if window.winfo_exists():
+                text.delete("1.0", tk.END)
+                text.insert(tk.END, report_text)
+                status.config(text=label)
+
+        def load(token):
+            report = CycleTimeReport()
+            jql = f"project = {project_key} ORDER BY created ASC"
+            for flows in iter_issue_flows(get_access_token(), cloud_id, jql):
+                if token.cancelled:
+                    return
+                report.add(flows)
+                report_text = format_report(report.summary())
+                self.ui.post(lambda t=report_text, n=report.issues: token.cancelled or show(t, f"Loading… {n} issue(s)"),
+                             key=channel)
+            return report.issues
+
+        self.runner.submit_latest(
+            channel, load,
+            on_done=lambda n: window.winfo_exists() and status.config(text=f"✅ {n} issue(s) of {project_key}"),
+            on_error=lambda e: window.winfo_exists() and status.config(text=f"❌ Failed: {e}", fg="red"),
+        )
+
+        def close():
+            self.runner.submit_latest(channel, lambda token: None)  # stops a load still running
+            window.destroy()
+
+        window.protocol("WM_DELETE_WINDOW", close)
+
+    # ---------------------------
+    # Diagnostics
+    # ---------------------------
+    def show_diagnostics(self):
+        """Per-endpoint latency, error and cache statistics, refreshed every 2 s."""
+        window = tk.Toplevel(self)
+        window.title("Diagnostics")
+        window.geometry("1000x420")
+
+        columns = [
+            ("endpoint", "Endpoint", 380), ("calls", "Calls", 60), ("errors", "Errors", 60),
+            ("retries", "Retries", 60), ("p50_ms", "p50 ms", 70), ("p95_ms", "p95 ms", 70),
+            ("max_ms", "Max ms", 70), ("total_s", "Total s", 70), ("avg_kb", "Avg KB", 70),
+        ]
+        tree = ttk.Treeview(window, columns=[c[0] for c in columns], show="headings", height=12)
+        for col, heading, width in columns:
+            tree.heading(col, text=heading)
+            tree.column(col, width=width, anchor="w" if col == "endpoint" else "e")
+        tree.pack(fill="both", expand=True, padx=10, pady=5)
+
+        summary = tk.Label(window, text="", font=("Arial", 10), fg="blue", justify="left")
+        summary.pack(pady=5, anchor="w", padx=10)
+
+        def refresh():
+            if not window.winfo_exists():
+                return
+            metrics = get_metrics()
+            tree.delete(*tree.get_children())
+            for row in metrics.endpoint_summary():
+                tree.insert("", tk.END, values=(
+                    row["endpoint"], row["calls"], row["errors"], row["retries"],
+                    f"{row['p50_ms']:.0f}", f"{row['p95_ms']:.0f}", f"{row['max_ms']:.0f}",
+                    f"{row['total_s']:.2f}", f"{row['avg_kb']:.1f}",
+                ))
+            cache = ", ".join(
+                f"{kind} {c['hits']}/{c['hits'] + c['misses']} hit" for kind, c in sorted(metrics.cache_summary().items())
+            )
+            refreshes = {dict(labels).get("result"): v for (name, labels), v in metrics.counters().items()
+                         if name == "jira_token_refresh_total"}
+            summary.config(text=(
+                f"Cache: {cache or 'no lookups'}\n"
+                f"Token refreshes: {refreshes.get('ok', 0)} ok, {refreshes.get('failed', 0)} failed"
+            ))
+            window.after(2000, refresh)
+
+        buttons = tk.Frame(window)
+        buttons.pack(pady=5)
+        tk.Button(buttons, text="Reset", command=lambda: (get_metrics().reset(), tree.delete(*tree.get_children()))).pack(
+            side="left", padx=5)
+        tk.Button(buttons, text="Close", command=window.destroy).pack(side="left", padx=5)
+        refresh()
 
     def output_display(self, text):
         """Thread-safe text update."""
@@ -300,3 +983,4 @@ class JiraDashboard(tk.Tk):
 if __name__ == "__main__":
     app = JiraDashboard()
     app.mainloop()
+    app.prefetcher.shutdown()
@@ -0,0 +1,323 @@
+"""
+Offline benchmarks for the Jira client paths, run against fake_atlassian.
+
+    python bench_jira.py                                  # default scale
+    python bench_jira.py --issues 20000 --latency 0.05 --json > run.json
+    python bench_jira.py --baseline run.json --tolerance 0.25   # exit 1 on regression
+
+Scenarios: token refresh, project listing, full-project issue load (one per
+prefetch strategy), multi-project fan-out (thread pool vs asyncio), bulk triage (create then
+transition --bulk-issues issues), cycle-time report of a project from bulk changelogs,
+per-keystroke filtering of --filter-issues loaded issues (budget ~16 ms) and
+analytics recomputed after each page of --analytics-issues issues.
+Each reports latency percentiles and throughput.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import jira_auth
+from fake_atlassian import FakeAtlassianServer, FakeJiraData
+from issue_index import IssueIndex
+from issue_model import Issue
+from cycle_time import CycleTimeReport, iter_issue_flows
+from jira_bulk import bulk_create, bulk_transition, issue_fields, summarize
+from issue_store import SYNC_PROJECTION
+from issue_table import issue_row
+from jira_client import JiraClient, set_client
+from rate_governor import get_governor
+
+
+# ---------------------------
+# Measurement helpers
+# ---------------------------
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(name, fn, repeat, units_per_call=1, unit="req"):
+    """Call fn() `repeat` times; return latency percentiles (ms) and throughput."""
+    samples = []
+    units = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - t0)
+        units += units_per_call(result) if callable(units_per_call) else units_per_call
+    elapsed = time.perf_counter() - started
+    return {
+        "name": name,
+        "calls": repeat,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p90_ms": percentile(samples, 90) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples) * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "throughput": units / elapsed if elapsed else 0.0,
+        "unit": f"{unit}/s",
+    }
+
+
+# ---------------------------
+# Scenarios
+# ---------------------------
+def bench_token_refresh(args):
+    return measure(
+        "token refresh",
+        lambda: jira_auth.refresh_access_token("bench", "bench", "fake-refresh"),
+        args.repeat,
+    )
+
+
+def bench_project_listing(args, cloudid):
+    return measure(
+        "project listing (uncached)",
+        lambda: jira_auth.get_projects("bench-token", cloudid, use_cache=False),
+        args.repeat,
+    )
+
+
+def bench_project_load(args, cloudid, project_key, prefetch):
+    return measure(
+        f"full project load (prefetch={prefetch})",
+        lambda: sum(1 for _ in jira_auth.iter_issues("bench-token", cloudid, project_key, prefetch=prefetch)),
+        max(1, args.repeat // 4),
+        units_per_call=lambda n: n,
+        unit="issues",
+    )
+
+
+def bench_fanout_threads(args, sites):
+    def run():
+        jobs = [(s["id"], p["key"]) for s in sites for p in jira_auth.get_projects("bench-token", s["id"])]
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            return sum(pool.map(
+                lambda job: sum(1 for _ in jira_auth.iter_issues("bench-token", job[0], job[1])), jobs
+            ))
+
+    return measure("multi-project fan-out (threads)", run, 1, units_per_call=lambda n: n, unit="issues")
+
+
+def bench_fanout_async(args, server):
+    try:
+        from jira_async import AsyncJiraClient, get_bridge
+        from fanout import fan_out_issues
+    except ImportError as e:
+        print(f"⚠️ Skipping async fan-out: {e}", file=sys.stderr)
+        return None
+
+    bridge = get_bridge()
+    client = AsyncJiraClient(api_url=server.url, max_concurrency=args.concurrency)
+
+    def run():
+        count = [0]
+        bridge.run(fan_out_issues(
+            client, "bench-token", lambda batch: count.__setitem__(0, count[0] + len(batch)),
+            limit=args.concurrency,
+        ))
+        return count[0]
+
+    try:
+        return measure("multi-project fan-out (asyncio)", run, 1, units_per_call=lambda n: n, unit="issues")
+    finally:
+        bridge.run(client.close())
+
+
+def bench_cycle_time(args, cloudid, project_key):
+    """Changelogs of a whole project in bulkfetch batches, folded into the running report."""
+    def run():
+        report = CycleTimeReport()
+        for flows in iter_issue_flows("bench-token", cloudid, f"project = {project_key} ORDER BY created ASC"):
+            report.add(flows)
+        report.summary()
+        return report.issues
+
+    return measure(f"cycle time ({args.issues} issues)", run, max(1, args.repeat // 5),
+                   units_per_call=lambda n: n, unit="issues")
+
+
+def bench_bulk(args, cloudid, project_key):
+    """Create --bulk-issues issues in batches, then move them all to another status."""
+    def create():
+        results = bulk_create("bench-token", cloudid,
+                              [issue_fields(project_key, f"Bench issue {i}") for i in range(args.bulk_issues)])
+        created[:] = [r["key"] for r in results if r["ok"]]
+        summary = summarize(results)
+        failed.append(summary["failed"] + summary["unknown"])
+        return len(results)
+
+    def transition():
+        results = bulk_transition("bench-token", cloudid, [Issue(k, status="To Do") for k in created], "In Progress")
+        summary = summarize(results)
+        failed.append(summary["failed"] + summary["unknown"])
+        return len(results)
+
+    created, failed = [], []
+    results = [
+        measure(f"bulk create {args.bulk_issues} issues", create, 1, units_per_call=lambda n: n, unit="issues"),
+        measure(f"bulk transition {args.bulk_issues} issues", transition, 1, units_per_call=lambda n: n,
+                unit="issues"),
+    ]
+    if any(failed):
+        print(f"⚠️ Bulk triage: {sum(failed)} item(s) failed or ended with an unknown outcome")
+    return results
+
+
+def bench_filter(args):
+    """Keystroke-by-keystroke filtering over an index of --filter-issues issues."""
+    data = FakeJiraData(1, 1, args.filter_issues)
+    keys = []
+    index = IssueIndex()
+    for raw in data.issues("P0X0"):
+        row = issue_row(SYNC_PROJECTION(raw))
+        index.add(len(keys), row[:4])
+        keys.append(row[0])
+    index.optimize()
+
+    typed = ["synthetic 12", "in prog", "user 1", "p0x0-4", "done"]
+    queries = [q[:n] for q in typed for n in range(1, len(q) + 1)]
+    queue = iter(queries * args.repeat)
+
+    def keystroke():
+        docs = index.search(next(queue))
+        return [keys[i] for i in sorted(docs)] if docs is not None else keys
+
+    return measure(f"filter {len(keys)} issues per keystroke", keystroke, len(queries) * args.repeat,
+                   unit="keystrokes")
+
+
+def bench_analytics(args):
+    """One sync page added to --analytics-issues issues, then every breakdown recomputed."""
+    try:
+        from issue_analytics import IssueColumns
+    except ImportError as e:
+        print(f"⚠️ Skipping analytics benchmark: {e}")
+        return None
+    projects = 4
+    data = FakeJiraData(1, projects, args.analytics_issues // projects)
+    columns = IssueColumns()
+    pages = []
+    for p in range(projects):
+        issues = [SYNC_PROJECTION(raw) for raw in data.issues(f"P0X{p}")]
+        pages += [(f"P0X{p}", issues[i:i + 200]) for i in range(0, len(issues), 200)]
+    queue = iter(pages)
+
+    def page():
+        project, issues = next(queue)
+        columns.add(issues, site="bench", project=project)
+        return columns.summary()
+
+    # Time the pages arriving once most of the data is already loaded
+    for _ in range(len(pages) - args.repeat * 5):
+        project, issues = next(queue)
+        columns.add(issues, site="bench", project=project)
+    return measure(f"analytics {args.analytics_issues} issues per page", page, args.repeat * 5, unit="pages")
+
+
+# ---------------------------
+# Reporting
+# ---------------------------
+def print_report(results):
+    header = f"{'scenario':<38}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'throughput':>18}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['name']:<38}{r['p50_ms']:>10.1f}{r['p90_ms']:>10.1f}{r['p99_ms']:>10.1f}"
+              f"{r['max_ms']:>10.1f}{r['throughput']:>12.1f} {r['unit']}")
+
+
+def compare(results, baseline_path, tolerance):
+    """Return the scenarios whose p50 got slower than baseline by more than `tolerance`."""
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        base = baseline.get(r["name"])
+        if base and r["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            regressions.append((r["name"], base["p50_ms"], r["p50_ms"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Jira client paths against a local fake API.")
+    parser.add_argument("--sites", type=int, default=2)
+    parser.add_argument("--projects", type=int, default=5, help="projects per site")
+    parser.add_argument("--issues", type=int, default=2000, help="issues per project")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds of server latency per request")
+    parser.add_argument("--max-page", type=int, default=100)
+    parser.add_argument("--rate-limit", type=int, help="server requests per second before 429")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--bulk-issues", type=int, default=300, help="issues created and transitioned")
+    parser.add_argument("--write-error-rate", type=float, default=0.0, help="share of writes failing with 503")
+    parser.add_argument("--filter-issues", type=int, default=50000, help="issues loaded for the filter scenario")
+    parser.add_argument("--analytics-issues", type=int, default=200000,
+                        help="issues loaded for the analytics scenario")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown vs baseline")
+    args = parser.parse_args(argv)
+
+    server = FakeAtlassianServer(
+        data=FakeJiraData(args.sites, args.projects, args.issues),
+        latency=args.latency, max_page=args.max_page, rate_limit=args.rate_limit,
+        write_error_rate=args.write_error_rate,
+    ).start()
+    set_client(JiraClient(api_url=server.url, token_url=f"{server.url}/oauth/token", pool_size=args.concurrency))
+
+    # Token refresh writes tokens.json in the working directory: keep the real one safe
+    workdir = tempfile.mkdtemp(prefix="jira-bench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    # jira_auth prints progress messages: keep stdout for the report / --json
+    stdout, sys.stdout = sys.stdout, sys.stderr
+    try:
+        sites = jira_auth.get_all_accessible_sites("bench-token", use_cache=False)
+        cloudid = sites[0]["id"]
+        project_key = jira_auth.get_projects("bench-token", cloudid, use_cache=False)[0]["key"]
+
+        results = [bench_token_refresh(args), bench_project_listing(args, cloudid)]
+        for prefetch in (1, 2, 4):
+            results.append(bench_project_load(args, cloudid, project_key, prefetch))
+        results.append(bench_fanout_threads(args, sites))
+        async_result = bench_fanout_async(args, server)
+        if async_result:
+            results.append(async_result)
+        results.append(bench_cycle_time(args, cloudid, project_key))
+        results += bench_bulk(args, cloudid, project_key)
+        results.append(bench_filter(args))
+        analytics_result = bench_analytics(args)
+        if analytics_result:
+            results.append(analytics_result)
+    finally:
+        sys.stdout = stdout
+        os.chdir(cwd)
+        server.shutdown()
+
+    if args.json:
+        print(json.dumps({"args": vars(args), "results": results}, indent=2))
+    else:
+        print_report(results)
+        print(f"\n{server.requests} request(s) served, {server.throttled} throttled")
+        print(f"rate governor: {get_governor().state()}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for name, before, after in regressions:
+            print(f"❌ Regression in {name}: p50 {before:.1f} ms -> {after:.1f} ms", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
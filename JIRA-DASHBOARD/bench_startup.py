@@ -0,0 +1,154 @@
+"""
+Startup budget check: import cost, import side effects and dashboard
+time-to-first-paint, against a deliberately slow fake Atlassian API.
+
+    python bench_startup.py
+    python bench_startup.py --latency 3 --paint-budget 0.8 --import-budget 0.3
+
+Each measurement runs in a fresh interpreter in a scratch directory. Importing
+a module must not touch the network, create files or (outside the UI modules)
+load tkinter. The dashboard must paint, with the last session's projects,
+within --paint-budget seconds although every API call takes --latency
+seconds. Exits 1 if a budget or rule is broken. The paint check is skipped
+when no display is available.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from fake_atlassian import FakeAtlassianServer, FakeJiraData
+from last_session import save_last_session
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# module -> may it import tkinter?
+IMPORT_CHECKS = {
+    "jira_auth": False,
+    "issue_store": False,
+    "export_issues": False,
+    "jira_oauth_flask": False,
+    "Ea2Sa_Dashboard": True,
+}
+
+IMPORT_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - t0, "tkinter": "tkinter" in sys.modules}}))
+"""
+
+PAINT_PROBE = """
+import json, time
+t0 = time.perf_counter()
+import tkinter as tk
+try:
+    import Ea2Sa_Dashboard
+    app = Ea2Sa_Dashboard.JiraDashboard()
+except tk.TclError as e:
+    print(json.dumps({"skipped": str(e)}))
+    raise SystemExit(0)
+app.update()  # map + first expose
+first_paint = time.perf_counter() - t0
+painted_projects = app.project_listbox.size()
+deadline = time.perf_counter() + 60
+
+def poll():
+    if (app.cloud_id and "Found" in app.output.get("1.0", "end")) or time.perf_counter() > deadline:
+        print(json.dumps({
+            "first_paint": first_paint, "painted_projects": painted_projects,
+            "ready": time.perf_counter() - t0, "projects": app.project_listbox.size(),
+        }))
+        app.runner.shutdown()
+        app.destroy()
+        return
+    app.after(20, poll)
+
+app.after(20, poll)
+app.mainloop()
+"""
+
+
+def run_probe(code, workdir, env):
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=workdir, env=env, capture_output=True, text=True, timeout=120
+    )
+    if out.returncode != 0:
+        raise Exception(f"probe failed:\n{out.stderr.strip()}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def make_workdir(server):
+    """Scratch directory with valid tokens and a last session pointing at the fake site."""
+    workdir = tempfile.mkdtemp(prefix="jira-startup-")
+    with open(os.path.join(workdir, "tokens.json"), "w") as f:
+        json.dump({"access_token": "bench-token", "refresh_token": "bench-refresh",
+                   "expires_at": int(time.time()) + 3600}, f)
+    site = server.data.sites[0]
+    save_last_session(site=site, projects=server.data.projects[site["id"]],
+                      path=os.path.join(workdir, "last_session.json"))
+    return workdir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check startup import cost and time-to-first-paint budgets.")
+    parser.add_argument("--latency", type=float, default=2.0, help="seconds the fake API takes per request")
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--paint-budget", type=float, default=1.0, help="seconds until the first paint")
+    parser.add_argument("--import-budget", type=float, default=0.5, help="seconds per module import")
+    args = parser.parse_args(argv)
+
+    server = FakeAtlassianServer(data=FakeJiraData(1, args.projects, 10), latency=args.latency).start()
+    env = dict(
+        os.environ, PYTHONPATH=HERE + os.pathsep + os.environ.get("PYTHONPATH", ""),
+        JIRA_API_URL=server.url, JIRA_TOKEN_URL=f"{server.url}/oauth/token",
+        CLIENT_ID="bench", CLIENT_SECRET="bench",
+    )
+    failures = []
+
+    try:
+        print(f"{'import':<24}{'seconds':>10}  notes")
+        for module, tk_allowed in IMPORT_CHECKS.items():
+            workdir = tempfile.mkdtemp(prefix="jira-import-")
+            before = server.requests
+            try:
+                result = run_probe(IMPORT_PROBE.format(module=module), workdir, env)
+            except Exception as e:
+                print(f"{module:<24}{'-':>10}  ⚠️ skipped: {str(e).splitlines()[-1]}")
+                continue
+            notes = []
+            if result["seconds"] > args.import_budget:
+                notes.append(f"over {args.import_budget}s budget")
+            if result["tkinter"] and not tk_allowed:
+                notes.append("imports tkinter")
+            if server.requests != before:
+                notes.append(f"{server.requests - before} request(s) at import")
+            if os.listdir(workdir):
+                notes.append(f"created {', '.join(sorted(os.listdir(workdir)))}")
+            failures += [f"{module}: {n}" for n in notes]
+            print(f"{module:<24}{result['seconds']:>10.3f}  {'❌ ' + '; '.join(notes) if notes else '✅'}")
+
+        print()
+        result = run_probe(PAINT_PROBE, make_workdir(server), env)
+        if "skipped" in result:
+            print(f"⚠️ Time-to-first-paint skipped (no display): {result['skipped']}")
+        else:
+            print(f"🖼️ First paint {result['first_paint']:.3f}s with {result['painted_projects']} cached project(s); "
+                  f"fresh projects after {result['ready']:.3f}s (API latency {args.latency}s)")
+            if result["first_paint"] > args.paint_budget:
+                failures.append(f"first paint {result['first_paint']:.3f}s over {args.paint_budget}s budget")
+            if not result["painted_projects"]:
+                failures.append("last session projects were not shown at first paint")
+    finally:
+        server.shutdown()
+
+    for failure in failures:
+        print(f"❌ {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+"""
+Lead time, cycle time and time in status from issue changelogs, without
+one changelog request per issue.
+
+    python cycle_time.py --project ABC
+    python cycle_time.py --project ABC --project XYZ -o flow.csv
+    python cycle_time.py --jql "project = ABC AND created >= -90d" --json
+
+Issues are paged through the search API; every BULKFETCH_ISSUES of them
+get their status changes from POST /rest/api/3/changelog/bulkfetch while
+the next batch is being requested, and are folded into a running
+CycleTimeReport, which keeps fixed-size histograms rather than one value
+per issue, so memory stays bounded whatever the project size (percentiles
+are exact to within DAY_BUCKET_RATIO). Every request goes through the
+shared rate governor. -o writes exact per-issue rows (CSV or NDJSON by
+extension); the summary goes to stdout.
+
+Cycle time runs from the first move out of a to-do status to the final
+move into a done status, lead time from creation to that move. Time in
+status counts finished stays only.
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from issue_model import TODO_STATUSES, DONE_STATUSES, parse_time
+from jira_auth import get_jira_credentials, get_valid_access_token, iter_search
+from jira_client import get_client
+
+BULKFETCH_ISSUES = 1000  # issue ids per bulkfetch request (Jira's cap)
+BULKFETCH_PAGE = 1000    # change histories per bulkfetch page
+FLOW_PERCENTILES = (50, 85, 95)
+DAY = 86400
+DAY_BUCKET_MIN = 1 / 1440  # one minute; shorter durations share the first bucket
+DAY_BUCKET_RATIO = 1.02    # each bucket 2% wider than the last: ~780 buckets up to ten years
+CSV_COLUMNS = ["source", "key", "status", "created", "started", "done", "lead_days", "cycle_days", "in_status"]
+
+
+def format_time(ts):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)) if ts is not None else None
+
+
+# ---------------------------
+# Bulk changelog fetch
+# ---------------------------
+def fetch_status_changes(access_token, cloudid, issue_ids, page_size=BULKFETCH_PAGE):
+    """
+    {issue id: [(epoch seconds, from status, to status)], oldest first} for up
+    to BULKFETCH_ISSUES issue ids, following nextPageToken (the histories of
+    one issue may continue on the next page).
+    """
+    client = get_client()
+    url = client.site_url(cloudid, "/rest/api/3/changelog/bulkfetch")
+    body = {"issueIdsOrKeys": list(issue_ids), "fieldIds": ["status"], "maxResults": page_size}
+    changes = defaultdict(list)
+    while True:
+        # Only reads, so safe to retry like a search
+        resp = client.post(url, access_token=access_token, json=body, idempotent=True)
+        if resp.status_code != 200:
+            raise Exception(f"Error fetching changelogs: {resp.status_code} {resp.text}")
+        data = resp.json()
+        for log in data.get("issueChangeLogs", []):
+            transitions = changes[str(log.get("issueId"))]
+            for history in log.get("changeHistories", []):
+                at = parse_time(history.get("created"))
+                if at is None:
+                    continue
+                for item in history.get("items", []):
+                    if (item.get("fieldId") or item.get("field")) == "status":
+                        transitions.append((at, item.get("fromString"), item.get("toString")))
+        token = data.get("nextPageToken")
+        if not token:
+            break
+        body["nextPageToken"] = token
+    for transitions in changes.values():
+        transitions.sort(key=lambda t: t[0])
+    return changes
+
+
+def iter_issue_flows(access_token, cloudid, jql, batch_size=BULKFETCH_ISSUES, prefetch=1):
+    """
+    Yield the issues matching `jql` in batches, each a list of flow dicts:
+    {"key", "status", "created", "transitions"}. The changelogs of the next
+    `prefetch` batches are fetched while the caller handles the current one.
+    """
+    issues = iter_search(access_token, cloudid, jql, projection=None, raw_fields=["created", "status"])
+    executor = ThreadPoolExecutor(max_workers=max(1, prefetch), thread_name_prefix="jira-changelog")
+    pending = deque()  # (raw issues, future of their changes)
+    try:
+        while True:
+            batch = list(islice(issues, batch_size))
+            if batch:
+                ids = [raw["id"] for raw in batch]
+                pending.append((batch, executor.submit(fetch_status_changes, access_token, cloudid, ids)))
+            while pending and (len(pending) > prefetch or not batch):
+                raw_issues, future = pending.popleft()
+                changes = future.result()
+                yield [issue_flow(raw, changes.get(str(raw["id"]), [])) for raw in raw_issues]
+            if not batch:
+                return
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+        issues.close()
+
+
+def issue_flow(raw, transitions):
+    fields = raw.get("fields") or {}
+    return {
+        "key": raw["key"],
+        "status": (fields.get("status") or {}).get("name"),
+        "created": parse_time(fields.get("created")),
+        "transitions": transitions,
+    }
+
+
+# ---------------------------
+# Flow metrics
+# ---------------------------
+def flow_metrics(flow):
+    """
+    Figures of one issue: "started" / "done" (epoch seconds or None),
+    "lead_days" / "cycle_days" (None unless it is done) and "in_status"
+    {status: days over its finished stays}.
+    """
+    transitions = flow["transitions"]
+    created = flow["created"]
+    current = (transitions[0][1] if transitions else flow["status"]) or "(no status)"
+    since = created
+    started = created if created is not None and current.lower() not in TODO_STATUSES else None
+    done = None
+    in_status = defaultdict(float)
+    for at, _, to_status in transitions:
+        to_status = to_status or "(no status)"
+        if since is not None and at >= since:
+            in_status[current] += (at - since) / DAY
+        if started is None and current.lower() in TODO_STATUSES and to_status.lower() not in TODO_STATUSES:
+            started = at
+        current, since = to_status, at
+    if current.lower() in DONE_STATUSES and transitions:
+        done = since
+    return {
+        "started": started,
+        "done": done,
+        "lead_days": (done - created) / DAY if done is not None and created is not None else None,
+        "cycle_days": (done - started) / DAY if done is not None and started is not None else None,
+        "in_status": dict(in_status),
+    }
+
+
+class DayHistogram:
+    """
+    Durations in days counted in log-spaced buckets (DAY_BUCKET_RATIO apart),
+    so memory is bounded by the range of values, not their number. The
+    count and mean are exact; percentile() is the nearest-rank value to
+    within one bucket, clamped to the smallest and largest value seen.
+    """
+
+    def __init__(self):
+        self.buckets = defaultdict(int)  # bucket number -> count
+        self.count = 0
+        self.total = 0.0
+        self.low = math.inf
+        self.high = -math.inf
+
+    def add(self, days):
+        bucket = 0 if days <= DAY_BUCKET_MIN else 1 + int(math.log(days / DAY_BUCKET_MIN, DAY_BUCKET_RATIO))
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total += days
+        self.low = min(self.low, days)
+        self.high = max(self.high, days)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, pct):
+        """Value at rank ceil(pct% of count), from the bucket's geometric middle; None if empty."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(pct / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                break
+        value = DAY_BUCKET_MIN * DAY_BUCKET_RATIO ** (bucket - 0.5) if bucket else DAY_BUCKET_MIN
+        return min(self.high, max(self.low, value))
+
+
+class CycleTimeReport:
+    """
+    Running figures over issue flows, one DayHistogram per series. add() a
+    batch at a time; summary() walks the buckets only, so it stays cheap to
+    call after every batch.
+    """
+
+    def __init__(self):
+        self.issues = 0
+        self.lead = DayHistogram()
+        self.cycle = DayHistogram()
+        self.in_status = defaultdict(DayHistogram)  # status -> days of the issues that stayed there
+
+    def add(self, flows):
+        """Fold in a batch of flows; returns their flow_metrics, in order."""
+        metrics = [flow_metrics(flow) for flow in flows]
+        for m in metrics:
+            self.issues += 1
+            if m["lead_days"] is not None:
+                self.lead.add(m["lead_days"])
+            if m["cycle_days"] is not None:
+                self.cycle.add(m["cycle_days"])
+            for status, days in m["in_status"].items():
+                self.in_status[status].add(days)
+        return metrics
+
+    def summary(self, percentiles=FLOW_PERCENTILES):
+        lead, cycle = self.lead, self.cycle
+        statuses = [
+            (status, days.count, days.mean, {p: days.percentile(p) for p in percentiles})
+            for status, days in self.in_status.items()
+        ]
+        statuses.sort(key=lambda s: -s[1] * s[2])  # most total time first
+        return {
+            "issues": self.issues,
+            "done": lead.count,
+            "lead_days": {p: lead.percentile(p) for p in percentiles} if lead.count else {},
+            "cycle_days": {p: cycle.percentile(p) for p in percentiles} if cycle.count else {},
+            "cycle_issues": cycle.count,
+            "statuses": statuses,
+        }
+
+
+def format_report(summary):
+    """
+    Lead and cycle time percentiles, then one row per status (most total
+    time first), from CycleTimeReport.summary(): the CLI's output and the
+    body of the dashboard's Cycle Time window.
+    """
+    def days(values):
+        return "   ".join(f"p{p}: {v:.1f}" for p, v in values.items()) if values else "n/a"
+
+    lines = [
+        f"⏱️ {summary['issues']} issue(s), {summary['done']} done",
+        "",
+        f"Lead time (days, created → done):   {days(summary['lead_days'])}",
+        f"Cycle time (days, started → done):  {days(summary['cycle_days'])}  ({summary['cycle_issues']} issues)",
+        "",
+        "Time in status (days, finished stays)",
+        f"  {'status':<22}{'issues':>8}{'mean':>8}" + "".join(f"{'p' + str(p):>8}" for p in FLOW_PERCENTILES),
+    ]
+    for status, count, mean, pcts in summary["statuses"]:
+        lines.append(f"  {status[:22]:<22}{count:>8}{mean:>8.1f}" + "".join(f"{v:>8.1f}" for v in pcts.values()))
+    return "\n".join(lines)
+
+
+# ---------------------------
+# Headless report
+# ---------------------------
+def report(args):
+    from export_issues import resolve_site
+
+    client_id, client_secret, _, _ = get_jira_credentials(prompt=False)
+    cloudid = resolve_site(get_valid_access_token(client_id, client_secret), args.site)
+    queries = [(key, f"project = {key} ORDER BY created ASC") for key in args.project]
+    queries += [(jql, jql) for jql in args.jql]
+
+    out = writer = None
+    if args.output:
+        out = open(args.output, "w", newline="", encoding="utf-8")
+        if args.output.lower().endswith(".csv"):
+            writer = csv.DictWriter(out, fieldnames=CSV_COLUMNS)
+            writer.writeheader()
+
+    result = CycleTimeReport()
+    try:
+        for source, jql in queries:
+            print(f"📥 {source}", file=sys.stderr)
+            access_token = get_valid_access_token(client_id, client_secret)
+            for flows in iter_issue_flows(access_token, cloudid, jql, batch_size=args.batch_size):
+                for flow, m in zip(flows, result.add(flows)):
+                    if out is None:
+                        continue
+                    row = {
+                        "source": source, "key": flow["key"], "status": flow["status"],
+                        "created": format_time(flow["created"]), "started": format_time(m["started"]),
+                        "done": format_time(m["done"]), "lead_days": m["lead_days"], "cycle_days": m["cycle_days"],
+                    }
+                    in_status = {s: round(d, 3) for s, d in m["in_status"].items()}
+                    if writer:
+                        writer.writerow(dict(row, in_status="; ".join(f"{s}={d}" for s, d in in_status.items())))
+                    else:
+                        out.write(json.dumps(dict(row, in_status=in_status), separators=(",", ":")) + "\n")
+                print(f"… {result.issues} issue(s)", file=sys.stderr)
+    finally:
+        if out is not None:
+            out.close()
+
+    summary = result.summary()
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(format_report(summary))
+    if args.output:
+        print(f"💾 Wrote {result.issues} issue(s) to {args.output}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lead time, cycle time and time in status from Jira changelogs.")
+    parser.add_argument("--project", action="append", default=[], help="project key (repeatable)")
+    parser.add_argument("--jql", action="append", default=[], help="JQL query (repeatable)")
+    parser.add_argument("--site", help="cloud id, name or URL of the Jira site (default: first accessible)")
+    parser.add_argument("-o", "--output", help="per-issue rows, CSV or NDJSON by extension")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    parser.add_argument("--batch-size", type=int, default=BULKFETCH_ISSUES, help="issues per changelog request")
+    args = parser.parse_args(argv)
+
+    if not args.project and not args.jql:
+        parser.error("give at least one --project or --jql")
+    try:
+        report(args)
+    except Exception as e:
+        print(f"❌ Report failed: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Headless bulk export of Jira issues to NDJSON or CSV.
+
+    python export_issues.py --project ABC --project XYZ -o issues.ndjson
+    python export_issues.py --jql "assignee = currentUser()" --format csv -o mine.csv
+
+Issues are paged through the search API and written as they arrive, so
+memory stays flat whatever the size of the export. After every page the
+output is flushed and a checkpoint (<output>.checkpoint.json) records the
+byte offset and position of each query; re-running the same command resumes
+from there. The checkpoint is removed once every query has finished.
+Resuming needs a stable order: --jql without ORDER BY is sorted by key, and
+a query sorted on a field that changes (such as updated) cannot resume.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+
+from jira_auth import get_jira_credentials, get_valid_access_token, get_all_accessible_sites, iter_search
+from token_manager import atomic_write_json
+from issue_model import IssueProjection
+
+EXPORT_PROJECTION = IssueProjection(("summary", "status", "assignee", "created", "updated"))
+CSV_COLUMNS = ["source", "key"] + EXPORT_PROJECTION.request_fields
+ORDER_BY = re.compile(r"\border\s+by\b(.*)$", re.IGNORECASE | re.DOTALL)
+STABLE_SORT_FIELDS = {"key", "issuekey", "id", "created"}  # values that never change
+
+
+def resolve_site(access_token, site):
+    """Return the cloud id for --site (id, name or URL), or the first site."""
+    sites = get_all_accessible_sites(access_token)
+    if not sites:
+        raise Exception("No accessible Jira resources found")
+    if site:
+        for s in sites:
+            if site in (s["id"], s["name"], s["url"]):
+                return s["id"]
+        raise Exception(f"Site {site!r} is not accessible with these tokens")
+    if len(sites) > 1:
+        print(f"⚠️ {len(sites)} sites accessible, exporting from {sites[0]['name']} (use --site)", file=sys.stderr)
+    return sites[0]["id"]
+
+
+def resumable_jql(jql):
+    """
+    (JQL, resumable) for a --jql query. Resuming skips by position, so the
+    order must not change between runs: a query without ORDER BY gets
+    ORDER BY key ASC; one sorted on a field that changes (updated, rank...)
+    runs as given but cannot resume.
+    """
+    m = ORDER_BY.search(jql)
+    if m is None:
+        return f"{jql} ORDER BY key ASC", True
+    fields = [part.split()[0].strip('"').lower() for part in m.group(1).split(",") if part.split()]
+    return jql, bool(fields) and all(f in STABLE_SORT_FIELDS for f in fields)
+
+
+def build_queries(args):
+    """(source label, JQL, resumable) triples. Project exports use a stable order so they can resume."""
+    queries = [(key, f"project = {key} ORDER BY created ASC, key ASC", True) for key in args.project]
+    queries += [(jql,) + resumable_jql(jql) for jql in args.jql]
+    return queries
+
+
+def load_checkpoint(path):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {"offset": 0, "queries": {}}
+
+
+def export(args):
+    client_id, client_secret, _, _ = get_jira_credentials(prompt=False)
+    access_token = get_valid_access_token(client_id, client_secret)
+    cloudid = resolve_site(access_token, args.site)
+
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint.json"
+    checkpoint = load_checkpoint(checkpoint_path) if os.path.exists(args.output) else {"offset": 0, "queries": {}}
+
+    out = open(args.output, "r+" if checkpoint["offset"] else "w", newline="", encoding="utf-8")
+    # Drop anything written after the last checkpoint (an interrupted page)
+    out.seek(checkpoint["offset"])
+    out.truncate()
+
+    writer = None
+    if args.format == "csv":
+        writer = csv.DictWriter(out, fieldnames=CSV_COLUMNS)
+        if checkpoint["offset"] == 0:
+            writer.writeheader()
+
+    def save_checkpoint():
+        out.flush()
+        os.fsync(out.fileno())
+        checkpoint["offset"] = out.tell()
+        atomic_write_json(checkpoint_path, checkpoint)
+
+    total = 0
+    try:
+        for source, jql, resumable in build_queries(args):
+            state = checkpoint["queries"].setdefault(jql, {"written": 0, "done": False})
+            if state["done"]:
+                continue
+            if state["written"] and not resumable:
+                raise Exception(f"Cannot resume {source!r}: its ORDER BY uses a field that changes, so rows could "
+                                f"be skipped or repeated. Sort by key or created, or delete {checkpoint_path} "
+                                "to start over")
+            print(f"📤 {source}: resuming at {state['written']}" if state["written"] else f"📤 {source}",
+                  file=sys.stderr)
+
+            in_page = 0
+            access_token = get_valid_access_token(client_id, client_secret)
+            for issue in iter_search(
+                access_token, cloudid, jql, projection=EXPORT_PROJECTION,
+                page_size=args.page_size, start_at=state["written"],
+            ):
+                row = dict(source=source, key=issue.key)
+                row.update((f, getattr(issue, f)) for f in EXPORT_PROJECTION.fields)
+                if writer:
+                    writer.writerow(row)
+                else:
+                    out.write(json.dumps(row, separators=(",", ":")) + "\n")
+                state["written"] += 1
+                in_page += 1
+                total += 1
+                if in_page >= args.page_size:
+                    save_checkpoint()
+                    in_page = 0
+
+            state["done"] = True
+            save_checkpoint()
+            print(f"✅ {source}: {state['written']} issue(s)", file=sys.stderr)
+    finally:
+        out.close()
+
+    os.remove(checkpoint_path)
+    print(f"💾 Exported {total} issue(s) to {args.output}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export Jira issues to NDJSON or CSV without the GUI.")
+    parser.add_argument("--project", action="append", default=[], help="project key (repeatable)")
+    parser.add_argument("--jql", action="append", default=[], help="JQL query (repeatable)")
+    parser.add_argument("--site", help="cloud id, name or URL of the Jira site (default: first accessible)")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="default: from the output extension")
+    parser.add_argument("-o", "--output", required=True, help="output file")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.checkpoint.json)")
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    if not args.project and not args.jql:
+        parser.error("give at least one --project or --jql")
+    if not args.format:
+        args.format = "csv" if args.output.lower().endswith(".csv") else "ndjson"
+
+    try:
+        export(args)
+    except Exception as e:
+        print(f"❌ Export failed: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
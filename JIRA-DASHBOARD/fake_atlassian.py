@@ -0,0 +1,424 @@
+"""
+Local stand-in for the Atlassian endpoints used by jira_auth, for offline
+benchmarks and experiments:
+
+    POST /oauth/token
+    GET  /oauth/token/accessible-resources
+    GET  /ex/jira/{cloudid}/rest/api/3/project
+    GET  /ex/jira/{cloudid}/rest/api/3/project/search
+    POST /ex/jira/{cloudid}/rest/api/3/search
+    POST /ex/jira/{cloudid}/rest/api/3/issue/bulk
+    PUT  /ex/jira/{cloudid}/rest/api/3/issue/{key}
+    GET  /ex/jira/{cloudid}/rest/api/3/issue/{key}/transitions
+    POST /ex/jira/{cloudid}/rest/api/3/issue/{key}/transitions
+    POST /ex/jira/{cloudid}/rest/api/3/changelog/bulkfetch
+
+Data is synthetic and deterministic; writes change it in memory. Latency,
+page size cap, a per-second rate limit (answered with 429 + Retry-After;
+every answer carries Jira's X-RateLimit-* headers) and a rate of transient
+write failures (503) are configurable.
+
+    python fake_atlassian.py --sites 2 --projects 20 --issues 5000 --latency 0.05
+    JIRA_API_URL=http://127.0.0.1:8765 JIRA_TOKEN_URL=http://127.0.0.1:8765/oauth/token ...
+"""
+import argparse
+import calendar
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from zlib import crc32
+
+STATUSES = ["To Do", "In Progress", "In Review", "Done"]
+ASSIGNEES = [None] + [f"User {i}" for i in range(25)]
+PROJECT_RE = re.compile(r"project\s*=\s*\"?(\w+)\"?")
+BULKFETCH_MAX_ISSUES = 1000
+PROJECT_PAGE_MAX = 50
+
+
+def jira_time(ts):
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000+0000", time.gmtime(ts))
+
+
+def issue_id(project_key, n):
+    """Numeric issue id, unique across projects as in Jira."""
+    return str(crc32(project_key.encode()) % 100000 * 1_000_000 + n)
+
+
+# ---------------------------
+# Synthetic data
+# ---------------------------
+class FakeJiraData:
+    def __init__(self, sites=1, projects=10, issues=1000, seed=42):
+        self.sites = [
+            {"id": f"cloud-{s}", "name": f"site{s}", "url": f"https://site{s}.atlassian.net",
+             "scopes": ["read:jira-work"], "avatarUrl": ""}
+            for s in range(sites)
+        ]
+        self.projects = {
+            site["id"]: [{"id": str(10000 + p), "key": f"P{s}X{p}", "name": f"Project {p} on {site['name']}"}
+                         for p in range(projects)]
+            for s, site in enumerate(self.sites)
+        }
+        self.issues_per_project = issues
+        self.seed = seed
+        self._cache = {}
+        self._by_key = {}
+        self._by_id = {}
+        self._lock = threading.Lock()
+
+    def issues(self, project_key):
+        """Issues of a project, newest first (generated once, then cached)."""
+        with self._lock:
+            if project_key not in self._cache:
+                rng = random.Random(f"{self.seed}-{project_key}")
+                now = 1_700_000_000
+                issues = []
+                for n in range(self.issues_per_project, 0, -1):
+                    created = now - n * 3600 - rng.randint(0, 3000)
+                    assignee = rng.choice(ASSIGNEES)
+                    issues.append({
+                        "id": issue_id(project_key, n),
+                        "key": f"{project_key}-{n}",
+                        "self": f"https://example.invalid/rest/api/3/issue/{n}",
+                        "fields": {
+                            "summary": f"Synthetic issue {n} of {project_key}",
+                            "status": {"name": rng.choice(STATUSES), "self": "https://example.invalid/status"},
+                            "assignee": assignee and {
+                                "displayName": assignee,
+                                "avatarUrls": {"48x48": "https://example.invalid/48"},
+                            },
+                            "created": jira_time(created),
+                            "updated": jira_time(created + rng.randint(0, 86400)),
+                        },
+                    })
+                issues.reverse()
+                self._cache[project_key] = issues
+                self._by_key.update((i["key"], i) for i in issues)
+                self._by_id.update((i["id"], i) for i in issues)
+            return self._cache[project_key]
+
+    def status_changes(self, issue):
+        """
+        Status change histories consistent with the issue's current status:
+        forward through STATUSES from the first, now and then back from
+        review to progress once, a few hours to days apart.
+        """
+        rng = random.Random(f"{self.seed}-{issue['key']}-changelog")
+        status = issue["fields"]["status"]["name"]
+        target = STATUSES.index(status) if status in STATUSES else 0
+        path = STATUSES[:target + 1]
+        if target >= 3 and rng.random() < 0.2:
+            path = path[:3] + [STATUSES[1], STATUSES[2]] + path[3:]
+        at = calendar.timegm(time.strptime(issue["fields"]["created"][:19], "%Y-%m-%dT%H:%M:%S"))
+        histories = []
+        for n, (from_status, to_status) in enumerate(zip(path, path[1:])):
+            at += rng.randint(600, 5 * 86400)
+            histories.append({
+                "id": f"{issue['id']}{n:02d}",
+                "created": jira_time(at),
+                "items": [{
+                    "field": "status", "fieldtype": "jira", "fieldId": "status",
+                    "from": str(STATUSES.index(from_status) + 1), "fromString": from_status,
+                    "to": str(STATUSES.index(to_status) + 1), "toString": to_status,
+                }],
+            })
+        return histories
+
+    # ---- Writes ----
+    def transitions(self):
+        """Every status is reachable from every other (one global transition each)."""
+        return [{"id": str(11 * (n + 1)), "name": status, "to": {"name": status}} for n, status in enumerate(STATUSES)]
+
+    def find(self, key):
+        """Issue by key, or by id among the projects generated so far."""
+        if "-" not in key:
+            return self._by_id.get(key)
+        self.issues(key.rsplit("-", 1)[0])
+        return self._by_key.get(key)
+
+    def create_issue(self, fields):
+        """Add an issue from create fields; returns (issue, None) or (None, {field: error})."""
+        project_key = (fields.get("project") or {}).get("key")
+        if not any(p["key"] == project_key for projects in self.projects.values() for p in projects):
+            return None, {"project": "Specify a valid project ID or key"}
+        if not fields.get("summary"):
+            return None, {"summary": "You must specify a summary of the issue."}
+        issues = self.issues(project_key)
+        now = jira_time(time.time())
+        with self._lock:
+            n = len(issues) + 1
+            while f"{project_key}-{n}" in self._by_key:
+                n += 1
+            issue = {
+                "id": issue_id(project_key, n), "key": f"{project_key}-{n}",
+                "self": f"https://example.invalid/rest/api/3/issue/{n}",
+                "fields": {"summary": fields["summary"], "status": {"name": STATUSES[0]}, "assignee": None,
+                           "created": now, "updated": now},
+            }
+            issues.insert(0, issue)
+            self._by_key[issue["key"]] = issue
+            self._by_id[issue["id"]] = issue
+        return issue, None
+
+    def update_issue(self, key, fields=None, status=None):
+        issue = self.find(key)
+        if issue is None:
+            return False
+        with self._lock:
+            new_fields = dict(issue["fields"], updated=jira_time(time.time()))
+            if fields and "summary" in fields:
+                new_fields["summary"] = fields["summary"]
+            if status:
+                new_fields["status"] = {"name": status}
+            issue["fields"] = new_fields
+        return True
+
+
+# ---------------------------
+# HTTP server
+# ---------------------------
+class FakeAtlassianServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), data=None, latency=0.0, max_page=100, rate_limit=None,
+                 write_error_rate=0.0):
+        super().__init__(address, FakeAtlassianHandler)
+        self.data = data or FakeJiraData()
+        self.latency = latency
+        self.max_page = max_page
+        self.rate_limit = rate_limit  # requests per second, None = unlimited
+        self.write_error_rate = write_error_rate  # share of writes / bulk elements failing with 503
+        self._rng = random.Random(7)
+        self._window = (0, 0)         # (second, count)
+        self._rate_lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def allow(self):
+        """(allowed, rate-limit headers) for one more request in the current one-second window."""
+        with self._rate_lock:
+            self.requests += 1
+            if not self.rate_limit:
+                return True, {}
+            now = time.time()
+            second = int(now)
+            start, count = self._window
+            if start != second:
+                start, count = second, 0
+            count += 1
+            self._window = (start, count)
+            remaining = max(0, self.rate_limit - count)
+            headers = {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(remaining),
+                "X-RateLimit-Reset": datetime.fromtimestamp(second + 1, timezone.utc).isoformat(
+                    timespec="milliseconds"),
+            }
+            if remaining < self.rate_limit * 0.2:
+                headers["X-RateLimit-NearLimit"] = "true"
+            if count > self.rate_limit:
+                self.throttled += 1
+                headers["Retry-After"] = "1"
+                return False, headers
+            return True, headers
+
+    def write_fails(self):
+        with self._rate_lock:
+            return self._rng.random() < self.write_error_rate
+
+    def start(self):
+        """Serve on a daemon thread; returns self for chaining."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class FakeAtlassianHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # TCP_NODELAY: headers and body are separate writes
+    rate_headers = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in dict(self.rate_headers, **(headers or {})).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _gate(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        allowed, self.rate_headers = self.server.allow()
+        if not allowed:
+            self._send(429, {"message": "Rate limit exceeded"})
+            return False
+        return True
+
+    def do_GET(self):
+        body = None
+        if not self._gate():
+            return
+        data = self.server.data
+        path, _, query = self.path.partition("?")
+        if path == "/oauth/token/accessible-resources":
+            body = data.sites
+        else:
+            m = re.fullmatch(r"/ex/jira/([^/]+)/rest/api/3/project", path)
+            if m and m.group(1) in data.projects:
+                body = data.projects[m.group(1)]
+            m = re.fullmatch(r"/ex/jira/([^/]+)/rest/api/3/project/search", path)
+            if m and m.group(1) in data.projects:
+                body = self._project_search(data.projects[m.group(1)], parse_qs(query))
+            m = re.fullmatch(r"/ex/jira/[^/]+/rest/api/3/issue/([^/]+)/transitions", path)
+            if m and data.find(m.group(1)):
+                body = {"transitions": data.transitions()}
+        if body is None:
+            return self._send(404, {"errorMessages": [f"No route for GET {self.path}"]})
+        self._send(200, body)
+
+    def do_POST(self):
+        payload = self._body()
+        if not self._gate():
+            return
+        if self.path == "/oauth/token":
+            return self._send(200, {
+                "access_token": f"fake-{time.time():.0f}",
+                "refresh_token": f"fake-refresh-{time.time():.0f}",
+                "expires_in": 3600,
+                "token_type": "Bearer",
+                "scope": "read:jira-work",
+            })
+        if re.fullmatch(r"/ex/jira/[^/]+/rest/api/3/search", self.path):
+            m = PROJECT_RE.search(payload.get("jql", ""))
+            issues = self.server.data.issues(m.group(1)) if m else []
+            start = int(payload.get("startAt", 0))
+            size = min(int(payload.get("maxResults", 50)), self.server.max_page)
+            fields = payload.get("fields")
+            page = issues[start:start + size]
+            if fields:
+                page = [dict(i, fields={k: v for k, v in i["fields"].items() if k in fields}) for i in page]
+            return self._send(200, {"startAt": start, "maxResults": size, "total": len(issues), "issues": page})
+        if re.fullmatch(r"/ex/jira/[^/]+/rest/api/3/issue/bulk", self.path):
+            return self._bulk_create(payload.get("issueUpdates", []))
+        if re.fullmatch(r"/ex/jira/[^/]+/rest/api/3/changelog/bulkfetch", self.path):
+            return self._bulk_changelog(payload)
+        m = re.fullmatch(r"/ex/jira/[^/]+/rest/api/3/issue/([^/]+)/transitions", self.path)
+        if m:
+            if self.server.write_fails():
+                return self._send(503, {"errorMessages": ["Service unavailable"]})
+            to = {t["id"]: t["to"]["name"] for t in self.server.data.transitions()}
+            status = to.get((payload.get("transition") or {}).get("id"))
+            if status is None:
+                return self._send(400, {"errorMessages": ["Transition id is not valid for this issue."]})
+            if not self.server.data.update_issue(m.group(1), status=status):
+                return self._send(404, {"errorMessages": ["Issue does not exist"]})
+            return self._send(204, None)
+        self._send(404, {"errorMessages": [f"No route for POST {self.path}"]})
+
+    def do_PUT(self):
+        payload = self._body()
+        if not self._gate():
+            return
+        m = re.fullmatch(r"/ex/jira/[^/]+/rest/api/3/issue/([^/]+)", self.path)
+        if not m:
+            return self._send(404, {"errorMessages": [f"No route for PUT {self.path}"]})
+        if self.server.write_fails():
+            return self._send(503, {"errorMessages": ["Service unavailable"]})
+        if not self.server.data.update_issue(m.group(1), payload.get("fields") or {}):
+            return self._send(404, {"errorMessages": ["Issue does not exist"]})
+        self._send(204, None)
+
+    def _bulk_create(self, updates):
+        created, errors = [], []
+        for n, update in enumerate(updates):
+            if self.server.write_fails():
+                errors.append({"status": 503, "failedElementNumber": n,
+                               "elementErrors": {"errorMessages": ["Service unavailable"], "errors": {}}})
+                continue
+            issue, field_errors = self.server.data.create_issue(update.get("fields") or {})
+            if issue is None:
+                errors.append({"status": 400, "failedElementNumber": n,
+                               "elementErrors": {"errorMessages": [], "errors": field_errors}})
+            else:
+                created.append({"id": issue["id"], "key": issue["key"], "self": issue["self"]})
+        self._send(201 if created else 400, {"issues": created, "errors": errors})
+
+    def _project_search(self, projects, params):
+        """One page of projects ordered by key, filtered by `query` on key or name like Jira."""
+        query = params.get("query", [""])[0].lower()
+        if query:
+            projects = [p for p in projects if query in p["key"].lower() or query in p["name"].lower()]
+        projects = sorted(projects, key=lambda p: p["key"])
+        start = int(params.get("startAt", ["0"])[0])
+        size = max(1, min(int(params.get("maxResults", ["50"])[0]), PROJECT_PAGE_MAX))
+        return {
+            "startAt": start, "maxResults": size, "total": len(projects),
+            "isLast": start + size >= len(projects), "values": projects[start:start + size],
+        }
+
+    def _bulk_changelog(self, payload):
+        """Status histories of the given issues, maxResults histories per page (nextPageToken = offset)."""
+        wanted = payload.get("issueIdsOrKeys") or []
+        if not wanted or len(wanted) > BULKFETCH_MAX_ISSUES:
+            return self._send(400, {"errorMessages": [f"Give 1 to {BULKFETCH_MAX_ISSUES} issue ids or keys."]})
+        data = self.server.data
+        entries = []
+        for ref in wanted:
+            issue = data.find(str(ref))
+            if issue is not None:
+                entries += [(issue["id"], history) for history in data.status_changes(issue)]
+        start = int(payload.get("nextPageToken") or 0)
+        size = max(1, min(int(payload.get("maxResults", 1000)), 10000))
+        logs = []
+        for issue_ref, history in entries[start:start + size]:
+            if not logs or logs[-1]["issueId"] != issue_ref:
+                logs.append({"issueId": issue_ref, "changeHistories": []})
+            logs[-1]["changeHistories"].append(history)
+        body = {"issueChangeLogs": logs}
+        if start + size < len(entries):
+            body["nextPageToken"] = str(start + size)
+        self._send(200, body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake Atlassian API server.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sites", type=int, default=1)
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--issues", type=int, default=1000, help="issues per project")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--max-page", type=int, default=100)
+    parser.add_argument("--rate-limit", type=int, help="requests per second before 429")
+    parser.add_argument("--write-error-rate", type=float, default=0.0, help="share of writes failing with 503")
+    args = parser.parse_args()
+
+    server = FakeAtlassianServer(
+        ("127.0.0.1", args.port), FakeJiraData(args.sites, args.projects, args.issues),
+        latency=args.latency, max_page=args.max_page, rate_limit=args.rate_limit,
+        write_error_rate=args.write_error_rate,
+    )
+    print(f"🧪 Fake Atlassian API on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
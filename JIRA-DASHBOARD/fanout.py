@@ -0,0 +1,66 @@
+import asyncio
+
+from issue_model import DEFAULT_PROJECTION
+
+DEFAULT_LIMIT = 8
+BATCH_SIZE = 100
+
+
+# ---------------------------
+# Multi-site / multi-project fan-out
+# ---------------------------
+async def fan_out_issues(client, access_token, on_batch, jql="ORDER BY created DESC",
+                         limit=DEFAULT_LIMIT, projection=DEFAULT_PROJECTION, cancel_token=None):
+    """
+    Load issues of every project on every accessible site concurrently.
+
+    Project lists of all sites are fetched in parallel, then one search per
+    project runs under a global limit of `limit` concurrent searches (on top
+    of the client's own request limit). Each Issue gets its `site` and
+    `project` set, and `on_batch(issues)` is called as batches arrive, so the
+    caller can merge them into one view while the rest is still loading.
+    Returns {"sites": n, "projects": n, "issues": n, "errors": [(site, project, msg)]}.
+    """
+    sites = await client.get_all_accessible_sites(access_token)
+    project_lists = await asyncio.gather(
+        *(client.get_projects(access_token, site["id"]) for site in sites),
+        return_exceptions=True,
+    )
+
+    summary = {"sites": len(sites), "projects": 0, "issues": 0, "errors": []}
+    gate = asyncio.Semaphore(limit)
+
+    async def load_project(site, project):
+        async with gate:
+            batch = []
+            async for issue in client.iter_issues(
+                access_token, site["id"], project["key"], jql, projection=projection
+            ):
+                if cancel_token is not None and cancel_token.cancelled:
+                    return
+                issue.site = site["name"]
+                issue.project = project["key"]
+                batch.append(issue)
+                if len(batch) >= BATCH_SIZE:
+                    summary["issues"] += len(batch)
+                    on_batch(batch)
+                    batch = []
+            if batch:
+                summary["issues"] += len(batch)
+                on_batch(batch)
+
+    labels, coros = [], []
+    for site, projects in zip(sites, project_lists):
+        if isinstance(projects, Exception):
+            summary["errors"].append((site["name"], None, str(projects)))
+            continue
+        summary["projects"] += len(projects)
+        for project in projects:
+            labels.append((site["name"], project["key"]))
+            coros.append(load_project(site, project))
+
+    results = await asyncio.gather(*coros, return_exceptions=True)
+    for (site_name, project_key), result in zip(labels, results):
+        if isinstance(result, Exception):
+            summary["errors"].append((site_name, project_key, str(result)))
+    return summary
@@ -0,0 +1,263 @@
+import time
+
+import numpy as np
+
+from issue_model import DONE_STATUSES  # finished for workload and age
+
+AGE_PERCENTILES = (50, 75, 90, 95, 99)
+DAY = 86400
+UNASSIGNED = "Unassigned"
+NO_STATUS = "(no status)"
+
+
+def _utc_offset(suffix):
+    """Seconds east of UTC for a Jira timestamp suffix such as ".000+0530" (0 if absent)."""
+    sign = suffix[-5:-4]
+    if sign not in ("+", "-"):
+        return 0
+    seconds = int(suffix[-4:-2]) * 3600 + int(suffix[-2:]) * 60
+    return seconds if sign == "+" else -seconds
+
+
+# ---------------------------
+# Categorical column values
+# ---------------------------
+class Categories:
+    """Distinct strings of a column, each stored once; rows hold the small int code."""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def codes(self, values):
+        return np.fromiter((self.code(v) for v in values), dtype=np.int32, count=len(values))
+
+
+# ---------------------------
+# Columnar issue table
+# ---------------------------
+class IssueColumns:
+    """
+    Issues of one or many projects held as NumPy columns: project, status
+    and assignee as category codes, created as UTC epoch seconds (NaN when
+    unknown) plus its day and month numbers for the histograms.
+
+    Rows are keyed by (site, issue key), so a page that repeats an issue
+    updates its row in place; columns grow by doubling, so adding a page
+    costs only that page. Every breakdown is a handful of vectorized passes
+    (bincount, percentile) over the live rows, cheap enough to recompute
+    after each page at hundreds of thousands of issues. Not thread-safe:
+    fill and query it from one thread.
+    """
+
+    def __init__(self, capacity=1024):
+        self.size = 0              # rows in use, including discarded ones
+        self.projects = Categories()  # "site/project"
+        self.statuses = Categories()
+        self.assignees = Categories()
+        self._rows = {}            # (site, key) -> row
+        self._offsets = {}         # timestamp suffix -> seconds east of UTC
+        self._project = np.zeros(capacity, dtype=np.int32)
+        self._status = np.zeros(capacity, dtype=np.int32)
+        self._assignee = np.zeros(capacity, dtype=np.int32)
+        self._created = np.full(capacity, np.nan)
+        self._day = np.zeros(capacity, dtype=np.int32)    # days since 1970-01-01
+        self._month = np.zeros(capacity, dtype=np.int32)  # months since 1970-01
+        self._live = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _reserve(self, rows):
+        capacity = len(self._live)
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        for name in ("_project", "_status", "_assignee", "_created", "_day", "_month", "_live"):
+            old = getattr(self, name)
+            new = np.full(capacity, np.nan) if old.dtype.kind == "f" else np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _parse_created(self, values):
+        """Jira ISO timestamps -> UTC epoch seconds, parsed by NumPy (NaN for missing)."""
+        present = [i for i, v in enumerate(values) if v]
+        result = np.full(len(values), np.nan)
+        if not present:
+            return result
+        stamps = [values[i] for i in present]
+        local = np.array([s[:19] for s in stamps], dtype="datetime64[s]").astype(np.int64)
+        offsets = self._offsets
+        shift = np.fromiter(
+            (offsets[s[19:]] if s[19:] in offsets else offsets.setdefault(s[19:], _utc_offset(s[19:]))
+             for s in stamps),
+            dtype=np.int64, count=len(stamps),
+        )
+        result[present] = local - shift
+        return result
+
+    def add(self, issues, site=None, project=None):
+        """Add or update issues; `site` / `project` fill in for records that do not carry them."""
+        issues = list(issues)
+        if not issues:
+            return
+        rows = np.empty(len(issues), dtype=np.int64)
+        index = self._rows
+        n = self.size
+        for i, issue in enumerate(issues):
+            row_key = (issue.site or site, issue.key)
+            row = index.get(row_key)
+            if row is None:
+                row = index[row_key] = n
+                n += 1
+            rows[i] = row
+        self._reserve(n)
+        self.size = n
+
+        self._project[rows] = self.projects.codes(
+            [f"{issue.site or site}/{issue.project or project}" for issue in issues])
+        self._status[rows] = self.statuses.codes([issue.status or NO_STATUS for issue in issues])
+        self._assignee[rows] = self.assignees.codes([issue.assignee or UNASSIGNED for issue in issues])
+        created = self._parse_created([issue.created for issue in issues])
+        days = np.floor(np.nan_to_num(created) / DAY).astype("datetime64[D]")
+        self._created[rows] = created
+        self._day[rows] = days.astype(np.int32)
+        self._month[rows] = days.astype("datetime64[M]").astype(np.int32)
+        self._live[rows] = True
+
+    def discard(self, site, keys):
+        """Drop issues deleted in Jira (their rows stay allocated but are ignored)."""
+        for key in keys:
+            row = self._rows.pop((site, key), None)
+            if row is not None:
+                self._live[row] = False
+
+    def clear(self):
+        self.__init__(len(self._live))
+
+    # ---- Selections ----
+    def mask(self, projects=None):
+        """Boolean row mask of the live issues, limited to `projects` ("site/project" names) if given."""
+        live = self._live[:self.size]
+        if projects is None:
+            return live
+        wanted = np.zeros(len(self.projects), dtype=bool)
+        for name in projects:
+            code = self.projects._codes.get(name)
+            if code is not None:
+                wanted[code] = True
+        return live & wanted[self._project[:self.size]]
+
+    def _open(self, mask):
+        done = np.fromiter(
+            (s.lower() in DONE_STATUSES for s in self.statuses.values), dtype=bool, count=len(self.statuses))
+        return mask & ~done[self._status[:self.size]]
+
+    # ---- Breakdowns ----
+    def status_counts(self, mask):
+        """[(status, issues)], largest first."""
+        counts = np.bincount(self._status[:self.size][mask], minlength=len(self.statuses))
+        return [(self.statuses.values[i], int(counts[i])) for i in np.argsort(-counts, kind="stable") if counts[i]]
+
+    def workload(self, mask):
+        """[(assignee, open issues, all issues)], most open issues first."""
+        assignee = self._assignee[:self.size]
+        total = np.bincount(assignee[mask], minlength=len(self.assignees))
+        open_ = np.bincount(assignee[self._open(mask)], minlength=len(self.assignees))
+        order = np.lexsort((-total, -open_))
+        return [(self.assignees.values[i], int(open_[i]), int(total[i])) for i in order if total[i]]
+
+    def created_histogram(self, mask, bucket="week"):
+        """
+        [(bucket start "YYYY-MM-DD", issues created)] from the oldest to the
+        newest issue, empty buckets included. `bucket` is "day", "week"
+        (starting Monday) or "month".
+        """
+        known = mask & ~np.isnan(self._created[:self.size])
+        if bucket == "month":
+            units = self._month[:self.size][known]
+        elif bucket == "week":
+            units = (self._day[:self.size][known] - 4) // 7  # 1970-01-05 was the first Monday
+        elif bucket == "day":
+            units = self._day[:self.size][known]
+        else:
+            raise ValueError(f"Unknown histogram bucket: {bucket}")
+        if not len(units):
+            return []
+        first = units.min()
+        counts = np.bincount(units - first)
+        starts = np.arange(first, first + len(counts), dtype=np.int64)
+        if bucket == "month":
+            starts = starts.astype("datetime64[M]").astype("datetime64[D]")
+        elif bucket == "week":
+            starts = (starts * 7 + 4).astype("datetime64[D]")
+        else:
+            starts = starts.astype("datetime64[D]")
+        return list(zip(np.datetime_as_string(starts).tolist(), counts.tolist()))
+
+    def age_percentiles(self, mask, now=None, percentiles=AGE_PERCENTILES):
+        """{percentile: age in days} of the open issues, {} if there are none."""
+        created = self._created[:self.size][self._open(mask)]
+        created = created[~np.isnan(created)]
+        if not len(created):
+            return {}
+        ages = ((now or time.time()) - created) / DAY
+        return dict(zip(percentiles, np.percentile(ages, percentiles).tolist()))
+
+    def summary(self, projects=None, bucket="week", now=None):
+        """Every breakdown for `projects` (all when None) in one dict."""
+        mask = self.mask(projects)
+        return {
+            "issues": int(mask.sum()),
+            "open": int(self._open(mask).sum()),
+            "statuses": self.status_counts(mask),
+            "workload": self.workload(mask),
+            "created": self.created_histogram(mask, bucket),
+            "age_days": self.age_percentiles(mask, now),
+        }
+
+
+# ---------------------------
+# Text report
+# ---------------------------
+def _bar(count, largest, width):
+    return "█" * max(1, round(width * count / largest)) if count else ""
+
+
+def format_summary(summary, width=30, top=15):
+    """Plain-text report of summary() for a monospaced text widget or a terminal."""
+    lines = [f"📊 {summary['issues']} issue(s), {summary['open']} open", ""]
+
+    lines.append("Status")
+    statuses = summary["statuses"]
+    largest = statuses[0][1] if statuses else 0
+    for status, count in statuses:
+        lines.append(f"  {status[:20]:<20}{count:>8}  {_bar(count, largest, width)}")
+
+    lines += ["", f"Open issues per assignee (top {top})"]
+    workload = summary["workload"][:top]
+    largest = max((open_ for _, open_, _ in workload), default=0)
+    for assignee, open_, total in workload:
+        lines.append(f"  {assignee[:20]:<20}{open_:>8} / {total:<8}{_bar(open_, largest, width)}")
+
+    age = summary["age_days"]
+    lines += ["", "Age of open issues (days)"]
+    lines.append("  " + ("   ".join(f"p{p}: {days:.1f}" for p, days in age.items()) if age else "no open issues"))
+
+    lines += ["", "Created"]
+    created = summary["created"]
+    largest = max((count for _, count in created), default=0)
+    for start, count in created:
+        lines.append(f"  {start:<12}{count:>8}  {_bar(count, largest, width)}")
+    return "\n".join(lines)
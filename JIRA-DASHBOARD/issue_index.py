@@ -0,0 +1,120 @@
+import re
+from bisect import bisect_left
+
+TOKEN_RE = re.compile(r"\w+")
+MIN_PREFIX = 2  # shorter query words only match whole words ("a", "1"), not every word starting with them
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+# ---------------------------
+# In-memory inverted index
+# ---------------------------
+class IssueIndex:
+    """
+    Word index over the text of loaded issues (key, summary, status, assignee).
+
+    Documents are added and replaced one at a time as pages arrive, so the
+    index is always in step with what has been loaded. search() treats every
+    query word of MIN_PREFIX+ characters as a prefix ("prog rev" finds
+    "In Progress" + "Review") and ANDs the words together. Prefix ranges come
+    from a sorted vocabulary, so a keystroke costs a bisect plus set unions
+    and intersections, never a scan of the issues. Doc ids can be any
+    hashable; the issue table uses row positions. Not thread-safe: use it
+    from one thread (the Tk thread).
+    """
+
+    def __init__(self):
+        self._postings = {}    # token -> set of doc ids
+        self._doc_tokens = {}  # doc id -> frozenset of tokens
+        self._vocab = []       # sorted tokens (may hold a few with no postings left)
+        self._new_tokens = []  # tokens not merged into _vocab yet
+        self._stale = 0
+        self._prefix_cache = {}
+
+    def __len__(self):
+        return len(self._doc_tokens)
+
+    def add(self, doc, texts):
+        """Index (or re-index) document `doc` from an iterable of strings."""
+        tokens = frozenset(t for text in texts for t in tokenize(text))
+        old = self._doc_tokens.get(doc)
+        if old is None:
+            old = frozenset()
+        elif tokens == old:
+            return
+        for token in old - tokens:
+            self._unpost(token, doc)
+        postings = self._postings
+        for token in tokens - old:
+            docs = postings.get(token)
+            if docs is None:
+                docs = postings[token] = set()
+                self._new_tokens.append(token)
+            docs.add(doc)
+        self._doc_tokens[doc] = tokens
+        if self._prefix_cache:
+            self._prefix_cache.clear()
+
+    def remove(self, doc):
+        for token in self._doc_tokens.pop(doc, ()):
+            self._unpost(token, doc)
+        self._prefix_cache.clear()
+
+    def _unpost(self, token, doc):
+        docs = self._postings[token]
+        docs.discard(doc)
+        if not docs:
+            # Left in _vocab and skipped by searches until the next compaction
+            del self._postings[token]
+            self._stale += 1
+
+    def optimize(self):
+        """Fold newly seen words into the sorted vocabulary now rather than on the next search."""
+        self._sorted_vocab()
+
+    # ---- Queries ----
+    def _sorted_vocab(self):
+        if self._new_tokens:
+            # Two sorted runs: Timsort merges them in linear time
+            self._new_tokens.sort()
+            self._vocab = sorted(self._vocab + self._new_tokens)
+            self._new_tokens = []
+        if self._stale > len(self._vocab) // 4:
+            self._vocab = sorted(self._postings)
+            self._stale = 0
+        return self._vocab
+
+    def _matches(self, term):
+        """Doc ids with a word equal to (short terms) or starting with `term`."""
+        cached = self._prefix_cache.get(term)
+        if cached is not None:
+            return cached
+        postings = self._postings
+        if len(term) < MIN_PREFIX:
+            docs = postings.get(term, set())
+        else:
+            vocab = self._sorted_vocab()
+            start = bisect_left(vocab, term)
+            end = bisect_left(vocab, term + "\U0010ffff", start)
+            groups = [postings[t] for t in vocab[start:end] if t in postings]
+            docs = groups[0] if len(groups) == 1 else set().union(*groups)
+        if len(self._prefix_cache) > 64:
+            self._prefix_cache.clear()
+        self._prefix_cache[term] = docs
+        return docs
+
+    def search(self, query):
+        """Set of doc ids matching every word of `query`, or None for an empty query."""
+        terms = sorted(set(tokenize(query)), key=len, reverse=True)  # longest (narrowest) first
+        if not terms:
+            return None
+        result = None
+        for term in terms:
+            docs = self._matches(term)
+            result = set(docs) if result is None else result & docs
+            if not result:
+                break
+        return result
@@ -0,0 +1,117 @@
+import sys
+from datetime import datetime
+
+# Jira field -> (fields[name], optional sub-key) to read from a search result
+FIELD_PATHS = {
+    "summary": ("summary", None),
+    "status": ("status", "name"),
+    "assignee": ("assignee", "displayName"),
+    "created": ("created", None),
+    "updated": ("updated", None),
+}
+# Low-cardinality values shared by many issues: keep one copy of each string
+INTERNED_FIELDS = {"status", "assignee"}
+
+DEFAULT_FIELDS = ("summary", "status", "assignee", "created")
+
+# Status names by workflow stage (compared lower-case); anything else counts as in progress
+TODO_STATUSES = frozenset({"to do", "open", "backlog", "new", "selected for development"})
+DONE_STATUSES = frozenset({"done", "closed", "resolved", "cancelled", "canceled", "won't do"})
+
+
+def parse_time(value):
+    """
+    Epoch seconds from a Jira timestamp: an ISO string with any UTC offset
+    (search results use the requesting user's timezone, webhooks may not),
+    or epoch seconds / milliseconds. None if missing or unreadable.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z").timestamp()
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+# ---------------------------
+# Compact issue record
+# ---------------------------
+class Issue:
+    """
+    One Jira issue reduced to the fields a view asked for. Uses __slots__ so
+    an issue costs a fixed handful of pointers instead of the nested search
+    JSON (self URLs, avatar maps, status categories...). Fields that were not
+    projected stay None. `site` and `project` are set by multi-site loaders.
+    """
+
+    __slots__ = ("key", "summary", "status", "assignee", "created", "updated", "site", "project")
+
+    def __init__(self, key, summary=None, status=None, assignee=None, created=None, updated=None,
+                 site=None, project=None):
+        self.key = key
+        self.summary = summary
+        self.status = status
+        self.assignee = assignee
+        self.created = created
+        self.updated = updated
+        self.site = site
+        self.project = project
+
+    def to_dict(self):
+        """Plain dict of the non-empty fields (for JSON output)."""
+        return {name: getattr(self, name) for name in self.__slots__ if getattr(self, name) is not None}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+    def __eq__(self, other):
+        if not isinstance(other, Issue):
+            return NotImplemented
+        return all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    def __repr__(self):
+        return f"Issue({self.key!r}, status={self.status!r})"
+
+
+# ---------------------------
+# Field projection
+# ---------------------------
+class IssueProjection:
+    """
+    The set of fields a view needs. `request_fields` is what to send in the
+    search body, and calling the projection turns a raw search result into an
+    Issue holding only those fields, so request and record always agree.
+    """
+
+    def __init__(self, fields=DEFAULT_FIELDS):
+        unknown = [f for f in fields if f not in FIELD_PATHS]
+        if unknown:
+            raise ValueError(f"Unsupported issue fields: {', '.join(unknown)}")
+        self.fields = tuple(fields)
+        self._paths = [(name,) + FIELD_PATHS[name] + (name in INTERNED_FIELDS,) for name in self.fields]
+
+    @property
+    def request_fields(self):
+        return list(self.fields)
+
+    def __call__(self, raw):
+        fields = raw.get("fields") or {}
+        values = {}
+        for name, field, sub_key, interned in self._paths:
+            value = fields.get(field)
+            if sub_key and value is not None:
+                value = value.get(sub_key)
+            if interned and value is not None:
+                value = sys.intern(value)
+            values[name] = value
+        return Issue(raw["key"], **values)
+
+
+DEFAULT_PROJECTION = IssueProjection()
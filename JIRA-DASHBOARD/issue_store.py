@@ -0,0 +1,237 @@
+import math
+import sqlite3
+import threading
+import time
+
+from jira_auth import iter_search, count_issues
+from issue_model import Issue, IssueProjection, parse_time
+
+DB_FILE = "issues.db"
+SCHEMA_VERSION = 3
+COLUMNS = ("key", "summary", "status", "assignee", "created", "updated")
+SYNC_PROJECTION = IssueProjection(COLUMNS[1:])
+KEYS_PROJECTION = IssueProjection(("updated",))
+SYNC_OVERLAP = 5 * 60   # re-fetch this many seconds before the last sync to cover clock skew
+BATCH_SIZE = 200
+
+
+# ---------------------------
+# Local SQLite issue store
+# ---------------------------
+class IssueStore:
+    """
+    Persistent cache of issues per (site, project), shared by the dashboards.
+    Issues are stored as the projected columns of SYNC_PROJECTION and read
+    back as compact Issue records. Jira timestamps carry the offset of
+    whoever asked (search) or of the webhook sender, so `created` and
+    `updated` are also stored as epoch seconds (created_at / updated_at),
+    and those are what ordering and staleness checks compare.
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # Older layouts are only a cache: drop them and re-sync from Jira
+            self._conn.executescript("DROP TABLE IF EXISTS issues; DROP TABLE IF EXISTS sync_state;")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS issues (
+                site TEXT NOT NULL,
+                project TEXT NOT NULL,
+                key TEXT NOT NULL,
+                summary TEXT,
+                status TEXT,
+                assignee TEXT,
+                created TEXT,
+                updated TEXT,
+                created_at REAL,
+                updated_at REAL,
+                PRIMARY KEY (site, key)
+            );
+            CREATE INDEX IF NOT EXISTS issues_by_project ON issues (site, project, created_at);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                site TEXT NOT NULL,
+                project TEXT NOT NULL,
+                watermark REAL NOT NULL,
+                PRIMARY KEY (site, project)
+            );
+        """)
+        self._conn.commit()
+
+    # ---- Reads ----
+    def get_issues(self, site, project):
+        """Return stored issues of a project, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM issues WHERE site = ? AND project = ? ORDER BY created_at DESC",
+                (site, project),
+            ).fetchall()
+        return [Issue(*row) for row in rows]
+
+    def iter_issues(self, site, project, offset=0, limit=None, chunk=500):
+        """Yield stored issues newest first, reading `chunk` rows at a time."""
+        remaining = limit
+        while remaining is None or remaining > 0:
+            n = chunk if remaining is None else min(chunk, remaining)
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(COLUMNS)} FROM issues WHERE site = ? AND project = ? "
+                    "ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                    (site, project, n, offset),
+                ).fetchall()
+            for row in rows:
+                yield Issue(*row)
+            if len(rows) < n:
+                return
+            offset += n
+            if remaining is not None:
+                remaining -= n
+
+    def fingerprint(self, site, project):
+        """(count, latest updated) of a project: changes whenever its issues do."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*), MAX(updated_at) FROM issues WHERE site = ? AND project = ?",
+                (site, project),
+            ).fetchone()
+
+    def get_keys(self, site, project):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM issues WHERE site = ? AND project = ?", (site, project)
+            ).fetchall()
+        return {key for (key,) in rows}
+
+    def count(self, site, project):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM issues WHERE site = ? AND project = ?", (site, project)
+            ).fetchone()[0]
+
+    def get_watermark(self, site, project):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark FROM sync_state WHERE site = ? AND project = ?", (site, project)
+            ).fetchone()
+        return row[0] if row else None
+
+    # ---- Writes ----
+    @staticmethod
+    def _rows(site, project, issues):
+        return [
+            (site, project) + tuple(getattr(issue, c) for c in COLUMNS)
+            + (parse_time(issue.created), parse_time(issue.updated))
+            for issue in issues
+        ]
+
+    def upsert_issues(self, site, project, issues):
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO issues (site, project, {', '.join(COLUMNS)}, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self._rows(site, project, issues),
+            )
+            self._conn.commit()
+
+    def upsert_if_newer(self, site, project, issues):
+        """
+        Insert issues, or replace stored ones that are not newer (by `updated`,
+        compared in UTC), so late or replayed pushes never roll an issue back.
+        Returns rows written.
+        """
+        updates = ", ".join(f"{c} = excluded.{c}" for c in ("project",) + COLUMNS[1:] + ("created_at", "updated_at"))
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                f"INSERT INTO issues (site, project, {', '.join(COLUMNS)}, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                f"ON CONFLICT (site, key) DO UPDATE SET {updates} "
+                "WHERE issues.updated_at IS NULL OR excluded.updated_at >= issues.updated_at",
+                self._rows(site, project, issues),
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def delete_issues(self, site, keys):
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM issues WHERE site = ? AND key = ?", [(site, k) for k in keys]
+            )
+            self._conn.commit()
+
+    def set_watermark(self, site, project, watermark):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (site, project, watermark) VALUES (?, ?, ?)",
+                (site, project, watermark),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ---------------------------
+# Incremental sync
+# ---------------------------
+def sync_project(store, access_token, cloudid, project_key, cancel_token=None, on_batch=None):
+    """
+    Bring the stored copy of a project up to date with Jira.
+
+    The first sync loads every issue. Later syncs only fetch issues updated
+    since the last sync (relative JQL, so the user's Jira timezone does not
+    matter) and merge them by key. Deletions are detected by comparing the
+    local count with Jira's total; only on a mismatch is a key-only scan run.
+    `on_batch(issues)` is called with each batch as it is stored.
+    Returns {"updated": [keys], "deleted": [keys]}, or None if `cancel_token`
+    was cancelled part way (the watermark is then left untouched).
+    """
+    started = time.time()
+    watermark = store.get_watermark(cloudid, project_key)
+    if watermark is None:
+        jql = f"project = {project_key} ORDER BY updated ASC"
+    else:
+        minutes = math.ceil((started - watermark + SYNC_OVERLAP) / 60)
+        jql = f'project = {project_key} AND updated >= "-{minutes}m" ORDER BY updated ASC'
+
+    updated = []
+    batch = []
+
+    def flush():
+        # A page fetched before a webhook landed must not roll the pushed change back
+        store.upsert_if_newer(cloudid, project_key, batch)
+        updated.extend(i.key for i in batch)
+        if on_batch:
+            on_batch(batch)
+
+    for issue in iter_search(access_token, cloudid, jql, projection=SYNC_PROJECTION):
+        if cancel_token is not None and cancel_token.cancelled:
+            return None
+        batch.append(issue)
+        if len(batch) >= BATCH_SIZE:
+            flush()
+            batch = []
+    if batch:
+        flush()
+
+    deleted = []
+    if cancel_token is not None and cancel_token.cancelled:
+        return None
+    if watermark is not None:
+        total = count_issues(access_token, cloudid, f"project = {project_key}")
+        if store.count(cloudid, project_key) > total:
+            remote = {
+                i.key for i in iter_search(
+                    access_token, cloudid, f"project = {project_key}", projection=KEYS_PROJECTION
+                )
+            }
+            deleted = list(store.get_keys(cloudid, project_key) - remote)
+            store.delete_issues(cloudid, deleted)
+
+    store.set_watermark(cloudid, project_key, started)
+    return {"updated": updated, "deleted": deleted}
@@ -0,0 +1,305 @@
+import time
+from collections import deque
+from tkinter import ttk
+
+from issue_index import IssueIndex
+
+FRAME_BUDGET = 0.008  # seconds of row ingestion per Tk tick
+ROW_HEIGHT = 20
+_RESET = object()
+
+
+def issue_row(issue):
+    """Default row: key, summary, status, assignee, created (from an Issue record)."""
+    return (
+        issue.key,
+        issue.summary or "(no summary)",
+        issue.status or "(no status)",
+        issue.assignee or "Unassigned",
+        (issue.created or "")[:10],
+    )
+
+
+ISSUE_COLUMNS = [
+    ("Key", "Issue Key", 110),
+    ("Summary", "Summary", 480),
+    ("Status", "Status", 120),
+    ("Assignee", "Assignee", 150),
+    ("Created", "Created", 90),
+]
+
+
+# ---------------------------
+# Virtualized issue table
+# ---------------------------
+class VirtualIssueTable(ttk.Frame):
+    """
+    Treeview that only ever holds the rows currently on screen.
+
+    The full data set lives in a plain list of keys plus a key -> values dict.
+    Incoming issues are queued and folded into that model a few milliseconds
+    per Tk tick, and scrolling just rewrites the values of the visible slots,
+    so the Tk thread stays responsive with tens of thousands of rows.
+    set_rows() diffs against the current model by key, and a slot is only
+    touched when the values it shows actually changed.
+
+    With `search_columns`, rows are also fed into an IssueIndex (in the time
+    left over after ingestion) and set_filter() narrows the view to the rows
+    matching a query; the filter follows new rows as they arrive.
+    """
+
+    def __init__(self, master, columns=ISSUE_COLUMNS, row_fn=issue_row, key_fn=None, height=15,
+                 search_columns=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.row_fn = row_fn
+        self.key_fn = key_fn   # defaults to the first column
+        self.search_columns = search_columns
+        self._keys = []        # display order
+        self._positions = {}   # key -> position in _keys
+        self._rows = {}        # key -> values tuple
+        self._index = IssueIndex()  # doc id = position in _keys
+        self._indexed = 0      # rows [0, _indexed) are in the index
+        self._query = ""
+        self._view = None      # filtered keys, None = all rows
+        self._pending = deque()
+        self._staged = None    # (keys, positions, rows) being built by set_rows()
+        self._pump_scheduled = False
+        self._offset = 0
+        self._slots = []       # Treeview iids, one per visible line
+        self._shown = {}       # iid -> values currently displayed
+        self._slot_keys = {}   # iid -> key of the row currently displayed
+        self._selected = set()
+
+        self.tree = ttk.Treeview(
+            self, columns=[c[0] for c in columns], show="headings", height=height, selectmode="extended"
+        )
+        for col_id, heading, width in columns:
+            self.tree.heading(col_id, text=heading)
+            self.tree.column(col_id, width=width, anchor="w")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self._resize_slots(height)
+
+    # ---- Data ----
+    def __len__(self):
+        return len(self._keys)
+
+    @property
+    def visible_count(self):
+        """Number of rows passing the current filter."""
+        return len(self._keys) if self._view is None else len(self._view)
+
+    @property
+    def indexing(self):
+        """True while some loaded rows are not searchable yet."""
+        return bool(self.search_columns) and self._indexed < len(self._keys)
+
+    @property
+    def busy(self):
+        """True while rows are still being ingested or indexed."""
+        return bool(self._pending) or self.indexing
+
+    def clear(self):
+        self._pending.clear()
+        self._staged = None
+        self._keys = []
+        self._positions = {}
+        self._rows = {}
+        self._reset_index()
+        self._selected.clear()
+        self._offset = 0
+        self._render()
+
+    def append(self, issues):
+        """Queue issues for incremental insertion (rows with a known key are updated)."""
+        self._pending.extend(issues)
+        self._schedule()
+
+    def set_rows(self, issues):
+        """Replace the data set; unchanged rows and visible slots are left alone."""
+        self._pending.clear()
+        self._pending.append(_RESET)
+        self._pending.extend(issues)
+        self._schedule()
+
+    def get_row(self, key):
+        return self._rows.get(key)
+
+    def selected_keys(self):
+        return [k for k in self._keys if k in self._selected]
+
+    # ---- Filtering ----
+    def set_filter(self, query):
+        """Show only rows matching every word of `query` (prefix match); "" shows all."""
+        self._query = query
+        self._offset = 0
+        self._refilter()
+        self._render()
+        if self.indexing:
+            self._schedule()
+
+    def _refilter(self):
+        docs = self._index.search(self._query) if self.search_columns else None
+        if docs is None:
+            self._view = None
+        else:
+            keys = self._keys
+            self._view = [keys[i] for i in sorted(docs)]
+
+    def _reset_index(self):
+        self._index = IssueIndex()
+        self._indexed = 0
+        self._view = None if not self._query else []
+
+    def _index_rows(self, deadline):
+        """Index rows not in the index yet until `deadline`; True if any were added."""
+        cols = self.search_columns
+        keys, rows, index = self._keys, self._rows, self._index
+        start = pos = self._indexed
+        end = len(keys)
+        while pos < end and time.perf_counter() < deadline:
+            stop = min(end, pos + 100)
+            for i in range(pos, stop):
+                values = rows[keys[i]]
+                index.add(i, [str(values[c]) for c in cols])
+            pos = stop
+        self._indexed = pos
+        if pos == end and pos > start:
+            index.optimize()  # caught up: keep the vocabulary merge out of the next keystroke
+        return pos > start
+
+    # ---- Incremental ingestion ----
+    def _schedule(self):
+        if not self._pump_scheduled:
+            self._pump_scheduled = True
+            self.after(0, self._pump)
+
+    def _pump(self):
+        self._pump_scheduled = False
+        deadline = time.perf_counter() + FRAME_BUDGET
+        pending = self._pending
+        changed = False  # does an active filter need re-running?
+        while pending and time.perf_counter() < deadline:
+            for _ in range(min(200, len(pending))):
+                item = pending.popleft()
+                if item is _RESET:
+                    self._staged = ([], {}, {})
+                    continue
+                values = self.row_fn(item)
+                key = self.key_fn(item) if self.key_fn else values[0]
+                if self._staged is not None:
+                    keys, positions, rows = self._staged
+                    if key not in rows:
+                        positions[key] = len(keys)
+                        keys.append(key)
+                    rows[key] = values
+                else:
+                    if key not in self._rows:
+                        self._positions[key] = len(self._keys)
+                        self._keys.append(key)
+                    elif self.search_columns and self._rows[key] != values:
+                        # Already indexed under its position: re-index it with the new values
+                        pos = self._positions[key]
+                        if pos < self._indexed:
+                            self._index.add(pos, [str(values[c]) for c in self.search_columns])
+                            changed = True
+                    self._rows[key] = values
+
+        if self._staged is not None and not pending:
+            keys, positions, rows = self._staged
+            if self.search_columns and keys == self._keys:
+                # Same rows in the same order: keep the index, re-index changed rows only
+                for pos in range(min(self._indexed, len(keys))):
+                    if rows[keys[pos]] != self._rows[keys[pos]]:
+                        self._index.add(pos, [str(rows[keys[pos]][c]) for c in self.search_columns])
+            else:
+                self._reset_index()
+            self._keys, self._positions, self._rows = keys, positions, rows
+            self._staged = None
+            self._selected &= self._rows.keys()
+            changed = True
+
+        if self.search_columns and not pending:
+            changed = self._index_rows(deadline) or changed
+        if self._query and changed:
+            self._refilter()
+        self._render()
+        if pending or self.indexing:
+            self._schedule()
+
+    # ---- Viewport ----
+    def _resize_slots(self, count):
+        count = max(1, count)
+        while len(self._slots) < count:
+            self._slots.append(self.tree.insert("", "end", values=()))
+        while len(self._slots) > count:
+            iid = self._slots.pop()
+            self._shown.pop(iid, None)
+            self._slot_keys.pop(iid, None)
+            self.tree.delete(iid)
+        self.tree.configure(height=count)
+
+    def _on_configure(self, event):
+        style_height = ttk.Style().lookup("Treeview", "rowheight")
+        row_height = int(style_height) if style_height else ROW_HEIGHT
+        visible = max(1, (event.height - row_height) // row_height)
+        if visible != len(self._slots):
+            self._resize_slots(visible)
+            self._render()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._offset = int(float(args[1]) * self.visible_count)
+        elif args[0] == "scroll":
+            step = len(self._slots) if args[2] == "pages" else 1
+            self._offset += int(args[1]) * step
+        self._render()
+
+    def _on_mousewheel(self, event):
+        self.scroll(-1 * (event.delta // 120 or (1 if event.delta > 0 else -1)) * 3)
+        return "break"
+
+    def scroll(self, lines):
+        self._offset += lines
+        self._render()
+
+    def _render(self):
+        keys = self._keys if self._view is None else self._view
+        total = len(keys)
+        visible = len(self._slots)
+        self._offset = max(0, min(self._offset, total - visible))
+        selection = []
+        for i, iid in enumerate(self._slots):
+            pos = self._offset + i
+            key = keys[pos] if pos < total else None
+            values = self._rows[key] if key is not None else ()
+            if self._shown.get(iid) != values:
+                self.tree.item(iid, values=values)
+                self._shown[iid] = values
+            self._slot_keys[iid] = key
+            if key is not None and key in self._selected:
+                selection.append(iid)
+        if set(self.tree.selection()) != set(selection):
+            self.tree.selection_set(selection)
+        if total:
+            self.scrollbar.set(self._offset / total, min(1.0, (self._offset + visible) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_select(self, event):
+        selected_now = set(self.tree.selection())
+        for iid in self._slots:
+            key = self._slot_keys.get(iid)
+            if key is None:
+                continue
+            if iid in selected_now:
+                self._selected.add(key)
+            else:
+                self._selected.discard(key)
@@ -0,0 +1,325 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import aiohttp
+
+from jira_auth import (
+    get_token_manager, get_valid_access_token, save_tokens, get_cache, token_subject,
+    ISSUE_FIELDS, SEARCH_PAGE_SIZE, PROJECT_PAGE_SIZE,
+)
+from issue_model import DEFAULT_PROJECTION
+from jira_client import (
+    API_URL, TOKEN_URL, DEFAULT_POOL_SIZE, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, DEFAULT_RETRIES,
+    IDEMPOTENT_METHODS,
+)
+from metrics import get_metrics
+from rate_governor import get_governor, backoff, RETRY_STATUSES
+
+DEFAULT_CONCURRENCY = 8
+
+
+# ---------------------------
+# asyncio Jira client
+# ---------------------------
+class AsyncJiraClient:
+    """
+    asyncio counterpart of the jira_auth functions, on one aiohttp session.
+
+    At most `max_concurrency` requests are in flight at once, however many
+    coroutines are awaiting the client. Create and use it inside one event
+    loop (e.g. the AsyncBridge loop); `async with` closes the session.
+    Request hooks, the shared RateGovernor and retries work as in JiraClient
+    (timed from when a slot is free).
+    """
+
+    def __init__(self, api_url=None, token_url=None, max_concurrency=DEFAULT_CONCURRENCY,
+                 pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, hooks=None, retries=DEFAULT_RETRIES, governor=None):
+        self.api_url = (api_url or os.getenv("JIRA_API_URL", API_URL)).rstrip("/")
+        self.token_url = token_url or os.getenv("JIRA_TOKEN_URL", TOKEN_URL)
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session = None
+        self.hooks = [get_metrics().record_request] if hooks is None else list(hooks)
+        self.retries = retries
+        self.governor = governor or get_governor()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=self.pool_size),
+                timeout=self.timeout,
+                headers={"Accept": "application/json", "Accept-Encoding": "gzip, deflate"},
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def site_url(self, cloudid, path):
+        return f"{self.api_url}/ex/jira/{cloudid}{path}"
+
+    async def _send(self, method, url, headers, kwargs):
+        """One attempt through the governor: (status, body, response headers, bytes)."""
+        ticket = await self.governor.acquire_async()
+        status, resp_headers = None, None
+        try:
+            async with self._get_session().request(method, url, headers=headers, **kwargs) as resp:
+                status, resp_headers = resp.status, resp.headers
+                raw = await resp.read()
+                if resp.content_type == "application/json":
+                    body = json.loads(raw) if raw.strip() else None
+                else:
+                    body = raw.decode(resp.charset or "utf-8", errors="replace")
+                return status, body, resp.content_length or len(raw)
+        finally:
+            self.governor.release(ticket, status, resp_headers)
+
+    async def request(self, method, url, access_token=None, retries=None, idempotent=None, **kwargs):
+        """Return (status, parsed JSON or text) for one request, retried like JiraClient.request."""
+        headers = dict(kwargs.pop("headers", None) or {})  # the caller's dict is left as it was
+        if access_token:
+            headers["Authorization"] = f"Bearer {access_token}"
+        retries = self.retries if retries is None else retries
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        async with self._semaphore:
+            event = {"method": method, "url": url, "status": None, "bytes": 0, "retries": 0}
+            started = time.perf_counter()
+            try:
+                for attempt in range(1, retries + 2):
+                    try:
+                        status, body, size = await self._send(method, url, headers, kwargs)
+                    except (aiohttp.ClientError, asyncio.TimeoutError):
+                        if not idempotent or attempt > retries:
+                            raise
+                    else:
+                        event["status"] = status
+                        event["bytes"] += size
+                        if not (status == 429 or (idempotent and status in RETRY_STATUSES)) or attempt > retries:
+                            return status, body
+                    event["retries"] += 1
+                    await asyncio.sleep(backoff(attempt))
+            finally:
+                event["seconds"] = time.perf_counter() - started
+                for hook in self.hooks:
+                    try:
+                        hook(event)
+                    except Exception as e:
+                        print(f"⚠️ Request hook failed: {e}")
+
+    # ---- Tokens ----
+    async def refresh_access_token(self, client_id, client_secret, refresh_token):
+        data = {
+            "grant_type": "refresh_token",
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "refresh_token": refresh_token,
+        }
+        status, body = await self.request("POST", self.token_url, json=data)
+        if status == 200:
+            tokens = await asyncio.to_thread(save_tokens, body)
+            get_metrics().inc("jira_token_refresh_total", result="ok")
+            print("✅ Access token refreshed")
+            return tokens
+        get_metrics().inc("jira_token_refresh_total", result="failed")
+        print("❌ Token refresh failed:", body)
+        return None
+
+    async def get_valid_access_token(self, client_id, client_secret):
+        """
+        Return a valid access token. The common case is answered from the
+        in-memory TokenManager; an actual refresh goes through the shared
+        single-flight path on a worker thread so it never runs twice.
+        """
+        manager = get_token_manager()
+        tokens = manager.load()
+        if tokens and tokens.get("expires_at", 0) - time.time() > manager.refresh_margin:
+            return tokens["access_token"]
+        return await asyncio.to_thread(get_valid_access_token, client_id, client_secret)
+
+    # ---- Jira API ----
+    async def get_all_accessible_sites(self, access_token, use_cache=True):
+        key = ("sites", token_subject(access_token))
+        cached = get_cache().get(key) if use_cache else None
+        if cached is not None:
+            return cached
+        status, body = await self.request(
+            "GET", f"{self.api_url}/oauth/token/accessible-resources", access_token=access_token
+        )
+        if status != 200:
+            raise Exception(f"Error getting accessible sites: {status} {body}")
+        get_cache().set(key, body)
+        return body
+
+    async def get_projects(self, access_token, cloudid, use_cache=True):
+        key = ("projects", token_subject(access_token), cloudid)
+        cached = get_cache().get(key) if use_cache else None
+        if cached is not None:
+            return cached
+        projects = []
+        while True:
+            # Paged like jira_auth.iter_project_pages; sites are fetched concurrently instead
+            status, body = await self.request(
+                "GET", self.site_url(cloudid, "/rest/api/3/project/search"), access_token=access_token,
+                params={"startAt": len(projects), "maxResults": PROJECT_PAGE_SIZE, "orderBy": "key"},
+            )
+            if status != 200:
+                raise Exception(f"Error fetching projects: {status} {body}")
+            values = body.get("values", [])
+            projects += values
+            if not values or body.get("isLast", True):
+                break
+        get_cache().set(key, projects)
+        return projects
+
+    async def search_page(self, access_token, cloudid, jql, start_at=0,
+                          page_size=SEARCH_PAGE_SIZE, fields=None):
+        data = {
+            "jql": jql,
+            "startAt": start_at,
+            "maxResults": page_size,
+            "fields": fields or ISSUE_FIELDS,
+        }
+        status, body = await self.request(
+            "POST", self.site_url(cloudid, "/rest/api/3/search"), access_token=access_token, json=data,
+            idempotent=True,
+        )
+        if status != 200:
+            raise Exception(f"Error fetching issues: {status} {body}")
+        return body
+
+    async def iter_search(self, access_token, cloudid, jql, projection=DEFAULT_PROJECTION,
+                          page_size=SEARCH_PAGE_SIZE, max_results=None, prefetch=2, start_at=0,
+                          raw_fields=None):
+        """
+        Async generator over every issue of a JQL query, prefetching `prefetch`
+        pages. Yields Issue records of `projection`, or raw dicts if it is None.
+        """
+        fields = projection.request_fields if projection is not None else raw_fields
+        if max_results is not None:
+            page_size = min(page_size, max_results)
+        if page_size <= 0:
+            return
+
+        page = await self.search_page(access_token, cloudid, jql, start_at, page_size, fields)
+        total = page.get("total", start_at + len(page.get("issues", [])))
+        page_size = page.get("maxResults") or page_size
+        end = total if max_results is None else min(total, start_at + max_results)
+
+        offsets = iter(range(start_at + page_size, end, page_size))
+        pending = []
+        try:
+            def schedule():
+                while len(pending) < max(1, prefetch):
+                    offset = next(offsets, None)
+                    if offset is None:
+                        return
+                    pending.append(asyncio.ensure_future(
+                        self.search_page(access_token, cloudid, jql, offset, page_size, fields)
+                    ))
+
+            yielded = 0
+            while page is not None:
+                schedule()
+                issues = page.get("issues", [])
+                page = None
+                for issue in issues:
+                    if yielded >= end - start_at:
+                        return
+                    yield projection(issue) if projection is not None else issue
+                    yielded += 1
+                if not issues or not pending:
+                    return
+                page = await pending.pop(0)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def iter_issues(self, access_token, cloudid, project_key, jql="ORDER BY created DESC", **kwargs):
+        return self.iter_search(access_token, cloudid, f"project = {project_key} {jql}", **kwargs)
+
+    async def get_issues(self, access_token, cloudid, project_key, jql="ORDER BY created DESC", **kwargs):
+        return [i async for i in self.iter_issues(access_token, cloudid, project_key, jql, **kwargs)]
+
+
+# ---------------------------
+# Bridge for Tk / Flask
+# ---------------------------
+class AsyncBridge:
+    """
+    Runs one asyncio event loop on a daemon thread so synchronous code (the
+    Tk main loop, Flask views) can drive AsyncJiraClient coroutines.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="jira-async", daemon=True)
+        self._thread.start()
+        self.client = None
+
+    def get_client(self):
+        """Return the AsyncJiraClient bound to this loop (created on first use)."""
+        if self.client is None:
+            self.client = AsyncJiraClient()
+        return self.client
+
+    def submit(self, coro):
+        """Schedule a coroutine on the loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the loop and block for its result (Flask views, scripts)."""
+        return self.submit(coro).result(timeout)
+
+    def submit_to_tk(self, widget, coro, on_done, on_error=None, post=None):
+        """
+        Run a coroutine and deliver its result to callbacks on the Tk main
+        thread, through `post(fn)` if given (e.g. a UIQueue) or widget.after().
+        """
+        post = post or (lambda fn: widget.after(0, fn))
+
+        def done(future):
+            try:
+                result = future.result()
+            except Exception as e:
+                if on_error:
+                    post(lambda err=e: on_error(err))
+                return
+            post(lambda: on_done(result))
+
+        future = self.submit(coro)
+        future.add_done_callback(done)
+        return future
+
+    def stop(self):
+        if self.client is not None:
+            self.run(self.client.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+_bridge = None
+_bridge_lock = threading.Lock()
+
+
+def get_bridge():
+    """Return the process-wide AsyncBridge, starting its loop on first use."""
+    global _bridge
+    if _bridge is None:
+        with _bridge_lock:
+            if _bridge is None:
+                _bridge = AsyncBridge()
+    return _bridge
@@ -1,21 +1,31 @@
-import os, json, time
-from dotenv import load_dotenv
-import tkinter as tk
-from tkinter import simpledialog
-import requests
+import os, json, base64, hashlib, threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from jira_client import get_client, API_URL, TOKEN_URL
+from token_manager import TokenManager
+from ttl_cache import TTLCache
+from issue_model import DEFAULT_PROJECTION
+from json_stream import JSONArrayStream
+from metrics import get_metrics
 
 CONFIG_FILE = ".jenv"
 TOKENS_FILE = "tokens.json"
 
 AUTH_URL = "https://auth.atlassian.com/authorize"
-TOKEN_URL = "https://auth.atlassian.com/oauth/token"
-API_URL = "https://api.atlassian.com"
 
 
 # ---------------------------
 # Load Jira credentials (.jenv) or prompt user
 # ---------------------------
-def get_jira_credentials():
+def get_jira_credentials(prompt=True, parent=None):
+    """
+    Read CLIENT_ID / CLIENT_SECRET (and redirect URI, scopes) from .jenv or
+    the environment. If they are missing and `prompt` is set, ask for them
+    with a Tk dialog (over `parent` if given) and save them to .jenv.
+    """
+    from dotenv import load_dotenv
+
     env_path = os.path.join(os.path.dirname(__file__), CONFIG_FILE)
     load_dotenv(env_path)
 
@@ -24,16 +34,30 @@ def get_jira_credentials():
     redirect_uri = os.getenv("REDIRECT_URI", "http://localhost:8080/callback")
     scopes = os.getenv("SCOPES", "read:jira-work write:jira-work manage:jira-project")
 
+    if (not client_id or not client_secret) and not prompt:
+        raise Exception(f"❌ Missing CLIENT_ID or CLIENT_SECRET in {env_path} or the environment.")
+
     if not client_id or not client_secret:
         print("⚠️ Missing CLIENT_ID or CLIENT_SECRET. Opening Tkinter prompt...")
+        # tkinter is only needed here; keep it out of every other import
+        import tkinter as tk
+        from tkinter import simpledialog
 
-        root = tk.Tk()
-        root.withdraw()
+        root = parent
+        if root is None:
+            root = tk.Tk()
+            root.withdraw()
 
         if not client_id:
-            client_id = simpledialog.askstring("Jira OAuth Setup", "Enter Atlassian CLIENT_ID:")
+            client_id = simpledialog.askstring("Jira OAuth Setup", "Enter Atlassian CLIENT_ID:", parent=root)
         if not client_secret:
-            client_secret = simpledialog.askstring("Jira OAuth Setup", "Enter Atlassian CLIENT_SECRET:", show="*")
+            client_secret = simpledialog.askstring(
+                "Jira OAuth Setup", "Enter Atlassian CLIENT_SECRET:", show="*", parent=root
+            )
+        if parent is None:
+            root.destroy()
+        if not client_id or not client_secret:
+            raise Exception("❌ Jira OAuth setup cancelled.")
 
         with open(env_path, "w") as f:
             f.write(f"CLIENT_ID={client_id}\n")
@@ -46,22 +70,39 @@ def get_jira_credentials():
     return client_id, client_secret, redirect_uri, scopes
 
 
+_credentials = None
+_credentials_lock = threading.Lock()
+
+
+def get_credentials(prompt=True, parent=None):
+    """get_jira_credentials(), resolved on first use and then cached for the process."""
+    global _credentials
+    with _credentials_lock:
+        if _credentials is None:
+            _credentials = get_jira_credentials(prompt=prompt, parent=parent)
+        return _credentials
+
+
 # ---------------------------
 # Token utilities
 # ---------------------------
+_token_manager = TokenManager(TOKENS_FILE)
+
+
+def get_token_manager():
+    """Return the process-wide TokenManager for tokens.json."""
+    return _token_manager
+
+
 def save_tokens(tokens):
-    # add expires_at field for convenience
-    if "expires_in" in tokens:
-        tokens["expires_at"] = int(time.time()) + tokens["expires_in"]
-    with open(TOKENS_FILE, "w") as f:
-        json.dump(tokens, f, indent=2)
+    # adds expires_at, writes atomically under the cross-process lock
+    tokens = _token_manager.store(tokens)
     print("💾 Tokens saved to", TOKENS_FILE)
+    return tokens
 
 
 def load_tokens():
-    if os.path.exists(TOKENS_FILE):
-        return json.load(open(TOKENS_FILE))
-    return None
+    return _token_manager.load()
 
 
 def refresh_access_token(client_id, client_secret, refresh_token):
@@ -71,47 +112,104 @@ def refresh_access_token(client_id, client_secret, refresh_token):
         "client_secret": client_secret,
         "refresh_token": refresh_token,
     }
-    resp = requests.post(TOKEN_URL, json=data)
+    client = get_client()
+    resp = client.post(client.token_url, json=data)
     if resp.status_code == 200:
-        tokens = resp.json()
-        save_tokens(tokens)
+        tokens = save_tokens(resp.json())
+        get_metrics().inc("jira_token_refresh_total", result="ok")
         print("✅ Access token refreshed")
         return tokens
+    get_metrics().inc("jira_token_refresh_total", result="failed")
     print("❌ Token refresh failed:", resp.text)
     return None
 
 
 def get_valid_access_token(client_id, client_secret):
-    """Return a valid access token, refreshing if needed."""
-    tokens = load_tokens()
-    if not tokens:
-        raise Exception("❌ No tokens found. Run the Flask login flow first.")
+    """Return a valid access token, refreshing (once, across threads/processes) if needed."""
+    return _token_manager.get_access_token(
+        lambda refresh_token: refresh_access_token(client_id, client_secret, refresh_token)
+    )
+
 
-    access_token = tokens.get("access_token")
-    refresh_token = tokens.get("refresh_token")
-    expires_at = tokens.get("expires_at", 0)
+def get_access_token():
+    """get_valid_access_token() with the cached credentials (never prompts)."""
+    client_id, client_secret, _, _ = get_credentials(prompt=False)
+    return get_valid_access_token(client_id, client_secret)
 
-    # refresh if expired (or near expiry)
-    if time.time() >= expires_at - 30:
-        print("⚠️ Access token expired or near expiry. Refreshing...")
-        tokens = refresh_access_token(client_id, client_secret, refresh_token)
-        if not tokens:
-            raise Exception("❌ Could not refresh access token.")
-        access_token = tokens["access_token"]
 
-    return access_token
+# ---------------------------
+# Metadata cache (sites, projects)
+# ---------------------------
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Return the shared TTLCache for slow-changing metadata. JIRA_CACHE_TTL
+    (seconds, default 300) and JIRA_CACHE_SIZE (entries, default 256) configure it.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TTLCache(
+                    ttl=float(os.getenv("JIRA_CACHE_TTL", "300")),
+                    maxsize=int(os.getenv("JIRA_CACHE_SIZE", "256")),
+                    on_lookup=lambda key, hit: get_metrics().record_cache(key[0], hit),
+                )
+    return _cache
+
+
+def invalidate_cache(kind=None, cloudid=None, access_token=None):
+    """
+    Drop cached metadata. With no arguments everything goes; otherwise only
+    entries of `kind` ("sites" / "projects"), optionally narrowed to the
+    subject of `access_token` and then to one cloud id.
+    """
+    if kind is None:
+        get_cache().invalidate()
+        return
+    if access_token is None:
+        get_cache().invalidate(kind)
+    elif cloudid is None:
+        get_cache().invalidate(kind, token_subject(access_token))
+    else:
+        get_cache().invalidate(kind, token_subject(access_token), cloudid)
+
+
+def token_subject(access_token):
+    """
+    Return the user behind an access token (the JWT `sub` claim), so cached
+    entries survive token refreshes. Falls back to a hash of the token.
+    """
+    try:
+        payload = access_token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return claims["sub"]
+    except Exception:
+        return hashlib.sha256(access_token.encode()).hexdigest()[:16]
 
 
 # ---------------------------
 # Jira API utilities
 # ---------------------------
-def get_cloud_id(access_token):
-    headers = {"Authorization": f"Bearer {access_token}", "Accept": "application/json"}
-    resp = requests.get(f"{API_URL}/oauth/token/accessible-resources", headers=headers)
-    if resp.status_code != 200:
-        raise Exception(f"Error getting cloudid: {resp.status_code} {resp.text}")
+def get_all_accessible_sites(access_token, use_cache=True):
+    """Return all Jira sites the user can access (cached per token subject)."""
+    def load():
+        client = get_client()
+        resp = client.get(f"{client.api_url}/oauth/token/accessible-resources", access_token=access_token)
+        if resp.status_code != 200:
+            raise Exception(f"Error getting accessible sites: {resp.status_code} {resp.text}")
+        return resp.json()
 
-    resources = resp.json()
+    if not use_cache:
+        return load()
+    return get_cache().get_or_load(("sites", token_subject(access_token)), load)
+
+
+def get_cloud_id(access_token):
+    resources = get_all_accessible_sites(access_token)
     if not resources:
         raise Exception("No accessible Jira resources found")
 
@@ -134,43 +232,250 @@ def get_cloud_id(access_token):
     print("Defaulting to first site.")
     return resources[0]["id"]
 
-    headers = {"Authorization": f"Bearer {access_token}", "Accept": "application/json"}
-    resp = requests.get(f"{API_URL}/oauth/token/accessible-resources", headers=headers)
-    resources = resp.json()
-    print("Accessible Jira Sites:")
-    for r in resources:
-        print(f"- {r['name']} ({r['url']}) :: ID = {r['id']}")
-    return resources[0]["id"]  # or prompt for selection
+
+ISSUE_FIELDS = DEFAULT_PROJECTION.request_fields
+SEARCH_PAGE_SIZE = 100
+SEARCH_PREFETCH = 2
+SEARCH_CHUNK_SIZE = 64 * 1024  # bytes read from a search response at a time
+PROJECT_PAGE_SIZE = 50       # /project/search returns at most 50 projects per page
+PROJECT_SEARCH_RESULTS = 50  # matches returned for one typeahead query
 
 
-def get_projects(access_token, cloudid):
-    headers = {"Authorization": f"Bearer {access_token}", "Accept": "application/json"}
-    resp = requests.get(f"{API_URL}/ex/jira/{cloudid}/rest/api/3/project", headers=headers)
+def _project_page(client, url, access_token, start_at, page_size, query=None):
+    params = {"startAt": start_at, "maxResults": page_size, "orderBy": "key"}
+    if query:
+        params["query"] = query
+    resp = client.get(url, access_token=access_token, params=params)
     if resp.status_code != 200:
         raise Exception(f"Error fetching projects: {resp.status_code} {resp.text}")
     return resp.json()
 
-def get_issues(access_token, cloudid, project_key, jql="ORDER BY created DESC"):
+
+def iter_project_pages(access_token, cloudid, query=None, page_size=PROJECT_PAGE_SIZE, max_projects=None,
+                       prefetch=SEARCH_PREFETCH, meta=None):
     """
-    Fetch issues using Jira Cloud's /rest/api/3/search endpoint with POST body.
-    Compatible with Atlassian API Gateway.
+    Yield the projects of a site (matching `query` on key or name, if given)
+    one page at a time from the paginated /project/search, ordered by key.
+    The first page tells `total`; the following ones are then requested up
+    to `prefetch` at a time. Stops after `max_projects` projects if given.
+    `meta`, if given, gets "total" and "isLast" of the pages seen so far.
     """
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
-    url = f"{API_URL}/ex/jira/{cloudid}/rest/api/3/search"
+    client = get_client()
+    url = client.site_url(cloudid, "/rest/api/3/project/search")
+    page = _project_page(client, url, access_token, 0, page_size, query)
+    # Jira may cap maxResults, so page by what the server actually returned
+    page_size = page.get("maxResults") or page_size
+    total = page.get("total", len(page.get("values", [])))
+    if meta is not None:
+        meta["total"] = total
+    end = total if max_projects is None else min(total, max_projects)
+    offsets = iter(range(page_size, end, page_size))
+    executor = ThreadPoolExecutor(max_workers=max(1, prefetch), thread_name_prefix="jira-projects")
+    pending = deque()
+    try:
+        yielded = 0
+        while True:
+            while len(pending) < max(1, prefetch):
+                offset = next(offsets, None)
+                if offset is None:
+                    break
+                pending.append(executor.submit(_project_page, client, url, access_token, offset, page_size, query))
+            if meta is not None:
+                meta["isLast"] = bool(page.get("isLast"))
+            values = page.get("values", [])[:end - yielded]
+            if values:
+                yield values
+                yielded += len(values)
+            if not values or page.get("isLast") or not pending:
+                return
+            page = pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def _load_projects(access_token, cloudid, on_page, max_projects):
+    """(projects, complete): complete unless `max_projects` cut the catalog short."""
+    meta = {}
+    projects = []
+    for page in iter_project_pages(access_token, cloudid, max_projects=max_projects, meta=meta):
+        projects += page
+        if on_page:
+            on_page(page)
+    return projects, meta.get("isLast", False) or len(projects) >= meta.get("total", 0)
+
+
+def get_projects(access_token, cloudid, use_cache=True, on_page=None, max_projects=None):
+    """
+    Return the projects of a site, paged through /project/search (cached per
+    token subject and cloud id). on_page(projects) is called with each page
+    as it arrives, so a caller can show the first projects right away.
+    `max_projects` loads only the first projects of a very large catalog
+    (cached separately).
+    """
+    def load():
+        return _load_projects(access_token, cloudid, on_page, max_projects)[0]
 
-    # POST body — standard JQL syntax
-    data = {
-        "jql": f"project = {project_key} {jql}",
-        "maxResults": 20,
-        "fields": ["summary", "status", "assignee", "created"]
-    }
+    if not use_cache:
+        return load()
+    key = ("projects", token_subject(access_token), cloudid)
+    if max_projects is not None:
+        key += ("first", max_projects)
+    return get_cache().get_or_load(key, load)
+
+
+def get_project_catalog(access_token, cloudid, max_projects, use_cache=True, on_page=None):
+    """
+    (projects, complete) for the first `max_projects` projects of a site, as
+    get_projects(); complete tells whether that was the whole catalog, from
+    Jira's isLast / total rather than the count.
+    """
+    def load():
+        return _load_projects(access_token, cloudid, on_page, max_projects)
+
+    if not use_cache:
+        return load()
+    return get_cache().get_or_load(("projects", token_subject(access_token), cloudid, "catalog", max_projects), load)
+
+
+def search_projects(access_token, cloudid, query, max_results=PROJECT_SEARCH_RESULTS, use_cache=True):
+    """
+    Projects whose key or name contains `query`, filtered by Jira (for
+    catalogs too large to load and filter locally). Cached per query, under
+    the site's projects so invalidate_cache("projects", ...) drops them too.
+    """
+    def load():
+        client = get_client()
+        url = client.site_url(cloudid, "/rest/api/3/project/search")
+        return _project_page(client, url, access_token, 0, max_results, query.strip()).get("values", [])
+
+    if not use_cache:
+        return load()
+    key = ("projects", token_subject(access_token), cloudid, "query", query.strip().lower())
+    return get_cache().get_or_load(key, load)
+
+
+def _stream_search_page(client, url, access_token, body, start_at, page_size, meta, projection=None):
+    """
+    Yield the issues of one search page as each is decoded from the response
+    stream (projected if `projection` is given), so the page never exists as
+    one bytes / str / dict tree. Its other members (startAt, maxResults,
+    total) are put in `meta` as they arrive; Jira sends them before the issues.
+    """
+    data = dict(body, startAt=start_at, maxResults=page_size)
+    # A search only reads, so it is safe to retry
+    resp = client.post(url, access_token=access_token, json=data, idempotent=True, stream=True)
+    try:
+        if resp.status_code != 200:
+            raise Exception(f"Error fetching issues: {resp.status_code} {resp.text}")
+        for issue in JSONArrayStream("issues", meta).decode(resp.iter_content(SEARCH_CHUNK_SIZE)):
+            yield projection(issue) if projection is not None else issue
+    finally:
+        resp.close()
 
-    resp = requests.post(url, headers=headers, json=data)
-    if resp.status_code != 200:
-        raise Exception(f"Error fetching issues: {resp.status_code} {resp.text}")
 
-    return resp.json().get("issues", [])
+def _search_page(client, url, access_token, body, start_at, page_size, projection=None):
+    """One whole page as (meta, issues); the issues are decoded, and projected, as they stream in."""
+    meta = {}
+    issues = list(_stream_search_page(client, url, access_token, body, start_at, page_size, meta, projection))
+    return meta, issues
+
+
+def iter_search(access_token, cloudid, jql, projection=DEFAULT_PROJECTION, page_size=SEARCH_PAGE_SIZE,
+                max_results=None, prefetch=SEARCH_PREFETCH, start_at=0, raw_fields=None):
+    """
+    Lazily yield every issue matching a JQL query as a compact Issue holding
+    only the fields of `projection` (which are also the only fields requested).
+    Pass projection=None to get the raw search dicts for `raw_fields` instead.
+
+    Issues of the first page are yielded as they are decoded from the
+    response, before the page has finished downloading. Its header tells us
+    `total`; from then on up to `prefetch` following pages are requested
+    concurrently (and decoded into projected issues as they stream in) while
+    the caller consumes the current one. Only those pages are ever held in
+    memory, whatever the size of the result set. `max_results` is a hard cap
+    on the number of issues yielded.
+    """
+    client = get_client()
+    url = client.site_url(cloudid, "/rest/api/3/search")
+    if projection is not None:
+        body = {"jql": jql, "fields": projection.request_fields}
+    else:
+        body = {"jql": jql, "fields": raw_fields or ISSUE_FIELDS}
+    if max_results is not None:
+        page_size = min(page_size, max_results)
+    if page_size <= 0:
+        return
+
+    meta = {}
+    first = _stream_search_page(client, url, access_token, body, start_at, page_size, meta, projection)
+    offsets = None  # pages after the first, known once meta has "total"
+    limit = max_results
+    executor = ThreadPoolExecutor(max_workers=max(1, prefetch), thread_name_prefix="jira-search")
+    pending = deque()
+    try:
+        def schedule():
+            nonlocal offsets, limit, page_size
+            if offsets is None:
+                if "total" not in meta:
+                    return
+                total = meta["total"]
+                # Jira may silently cap maxResults, so page by what the server actually returned
+                page_size = meta.get("maxResults") or page_size
+                end = total if max_results is None else min(total, start_at + max_results)
+                limit = end - start_at
+                offsets = iter(range(start_at + page_size, end, page_size))
+            while len(pending) < max(1, prefetch):
+                offset = next(offsets, None)
+                if offset is None:
+                    return
+                pending.append(executor.submit(
+                    _search_page, client, url, access_token, body, offset, page_size, projection
+                ))
+
+        page = first
+        yielded = 0
+        while True:
+            in_page = 0
+            for issue in page:
+                if offsets is None:
+                    schedule()  # as soon as the first page's header is in
+                if limit is not None and yielded >= limit:
+                    return
+                yield issue
+                yielded += 1
+                in_page += 1
+            if offsets is None:
+                meta.setdefault("total", start_at + yielded)  # no total: this page was all there is
+            schedule()
+            if not in_page or not pending:
+                return
+            page = pending.popleft().result()[1]
+    finally:
+        first.close()  # releases the connection if the caller stopped part way
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def count_issues(access_token, cloudid, jql):
+    """Return the number of issues matching a JQL query without fetching any."""
+    client = get_client()
+    url = client.site_url(cloudid, "/rest/api/3/search")
+    meta, _ = _search_page(client, url, access_token, {"jql": jql, "fields": ["key"]}, 0, 0)
+    return meta.get("total", 0)
+
+
+def iter_issues(access_token, cloudid, project_key, jql="ORDER BY created DESC", **kwargs):
+    """Lazily yield every issue of a project. See iter_search for the paging options."""
+    return iter_search(access_token, cloudid, f"project = {project_key} {jql}", **kwargs)
+
+
+def get_issues(access_token, cloudid, project_key, jql="ORDER BY created DESC", **kwargs):
+    """
+    Fetch issues using Jira Cloud's /rest/api/3/search endpoint with POST body.
+    Compatible with Atlassian API Gateway. Follows every page; pass max_results
+    to cap the list, or use iter_issues to stream instead of building a list.
+    """
+    return list(iter_issues(access_token, cloudid, project_key, jql, **kwargs))
@@ -0,0 +1,321 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from jira_client import get_client
+from rate_governor import backoff, RETRY_STATUSES
+
+BULK_CREATE_SIZE = 50          # Jira accepts at most 50 issues per /issue/bulk request
+DEFAULT_CONCURRENCY = 8        # updates / transitions in flight at once
+DEFAULT_CREATE_CONCURRENCY = 2  # bulk-create requests in flight at once
+DEFAULT_ATTEMPTS = 3
+
+
+def issue_fields(project_key, summary, issue_type="Task", **fields):
+    """Fields of a new issue, in the shape bulk_create expects."""
+    return dict({"project": {"key": project_key}, "summary": summary, "issuetype": {"name": issue_type}}, **fields)
+
+
+# ---------------------------
+# Helpers
+# ---------------------------
+def _result(index, key=None):
+    return {"index": index, "key": key, "ok": False, "unknown": False, "status": None, "error": None, "attempts": 0}
+
+
+def _json(resp):
+    try:
+        data = resp.json()
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _error_text(data, fallback=""):
+    """Jira's errorMessages + field errors as one line."""
+    messages = list(data.get("errorMessages") or [])
+    messages += [f"{field}: {msg}" for field, msg in (data.get("errors") or {}).items()]
+    return "; ".join(messages) or fallback
+
+
+def _not_sent(error):
+    """True if the connection could not be opened, so the request never reached Jira."""
+    import requests
+    from urllib3.exceptions import NewConnectionError
+
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+    return False
+
+
+def _outcome(resp, error, idempotent):
+    """
+    After one attempt (a response, or the OSError it raised): "done" to act
+    on the answer, "retry" if it can be sent again, or "unknown" for a
+    non-idempotent call that may have been applied - a POST is only re-sent
+    after a 429 or a connection that was never opened.
+    """
+    if error is not None:
+        return "retry" if idempotent or _not_sent(error) else "unknown"
+    if resp.status_code == 429 or (idempotent and resp.status_code in RETRY_STATUSES):
+        return "retry"
+    if resp.status_code >= 500 and not idempotent:
+        return "unknown"
+    return "done"
+
+
+def _failure(resp, error):
+    return str(error) if error is not None else f"{resp.status_code} {_error_text(_json(resp), resp.reason)}"
+
+
+def _unknown(resp, error):
+    return f"Outcome unknown after {_failure(resp, error)}: check Jira before sending it again"
+
+
+def _send(call, attempts, idempotent=True):
+    """
+    Run call() -> Response, retrying as _outcome() allows. The calls pass
+    retries=0 so the client does not retry underneath (attempts stay
+    countable per item); the rate governor still paces every attempt and
+    holds them back for a Retry-After, so the backoff only spreads them out.
+    Returns (last response or None, error text or None, attempts used,
+    whether the outcome is unknown).
+    """
+    for attempt in range(1, attempts + 1):
+        resp = error = None
+        try:
+            resp = call()
+        except OSError as e:  # requests' connection errors and timeouts are OSErrors
+            error = e
+        outcome = _outcome(resp, error, idempotent)
+        if outcome == "done":
+            return resp, None, attempt, False
+        if outcome == "unknown":
+            return resp, _unknown(resp, error), attempt, True
+        if attempt < attempts:
+            time.sleep(backoff(attempt))
+    return resp, _failure(resp, error), attempts, False
+
+
+def _run_items(items, work, concurrency, on_result):
+    """Run work(index, item) -> result for every item on up to `concurrency` threads."""
+    lock = threading.Lock()
+
+    def run(args):
+        result = work(*args)
+        if on_result:
+            with lock:  # callers may update shared counters
+                on_result(result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="jira-bulk") as executor:
+        return list(executor.map(run, enumerate(items)))
+
+
+def summarize(results):
+    """{"ok": n, "failed": n, "unknown": n, "retried": n} over bulk results."""
+    return {
+        "ok": sum(1 for r in results if r["ok"]),
+        "failed": sum(1 for r in results if not r["ok"] and not r["unknown"]),
+        "unknown": sum(1 for r in results if r["unknown"]),
+        "retried": sum(1 for r in results if r["attempts"] > 1),
+    }
+
+
+# ---------------------------
+# Bulk create
+# ---------------------------
+def bulk_create(access_token, cloudid, issues, batch_size=BULK_CREATE_SIZE,
+                concurrency=DEFAULT_CREATE_CONCURRENCY, attempts=DEFAULT_ATTEMPTS, on_result=None):
+    """
+    Create issues (field dicts, see issue_fields) through /rest/api/3/issue/bulk,
+    `batch_size` per request with up to `concurrency` requests at once.
+
+    Jira answers per element: elements it rejected for a transient reason
+    (a status in RETRY_STATUSES) are re-sent, up to `attempts` tries in
+    all; validation errors are final. A whole batch is only re-sent after a 429 or a
+    connection that never opened: after another 5xx or a timeout Jira may
+    have created it, so its items are settled with unknown=True instead of
+    risking duplicates. Returns one result per issue, in input order:
+    {"index", "key" (once created), "ok", "unknown", "status", "error",
+    "attempts"}. on_result(result) is called as each item settles.
+    """
+    client = get_client()
+    url = client.site_url(cloudid, "/rest/api/3/issue/bulk")
+    results = [_result(i) for i in range(len(issues))]
+    lock = threading.Lock()
+
+    def settle(index, **values):
+        results[index].update(values)
+        if on_result:
+            with lock:
+                on_result(results[index])
+
+    def run_batch(indices):
+        for attempt in range(1, attempts + 1):
+            for i in indices:
+                results[i]["attempts"] = attempt
+            resp = error = None
+            try:
+                resp = client.post(url, access_token=access_token, retries=0,
+                                   json={"issueUpdates": [{"fields": issues[i]} for i in indices]})
+            except OSError as e:
+                error = e
+
+            outcome = _outcome(resp, error, idempotent=False)
+            if outcome == "unknown":
+                for i in indices:
+                    settle(i, unknown=True, status=None if resp is None else resp.status_code,
+                           error=_unknown(resp, error))
+                return
+            if outcome == "done":
+                data = _json(resp)
+                if resp.status_code not in (200, 201) and not data.get("errors"):
+                    # Rejected as a whole (bad request, no permission...): final
+                    for i in indices:
+                        settle(i, status=resp.status_code, error=_error_text(data, resp.text[:200]))
+                    return
+                failed = {e.get("failedElementNumber"): e for e in data.get("errors", [])}
+                created = iter(data.get("issues", []))  # the elements that did not fail, in order
+                retry = []
+                for n, i in enumerate(indices):
+                    element_error = failed.get(n)
+                    if element_error is None:
+                        issue = next(created, None)
+                        settle(i, ok=issue is not None, status=resp.status_code, key=issue and issue.get("key"),
+                               error=None if issue else "Missing from the bulk-create response")
+                    elif element_error.get("status") in RETRY_STATUSES and attempt < attempts:
+                        retry.append(i)
+                    else:
+                        settle(i, status=element_error.get("status"),
+                               error=_error_text(element_error.get("elementErrors") or {}, "Rejected"))
+                if not retry:
+                    return
+                indices = retry
+            elif attempt == attempts:
+                for i in indices:
+                    settle(i, status=None if resp is None else resp.status_code, error=_failure(resp, error))
+                return
+            time.sleep(backoff(attempt))
+
+    batches = [list(range(s, min(s + batch_size, len(issues)))) for s in range(0, len(issues), batch_size)]
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="jira-bulk") as executor:
+        list(executor.map(run_batch, batches))
+    return results
+
+
+# ---------------------------
+# Concurrent updates and transitions
+# ---------------------------
+def bulk_update(access_token, cloudid, updates, concurrency=DEFAULT_CONCURRENCY,
+                attempts=DEFAULT_ATTEMPTS, on_result=None):
+    """
+    Edit issues concurrently: `updates` is a list of (key, fields) pairs, each
+    sent as PUT /rest/api/3/issue/{key}. Results as in bulk_create.
+    """
+    client = get_client()
+
+    def work(index, update):
+        key, fields = update
+        url = client.site_url(cloudid, f"/rest/api/3/issue/{key}")
+        resp, error, tries, _ = _send(
+            lambda: client.put(url, access_token=access_token, retries=0, json={"fields": fields}), attempts
+        )
+        result = dict(_result(index, key), attempts=tries, status=None if resp is None else resp.status_code)
+        if error is None and resp.status_code == 204:
+            result["ok"] = True
+        else:
+            result["error"] = error or _error_text(_json(resp), f"{resp.status_code} {resp.reason}")
+        return result
+
+    return _run_items(updates, work, concurrency, on_result)
+
+
+class TransitionResolver:
+    """
+    Transition ids by name, from GET /issue/{key}/transitions. The choices
+    depend on the issue's workflow and status, so they are cached per
+    (project, status) when the caller knows the status, else per issue.
+    Projects whose issue types use different workflows can get a wrong id
+    from the shared entry: bulk_transition then resolves that issue alone.
+    """
+
+    def __init__(self, client, access_token, cloudid, attempts=DEFAULT_ATTEMPTS):
+        self.client = client
+        self.access_token = access_token
+        self.cloudid = cloudid
+        self.attempts = attempts
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, key, name, status=None):
+        """Transition id whose name or target status is `name` (case-insensitive), or None."""
+        cache_key = (key.rsplit("-", 1)[0], status) if status else key
+        with self._lock:
+            transitions = self._cache.get(cache_key)
+        if transitions is None:
+            url = self.client.site_url(self.cloudid, f"/rest/api/3/issue/{key}/transitions")
+            resp, error, _, _ = _send(lambda: self.client.get(url, access_token=self.access_token, retries=0), self.attempts)
+            if error is not None or resp.status_code != 200:
+                raise Exception(f"Could not list transitions of {key}: "
+                                f"{error or _error_text(_json(resp), str(resp.status_code))}")
+            transitions = _json(resp).get("transitions", [])
+            with self._lock:
+                self._cache[cache_key] = transitions
+        wanted = name.lower()
+        for t in transitions:
+            if t.get("name", "").lower() == wanted or (t.get("to") or {}).get("name", "").lower() == wanted:
+                return t["id"]
+        return None
+
+
+def bulk_transition(access_token, cloudid, issues, transition, concurrency=DEFAULT_CONCURRENCY,
+                    attempts=DEFAULT_ATTEMPTS, on_result=None):
+    """
+    Move issues through a workflow transition concurrently. `issues` are keys
+    or records with .key / .status (a known status lets one transitions
+    lookup serve every issue of a project in that status). `transition` is a
+    transition id, or a transition / target status name. Results as in
+    bulk_create.
+    """
+    client = get_client()
+    resolver = TransitionResolver(client, access_token, cloudid, attempts)
+
+    def work(index, issue):
+        key = issue if isinstance(issue, str) else issue.key
+        status = None if isinstance(issue, str) else issue.status
+        result = _result(index, key)
+        url = client.site_url(cloudid, f"/rest/api/3/issue/{key}/transitions")
+
+        def attempt(shared_lookup):
+            try:
+                if transition.isdigit():
+                    transition_id = transition
+                else:
+                    transition_id = resolver.resolve(key, transition, status if shared_lookup else None)
+            except Exception as e:
+                return None, str(e), 0, False
+            if transition_id is None:
+                return None, f"No transition to '{transition}' from {status or 'its status'}", 0, False
+            return _send(
+                lambda: client.post(url, access_token=access_token, retries=0,
+                                    json={"transition": {"id": transition_id}}),
+                attempts, idempotent=False,
+            )
+
+        resp, error, tries, unknown = attempt(shared_lookup=bool(status))
+        no_match = resp is None and tries == 0  # the lookup found no such transition
+        if status and not transition.isdigit() and (no_match or (resp is not None and resp.status_code == 400)):
+            # Another workflow than the issue the shared lookup came from: ask for this issue
+            resp, error, more, unknown = attempt(shared_lookup=False)
+            tries += more
+        result.update(attempts=tries, unknown=unknown, status=None if resp is None else resp.status_code)
+        if error is None and resp.status_code == 204:
+            result["ok"] = True
+        else:
+            result["error"] = error or _error_text(_json(resp), f"{resp.status_code} {resp.reason}")
+        return result
+
+    return _run_items(issues, work, concurrency, on_result)
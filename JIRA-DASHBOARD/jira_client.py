@@ -0,0 +1,211 @@
+import os
+import threading
+import time
+
+from metrics import get_metrics
+from rate_governor import get_governor, backoff, RETRY_STATUSES
+
+API_URL = "https://api.atlassian.com"
+TOKEN_URL = "https://auth.atlassian.com/oauth/token"
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+DEFAULT_RETRIES = 4
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+# ---------------------------
+# Pooled Jira HTTP client
+# ---------------------------
+class JiraClient:
+    """
+    Thin wrapper around a requests.Session shared by every Jira call.
+
+    Connections to api.atlassian.com / auth.atlassian.com are kept alive in a
+    per-host pool, so only the first request to a host pays for TCP + TLS.
+    Every request gets a (connect, read) timeout and asks for gzip.
+
+    Every attempt goes through the process-wide RateGovernor. A throttled
+    answer (429) is retried up to `retries` times with jittered backoff, as
+    are 5xx answers and connection errors for requests that are safe to
+    repeat (idempotent methods, or idempotent=True such as a search POST).
+
+    After each request every hook is called with an event dict: method, url,
+    status (None if it raised), seconds, bytes and retries. By default the
+    only hook records into the shared metrics registry. A stream=True
+    response keeps its governor slot, and reports its event, until it is
+    closed: callers must close() it (or use it as a context manager).
+    """
+
+    def __init__(self, api_url=API_URL, token_url=TOKEN_URL, pool_size=DEFAULT_POOL_SIZE,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT, hooks=None,
+                 retries=DEFAULT_RETRIES, governor=None):
+        self.api_url = api_url.rstrip("/")
+        self.token_url = token_url
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self._governor = governor
+        self.hooks = [get_metrics().record_request] if hooks is None else list(hooks)
+
+        # Imported here so that importing jira_auth (e.g. at UI startup) stays cheap
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        # pool_connections = number of hosts cached, pool_maxsize = sockets per host
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        })
+
+    # ---- URL helpers ----
+    def site_url(self, cloudid, path):
+        """Build a Jira REST URL routed through the Atlassian API gateway."""
+        return f"{self.api_url}/ex/jira/{cloudid}{path}"
+
+    @property
+    def governor(self):
+        return self._governor or get_governor()
+
+    # ---- Requests ----
+    def request(self, method, url, access_token=None, headers=None, retries=None, idempotent=None, **kwargs):
+        """
+        Send one request (retrying as described above) and return the last
+        Response. retries=0 leaves retrying to the caller.
+        """
+        all_headers = {}
+        if access_token:
+            all_headers["Authorization"] = f"Bearer {access_token}"
+        if headers:
+            all_headers.update(headers)
+        kwargs.setdefault("timeout", self.timeout)
+        retries = self.retries if retries is None else retries
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        governor = self.governor
+
+        event = {"method": method, "url": url, "status": None, "bytes": 0, "retries": 0}
+        started = time.perf_counter()
+        deferred = False
+        try:
+            for attempt in range(1, retries + 2):
+                ticket = governor.acquire()
+                try:
+                    resp = self.session.request(method, url, headers=all_headers, **kwargs)
+                except BaseException as e:
+                    governor.release(ticket)
+                    # requests' connection errors and timeouts are OSErrors
+                    if not isinstance(e, OSError) or not idempotent or attempt > retries:
+                        raise
+                    resp = None
+                if resp is not None:
+                    event["status"] = resp.status_code
+                    retry = resp.status_code == 429 or (idempotent and resp.status_code in RETRY_STATUSES)
+                    last = not retry or attempt > retries
+                    if last and kwargs.get("stream"):
+                        deferred = True
+                        return self._complete_on_close(resp, governor, ticket, event, started)
+                    governor.release(ticket, resp.status_code, resp.headers)
+                    event["bytes"] += response_size(resp)
+                    if last:
+                        return resp
+                    resp.close()
+                event["retries"] += 1
+                # A Retry-After has already paused the governor; this only spreads the retries out
+                time.sleep(backoff(attempt))
+        finally:
+            if not deferred:
+                event["seconds"] = time.perf_counter() - started
+                self._emit(event)
+
+    def _complete_on_close(self, resp, governor, ticket, event, started):
+        """
+        Hold the governor slot and the request event of a stream=True response
+        until the caller closes it, so seconds and bytes cover the body download.
+        """
+        close = resp.close
+        done = []
+
+        def complete():
+            if not done:
+                done.append(True)
+                governor.release(ticket, resp.status_code, resp.headers)
+                tell = getattr(resp.raw, "tell", None)  # bytes pulled off the wire, compressed or not
+                event["bytes"] += tell() if tell else response_size(resp)
+                event["seconds"] = time.perf_counter() - started
+                self._emit(event)
+            close()
+
+        resp.close = complete
+        return resp
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def _emit(self, event):
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                print(f"⚠️ Request hook failed: {e}")
+
+    def get(self, url, access_token=None, **kwargs):
+        return self.request("GET", url, access_token=access_token, **kwargs)
+
+    def post(self, url, access_token=None, **kwargs):
+        return self.request("POST", url, access_token=access_token, **kwargs)
+
+    def put(self, url, access_token=None, **kwargs):
+        return self.request("PUT", url, access_token=access_token, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+def response_size(resp):
+    """Bytes on the wire: Content-Length, else the body if it was already read."""
+    length = resp.headers.get("Content-Length")
+    if length and length.isdigit():
+        return int(length)
+    return len(resp.content) if resp._content_consumed else 0
+
+
+# ---------------------------
+# Shared client
+# ---------------------------
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the process-wide JiraClient, creating it on first use.
+    JIRA_POOL_SIZE / JIRA_CONNECT_TIMEOUT / JIRA_READ_TIMEOUT / JIRA_API_URL /
+    JIRA_TOKEN_URL in the environment (or .jenv) override the defaults.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = JiraClient(
+                    api_url=os.getenv("JIRA_API_URL", API_URL),
+                    token_url=os.getenv("JIRA_TOKEN_URL", TOKEN_URL),
+                    pool_size=int(os.getenv("JIRA_POOL_SIZE", DEFAULT_POOL_SIZE)),
+                    connect_timeout=float(os.getenv("JIRA_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)),
+                    read_timeout=float(os.getenv("JIRA_READ_TIMEOUT", DEFAULT_READ_TIMEOUT)),
+                )
+    return _client
+
+
+def set_client(client):
+    """Replace the shared client (e.g. with different pool size or timeouts)."""
+    global _client
+    with _client_lock:
+        old, _client = _client, client
+    if old is not None and old is not client:
+        old.close()
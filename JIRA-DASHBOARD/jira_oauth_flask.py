@@ -1,20 +1,71 @@
-from flask import Flask, redirect, request
-import requests
-from jira_auth import get_jira_credentials, save_tokens, load_tokens, refresh_access_token, get_cloud_id, get_projects
+import hashlib
+import json
+import threading
+import time
 
-CLIENT_ID, CLIENT_SECRET, REDIRECT_URI, SCOPES = get_jira_credentials()
+from flask import Flask, Response, redirect, request, stream_with_context
+from jira_auth import (
+    get_credentials, save_tokens, load_tokens, get_access_token,
+    get_all_accessible_sites, get_cloud_id, get_projects,
+)
+from jira_client import get_client
+from issue_store import IssueStore, sync_project
+from metrics import get_metrics
+from webhooks import (
+    EventHub, webhook_secret, verify_signature, parse_event, apply_event,
+    SIGNATURE_HEADER, DELIVERY_HEADER, MAX_BODY,
+)
 
 AUTH_URL = "https://auth.atlassian.com/authorize"
-TOKEN_URL = "https://auth.atlassian.com/oauth/token"
+
+ISSUE_SYNC_INTERVAL = 60  # seconds before /api issues re-sync a project from Jira
 
 app = Flask(__name__)
+_store = None
+_store_lock = threading.Lock()
+_sync_locks = {}  # (cloudid, project key) -> Lock held while that project syncs
+_sync_locks_lock = threading.Lock()
+event_hub = EventHub()
+
+
+def get_store():
+    """The IssueStore behind /api issues, opened on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = IssueStore()
+    return _store
+
+
+def _sync_lock(cloudid, project_key):
+    with _sync_locks_lock:
+        return _sync_locks.setdefault((cloudid, project_key), threading.Lock())
+
+
+def _is_stale(store, cloudid, project_key):
+    watermark = store.get_watermark(cloudid, project_key)
+    return watermark is None or time.time() - watermark > ISSUE_SYNC_INTERVAL
+
+
+def _background_sync(store, access_token, cloudid, project_key, lock):
+    """Re-sync a project already in the store while requests are served from it; releases `lock`."""
+    try:
+        if _is_stale(store, cloudid, project_key):
+            sync_project(store, access_token, cloudid, project_key)
+    except Exception as e:
+        print(f"⚠️ Sync of {project_key} failed: {e}")
+    finally:
+        lock.release()
+
 
 def build_auth_url():
+    client_id, _, redirect_uri, scopes = get_credentials(prompt=False)
     return (
         f"{AUTH_URL}?audience=api.atlassian.com"
-        f"&client_id={CLIENT_ID}"
-        f"&scope={SCOPES.replace(' ', '%20')}"
-        f"&redirect_uri={REDIRECT_URI}"
+        f"&client_id={client_id}"
+        f"&scope={scopes.replace(' ', '%20')}"
+        f"&redirect_uri={redirect_uri}"
         f"&response_type=code"
         f"&prompt=consent"
     )
@@ -30,15 +81,17 @@ def callback():
     if not code:
         return "No code returned from Atlassian", 400
 
+    client_id, client_secret, redirect_uri, _ = get_credentials(prompt=False)
     data = {
         "grant_type": "authorization_code",
-        "client_id": CLIENT_ID,
-        "client_secret": CLIENT_SECRET,
+        "client_id": client_id,
+        "client_secret": client_secret,
         "code": code,
-        "redirect_uri": REDIRECT_URI,
+        "redirect_uri": redirect_uri,
     }
 
-    resp = requests.post(TOKEN_URL, json=data)
+    client = get_client()
+    resp = client.post(client.token_url, json=data)
     tokens = resp.json()
 
     if "access_token" not in tokens:
@@ -49,11 +102,10 @@ def callback():
 
 @app.route("/projects")
 def projects():
-    tokens = load_tokens()
-    if not tokens:
+    if not load_tokens():
         return "❌ No tokens found. Login at /", 400
 
-    access_token = tokens["access_token"]
+    access_token = get_access_token()
     cloudid = get_cloud_id(access_token)
     projects = get_projects(access_token, cloudid)
 
@@ -63,5 +115,158 @@ def projects():
     html += "</ul>"
     return html
 
+# ---------------------------
+# JSON API (ETag / 304, streamed issue lists)
+# ---------------------------
+def _etag_for(*parts):
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _not_modified(etag):
+    return etag in request.if_none_match
+
+
+def json_response(data):
+    """JSON response with a content ETag; answers 304 if the client has it."""
+    body = json.dumps(data, separators=(",", ":"))
+    etag = hashlib.sha1(body.encode()).hexdigest()
+    if _not_modified(etag):
+        return Response(status=304, headers={"ETag": f'"{etag}"'})
+    return Response(body, mimetype="application/json", headers={"ETag": f'"{etag}"'})
+
+
+def _api_token():
+    if not load_tokens():
+        return None
+    return get_access_token()
+
+
+@app.route("/api/sites")
+def api_sites():
+    access_token = _api_token()
+    if not access_token:
+        return {"error": "No tokens found. Login at /"}, 401
+    return json_response(get_all_accessible_sites(access_token))
+
+
+@app.route("/api/sites/<cloudid>/projects")
+def api_projects(cloudid):
+    access_token = _api_token()
+    if not access_token:
+        return {"error": "No tokens found. Login at /"}, 401
+    return json_response(get_projects(access_token, cloudid))
+
+
+@app.route("/api/sites/<cloudid>/projects/<project_key>/issues")
+def api_issues(cloudid, project_key):
+    """
+    Issues of a project from the local store (synced from Jira at most every
+    ISSUE_SYNC_INTERVAL seconds), paginated with ?startAt=&maxResults= and
+    streamed as a JSON array.
+
+    One sync per project runs at a time. A project not in the store yet is
+    synced before answering (concurrent requests wait for that one sync);
+    a stale one is re-synced in the background and served as stored.
+    """
+    access_token = _api_token()
+    if not access_token:
+        return {"error": "No tokens found. Login at /"}, 401
+    start_at = request.args.get("startAt", 0, type=int)
+    max_results = request.args.get("maxResults", None, type=int)
+
+    store = get_store()
+    if _is_stale(store, cloudid, project_key):
+        lock = _sync_lock(cloudid, project_key)
+        if store.get_watermark(cloudid, project_key) is None:
+            with lock:
+                if store.get_watermark(cloudid, project_key) is None:  # not synced by a request we waited for
+                    sync_project(store, access_token, cloudid, project_key)
+        elif lock.acquire(blocking=False):
+            threading.Thread(
+                target=_background_sync, args=(store, access_token, cloudid, project_key, lock),
+                name=f"sync-{project_key}", daemon=True,
+            ).start()
+
+    etag = _etag_for(cloudid, project_key, store.fingerprint(cloudid, project_key), start_at, max_results)
+    if _not_modified(etag):
+        return Response(status=304, headers={"ETag": f'"{etag}"'})
+
+    def generate():
+        yield "["
+        for i, issue in enumerate(store.iter_issues(cloudid, project_key, start_at, max_results)):
+            yield ("," if i else "") + json.dumps(issue.to_dict(), separators=(",", ":"))
+        yield "]"
+
+    return Response(
+        stream_with_context(generate()), mimetype="application/json", headers={"ETag": f'"{etag}"'}
+    )
+
+
+# ---------------------------
+# Jira webhooks (push updates into the store, then out to dashboards)
+# ---------------------------
+@app.route("/webhooks/jira/<cloudid>", methods=["POST"])
+def jira_webhook(cloudid):
+    """
+    Issue created / updated / deleted events of one site. Register the
+    webhook with this URL and WEBHOOK_SECRET as its secret: deliveries
+    without a valid X-Hub-Signature are rejected. Applied events go to the
+    IssueStore and to every /api/events stream.
+    """
+    secret = webhook_secret()
+    if not secret:
+        return {"error": "WEBHOOK_SECRET is not configured"}, 503
+    if (request.content_length or 0) > MAX_BODY:
+        return {"error": "Payload too large"}, 413
+    body = request.get_data(cache=False)
+    if not verify_signature(secret, body, request.headers.get(SIGNATURE_HEADER)):
+        get_metrics().inc("jira_webhook_events_total", result="bad_signature")
+        return {"error": "Invalid signature"}, 401
+    try:
+        kind, project, issue = parse_event(json.loads(body))
+    except ValueError as e:
+        get_metrics().inc("jira_webhook_events_total", result="invalid")
+        return {"error": str(e)}, 400
+
+    delivery = request.headers.get(DELIVERY_HEADER)
+    if event_hub.seen_delivery(delivery):
+        get_metrics().inc("jira_webhook_events_total", result="duplicate")
+        return {"status": "duplicate"}
+    try:
+        applied = apply_event(get_store(), cloudid, kind, project, issue)
+    except Exception:
+        event_hub.forget_delivery(delivery)  # answer 500 so Jira retries it
+        raise
+    if not applied:
+        get_metrics().inc("jira_webhook_events_total", result="stale")
+        return {"status": "stale"}
+
+    event_hub.publish({"site": cloudid, "project": project, "event": kind, "issue": issue.to_dict()})
+    get_metrics().inc("jira_webhook_events_total", result="applied", event=kind)
+    return {"status": "applied"}
+
+
+@app.route("/api/events")
+def api_events():
+    """
+    Server-sent stream of applied issue events (?site=<cloudid> to filter).
+    Reconnecting clients send Last-Event-ID and get the events they missed.
+    """
+    if not load_tokens():
+        return {"error": "No tokens found. Login at /"}, 401
+    q = event_hub.subscribe(request.headers.get("Last-Event-ID", type=int))
+    return Response(
+        stream_with_context(event_hub.stream(q, request.args.get("site"))),
+        mimetype="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/metrics")
+def metrics():
+    """Request latency histograms, status counts, cache and token stats (Prometheus text format)."""
+    return Response(get_metrics().render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
+    get_credentials()  # prompt for missing credentials now, on the main thread
     app.run(port=8080, debug=True)
@@ -1,21 +1,19 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from jira_auth import (
-    get_jira_credentials,
-    get_valid_access_token,
-    get_cloud_id,
+    get_credentials,
+    get_access_token,
+    get_all_accessible_sites,
     get_projects,
-    get_issues,
+    iter_issues,
 )
+from issue_table import VirtualIssueTable, issue_row
+from last_session import load_last_session, save_last_session
+from task_runner import TaskRunner
+from ui_queue import UIQueue
 
-# ---------------------------
-# Setup
-# ---------------------------
-CLIENT_ID, CLIENT_SECRET, REDIRECT_URI, SCOPES = get_jira_credentials()
-
-# Always get a valid access token (auto-refresh if expired)
-access_token = get_valid_access_token(CLIENT_ID, CLIENT_SECRET)
-cloudid = get_cloud_id(access_token)
+# Resolved in the background after the window is shown (see startup)
+cloudid = None
 
 # ---------------------------
 # Tkinter UI
@@ -39,37 +37,80 @@ projects_tree.pack(fill="x", padx=5, pady=5)
 issues_frame = ttk.LabelFrame(root, text="Issues")
 issues_frame.pack(fill="both", expand=True, padx=10, pady=5)
 
-issues_tree = ttk.Treeview(issues_frame, columns=("Key", "Summary", "Status"), show="headings", height=15)
-issues_tree.heading("Key", text="Issue Key")
-issues_tree.heading("Summary", text="Summary")
-issues_tree.heading("Status", text="Status")
-issues_tree.column("Key", width=150, anchor="w")
-issues_tree.column("Summary", width=600, anchor="w")
-issues_tree.column("Status", width=150, anchor="w")
-issues_tree.pack(fill="both", expand=True, padx=5, pady=5)
+issues_table = VirtualIssueTable(
+    issues_frame,
+    columns=[("Key", "Issue Key", 150), ("Summary", "Summary", 600), ("Status", "Status", 150)],
+    row_fn=lambda issue: issue_row(issue)[:3],
+    height=15,
+)
+issues_table.pack(fill="both", expand=True, padx=5, pady=5)
+
+ui = UIQueue(root)
+runner = TaskRunner(root, post=ui.post)
 
 
 # ---------------------------
 # Functions
 # ---------------------------
-def load_projects():
-    """Load Jira projects into the Treeview"""
+def show_projects(projects):
+    """Fill the projects Treeview"""
     for row in projects_tree.get_children():
         projects_tree.delete(row)
-
-    try:
-        token = get_valid_access_token(CLIENT_ID, CLIENT_SECRET)
-        projects = get_projects(token, cloudid)
-        for p in projects:
-            projects_tree.insert("", "end", values=(p["key"], p["name"]))
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to load projects:\n{e}")
+    for p in projects:
+        projects_tree.insert("", "end", values=(p["key"], p["name"]))
+
+
+def startup():
+    """Show the last known projects, then resolve credentials, token and site off the Tk thread"""
+    global cloudid
+    session = load_last_session()
+    if session.get("site"):
+        cloudid = session["site"]["id"]
+        projects_frame.config(text=f"Projects — {session['site']['name']} (refreshing…)")
+        show_projects(session.get("projects", []))
+
+    def on_error(e):
+        # Missing credentials: ask on the Tk thread
+        try:
+            get_credentials(parent=root)
+        except Exception as err:
+            messagebox.showerror("Error", f"Failed to load projects:\n{err}")
+            return
+        load_site()
+
+    runner.submit(
+        lambda: get_credentials(prompt=False), key="credentials",
+        on_done=lambda _: load_site(), on_error=on_error,
+    )
+
+
+def load_site():
+    """Keep the last used site while it is accessible (else the first one) and load its projects"""
+    def resolve():
+        token = get_access_token()
+        sites = get_all_accessible_sites(token)
+        if not sites:
+            raise Exception("No accessible Jira resources found")
+        site = next((s for s in sites if s["id"] == cloudid), sites[0])
+        return site, get_projects(token, site["id"])
+
+    def on_done(result):
+        global cloudid
+        site, projects = result
+        cloudid = site["id"]
+        projects_frame.config(text=f"Projects — {site['name']}")
+        show_projects(projects)
+        save_last_session(site=site, projects=projects)
+
+    runner.submit(
+        resolve, key="site", on_done=on_done,
+        on_error=lambda e: messagebox.showerror("Error", f"Failed to load projects:\n{e}"),
+    )
 
 
 def load_issues(event):
-    """Load issues when a project is selected"""
-    for row in issues_tree.get_children():
-        issues_tree.delete(row)
+    """Stream issues of the selected project into the table, page by page"""
+    issues_table.clear()
 
     selected_item = projects_tree.selection()
     if not selected_item:
@@ -77,21 +118,22 @@ def load_issues(event):
 
     project_key = projects_tree.item(selected_item[0], "values")[0]
 
-    try:
-        token = get_valid_access_token(CLIENT_ID, CLIENT_SECRET)
-        issues = get_issues(token, cloudid, project_key)
-        for issue in issues:
-            issues_tree.insert(
-                "",
-                "end",
-                values=(
-                    issue["key"],
-                    issue["fields"]["summary"],
-                    issue["fields"]["status"]["name"],
-                ),
-            )
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to load issues:\n{e}")
+    def run(cancel):
+        token = get_access_token()
+        page = []
+        for issue in iter_issues(token, cloudid, project_key):
+            if cancel.cancelled:
+                return
+            page.append(issue)
+            if len(page) >= 100:
+                ui.post(lambda p=page: cancel.cancelled or issues_table.append(p))
+                page = []
+        if page:
+            ui.post(lambda: cancel.cancelled or issues_table.append(page))
+
+    runner.submit_latest(
+        "issues", run, on_error=lambda e: messagebox.showerror("Error", f"Failed to load issues:\n{e}")
+    )
 
 
 # ---------------------------
@@ -99,8 +141,8 @@ def load_issues(event):
 # ---------------------------
 projects_tree.bind("<<TreeviewSelect>>", load_issues)
 
-# Load initial data
-load_projects()
+# Paint first, then load
+root.after_idle(startup)
 
 # ---------------------------
 root.mainloop()
@@ -0,0 +1,123 @@
+import codecs
+import json
+
+WHITESPACE = " \t\n\r"
+VALUE_END = WHITESPACE + ",:]}"  # what may follow a complete value
+_decoder = json.JSONDecoder()
+_MORE = object()  # the buffer ends inside the next value
+
+
+# ---------------------------
+# Incremental array decoding
+# ---------------------------
+class JSONArrayStream:
+    """
+    Incremental decoder for a JSON object built around one large array, such
+    as a search page {"startAt": 0, "maxResults": 100, "total": 1234,
+    "issues": [...]}.
+
+    Text is fed in chunks as it arrives; every element of the `key` array is
+    returned as soon as its closing bracket is in, and the object's other
+    members are stored in `meta`. Only the element being read is buffered,
+    never the whole document. Each value is parsed by json's C scanner
+    (raw_decode); a value cut by a chunk boundary is simply retried once
+    more text is in.
+    """
+
+    def __init__(self, key, meta=None):
+        self.key = key
+        self.meta = {} if meta is None else meta
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"
+        self._name = None
+        self._eof = False
+
+    def _peek(self):
+        """Next non-whitespace character (position left on it), None at the end of the buffer."""
+        buf, pos = self._buf, self._pos
+        while pos < len(buf) and buf[pos] in WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return buf[pos] if pos < len(buf) else None
+
+    def _value(self):
+        try:
+            value, end = _decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if self._eof:
+                raise
+            return _MORE
+        if not self._eof and (end == len(self._buf) or self._buf[end] not in VALUE_END):
+            return _MORE  # a number cut after "12500." or "1e" goes on in the next chunk
+        self._pos = end
+        return value
+
+    def _expect(self, char, found):
+        if found != char:
+            raise ValueError(f"Expected {char!r} at offset {self._pos} of the JSON buffer, found {found!r}")
+        self._pos += 1
+
+    def _parse(self):
+        items = []
+        while True:
+            c = self._peek()
+            if c is None:
+                return items
+            state = self._state
+            if state == "start":
+                self._expect("{", c)
+                self._state = "name"
+            elif state == "name":
+                if c in ",}":
+                    self._pos += 1
+                    self._state = "done" if c == "}" else "name"
+                    continue
+                name = self._value()
+                if name is _MORE:
+                    return items
+                self._name, self._state = name, "colon"
+            elif state == "colon":
+                self._expect(":", c)
+                self._state = "array" if self._name == self.key else "value"
+            elif state == "array" and c == "[":
+                self._pos += 1
+                self._state = "items"
+            elif state in ("value", "array"):  # the array member may also be null
+                value = self._value()
+                if value is _MORE:
+                    return items
+                self.meta[self._name] = value
+                self._state = "name"
+            elif state == "items":
+                if c in ",]":
+                    self._pos += 1
+                    self._state = "name" if c == "]" else "items"
+                    continue
+                item = self._value()
+                if item is _MORE:
+                    return items
+                items.append(item)
+            else:
+                raise ValueError(f"Unexpected {c!r} after the end of the JSON document")
+
+    def feed(self, text):
+        """Add a chunk of text; returns the array elements it completed."""
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        return self._parse()
+
+    def close(self, text=""):
+        """Add the last chunk; returns the remaining elements. Raises ValueError if the document is cut short."""
+        self._eof = True
+        items = self.feed(text)
+        if self._state != "done":
+            raise ValueError("JSON document ended early")
+        return items
+
+    def decode(self, chunks, encoding="utf-8"):
+        """Yield the array elements from an iterable of byte chunks, as each one completes."""
+        decoder = codecs.getincrementaldecoder(encoding)()
+        for chunk in chunks:
+            yield from self.feed(decoder.decode(chunk))
+        yield from self.close(decoder.decode(b"", final=True))
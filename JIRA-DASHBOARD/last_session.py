@@ -0,0 +1,42 @@
+import json
+import os
+
+from token_manager import atomic_write_json
+
+LAST_SESSION_FILE = "last_session.json"
+
+# Only what the project lists need; the rest of the project JSON is not kept
+PROJECT_KEYS = ("id", "key", "name")
+
+
+def load_last_session(path=LAST_SESSION_FILE):
+    """
+    Return what the dashboards showed last time, or {} if there is nothing
+    usable: {"site": {...}, "projects": [...], "usage": {"site/project": n}}.
+    Local file only, so it is safe to call before the first paint.
+    """
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            session = json.load(f)
+        return session if isinstance(session, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_last_session(site=None, projects=None, usage=None, path=LAST_SESSION_FILE):
+    """Remember the selected site, its projects and/or project usage counts for the next startup."""
+    session = load_last_session(path)
+    if site is not None:
+        if session.get("site", {}).get("id") != site.get("id"):
+            session.pop("projects", None)
+        session["site"] = {k: site.get(k) for k in ("id", "name", "url")}
+    if projects is not None:
+        session["projects"] = [{k: p.get(k) for k in PROJECT_KEYS} for p in projects]
+    if usage is not None:
+        session["usage"] = dict(usage)
+    try:
+        atomic_write_json(path, session)
+    except OSError as e:
+        print(f"⚠️ Could not save {path}: {e}")
@@ -0,0 +1,204 @@
+import re
+import threading
+from collections import defaultdict
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Collapse the variable parts of Jira URLs so one endpoint is one series
+_PATH_RULES = [
+    (re.compile(r"/ex/jira/[^/]+"), "/ex/jira/{cloudid}"),
+    (re.compile(r"/(issue|project|user)/[A-Za-z0-9_.-]+(?=/|$)"), r"/\1/{id}"),
+]
+
+
+def endpoint_name(method, url):
+    """'POST /ex/jira/{cloudid}/rest/api/3/search' for any request URL."""
+    path = re.sub(r"^[a-z]+://[^/]+", "", url).split("?", 1)[0]
+    for pattern, repl in _PATH_RULES:
+        path = pattern.sub(repl, path)
+    return f"{method.upper()} {path or '/'}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ---------------------------
+# Histogram
+# ---------------------------
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus style) plus max, for one series."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot = +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, n in enumerate(self.counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.max
+            if n and seen + n >= rank:
+                return min(self.max, lower + (upper - lower) * (rank - seen) / n)
+            seen += n
+            lower = upper
+        return self.max
+
+
+# ---------------------------
+# Registry
+# ---------------------------
+class EndpointStats:
+    __slots__ = ("latency", "statuses", "errors", "retries", "bytes")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.statuses = defaultdict(int)  # status code (or "error") -> count
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+
+
+class Metrics:
+    """
+    Process-wide request, cache and token statistics. JiraClient and
+    AsyncJiraClient call record_request() for every HTTP call; the shared
+    TTLCache reports lookups through record_cache().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = defaultdict(EndpointStats)
+            self._cache = defaultdict(lambda: [0, 0])  # kind -> [hits, misses]
+            self._counters = defaultdict(int)          # (name, labels) -> value
+
+    # ---- Recording ----
+    def record_request(self, event):
+        """
+        Record one request. `event` holds method, url, seconds and optionally
+        status (None if the request raised), bytes and retries.
+        """
+        name = endpoint_name(event["method"], event["url"])
+        status = event.get("status")
+        with self._lock:
+            stats = self._endpoints[name]
+            stats.latency.observe(event["seconds"])
+            stats.statuses[status or "error"] += 1
+            if status is None or status >= 400:
+                stats.errors += 1
+            stats.retries += event.get("retries", 0)
+            stats.bytes += event.get("bytes", 0)
+
+    def record_cache(self, kind, hit):
+        with self._lock:
+            self._cache[kind][0 if hit else 1] += 1
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            self._counters[(name, tuple(sorted(labels.items())))] += value
+
+    # ---- Reading ----
+    def endpoint_summary(self):
+        """One dict per endpoint, slowest total time first (for the Diagnostics view)."""
+        with self._lock:
+            rows = [
+                {
+                    "endpoint": name,
+                    "calls": s.latency.count,
+                    "errors": s.errors,
+                    "retries": s.retries,
+                    "total_s": s.latency.sum,
+                    "avg_ms": s.latency.sum / s.latency.count * 1000 if s.latency.count else 0.0,
+                    "p50_ms": s.latency.quantile(0.5) * 1000,
+                    "p95_ms": s.latency.quantile(0.95) * 1000,
+                    "max_ms": s.latency.max * 1000,
+                    "avg_kb": s.bytes / s.latency.count / 1024 if s.latency.count else 0.0,
+                }
+                for name, s in self._endpoints.items()
+            ]
+        return sorted(rows, key=lambda r: r["total_s"], reverse=True)
+
+    def cache_summary(self):
+        with self._lock:
+            return {kind: {"hits": h, "misses": m} for kind, (h, m) in self._cache.items()}
+
+    def counters(self):
+        with self._lock:
+            return {(name, labels): v for (name, labels), v in self._counters.items()}
+
+    def render_prometheus(self):
+        """Text exposition format (version 0.0.4) of everything recorded."""
+        def label_str(**labels):
+            inner = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            return "{" + inner + "}" if inner else ""
+
+        lines = [
+            "# HELP jira_request_duration_seconds Latency of Jira HTTP requests.",
+            "# TYPE jira_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            for name, s in endpoints:
+                cumulative = 0
+                for bound, n in zip(s.latency.buckets + ("+Inf",), s.latency.counts):
+                    cumulative += n
+                    lines.append(f"jira_request_duration_seconds_bucket{label_str(endpoint=name, le=bound)} {cumulative}")
+                lines.append(f"jira_request_duration_seconds_sum{label_str(endpoint=name)} {s.latency.sum:.6f}")
+                lines.append(f"jira_request_duration_seconds_count{label_str(endpoint=name)} {s.latency.count}")
+
+            lines += ["# HELP jira_requests_total Jira HTTP requests by status.",
+                      "# TYPE jira_requests_total counter"]
+            for name, s in endpoints:
+                for status, n in sorted(s.statuses.items(), key=lambda kv: str(kv[0])):
+                    lines.append(f"jira_requests_total{label_str(endpoint=name, status=status)} {n}")
+
+            lines += ["# HELP jira_request_retries_total Retried Jira HTTP requests.",
+                      "# TYPE jira_request_retries_total counter"]
+            lines += [f"jira_request_retries_total{label_str(endpoint=name)} {s.retries}" for name, s in endpoints]
+
+            lines += ["# HELP jira_response_bytes_total Bytes received from Jira.",
+                      "# TYPE jira_response_bytes_total counter"]
+            lines += [f"jira_response_bytes_total{label_str(endpoint=name)} {s.bytes}" for name, s in endpoints]
+
+            lines += ["# HELP jira_cache_lookups_total Metadata cache lookups.",
+                      "# TYPE jira_cache_lookups_total counter"]
+            for kind, (hits, misses) in sorted(self._cache.items()):
+                lines.append(f"jira_cache_lookups_total{label_str(kind=kind, result='hit')} {hits}")
+                lines.append(f"jira_cache_lookups_total{label_str(kind=kind, result='miss')} {misses}")
+
+            names = sorted({name for name, _ in self._counters})
+            for counter in names:
+                lines.append(f"# TYPE {counter} counter")
+                for (name, labels), v in sorted(self._counters.items()):
+                    if name == counter:
+                        lines.append(f"{name}{label_str(**dict(labels))} {v}")
+        return "\n".join(lines) + "\n"
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """Return the process-wide Metrics registry."""
+    return _metrics
@@ -0,0 +1,192 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from issue_store import sync_project
+from task_runner import CancelToken
+from ttl_cache import keys_with_prefix
+
+# The project view's query; part of every cache key so other queries can share the LRU
+PROJECT_JQL = "ORDER BY created DESC"
+
+DEFAULT_MAX_ISSUES = 100_000  # Issue records are fixed-size slots, so this bounds memory
+DEFAULT_FRESH_FOR = 60        # seconds a synced project counts as fresh
+
+
+# ---------------------------
+# Memory-bounded issue LRU
+# ---------------------------
+class IssueLRU:
+    """
+    Issue lists keyed by (site, project, jql), least recently used dropped
+    first once the total number of cached issues exceeds `max_issues`.
+    """
+
+    def __init__(self, max_issues=DEFAULT_MAX_ISSUES):
+        self.max_issues = max_issues
+        self.size = 0
+        self._data = OrderedDict()  # key -> list of Issue
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            issues = self._data.get(key)
+            if issues is not None:
+                self._data.move_to_end(key)
+            return issues
+
+    def put(self, key, issues):
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._data[key] = issues
+            self.size += len(issues)
+            # Always keep the newest entry, even if it alone is over the bound
+            while self.size > self.max_issues and len(self._data) > 1:
+                _, dropped = self._data.popitem(last=False)
+                self.size -= len(dropped)
+
+    def invalidate(self, *prefix):
+        """Forget the issue lists of a site, a project or one query, e.g. after a pushed change."""
+        with self._lock:
+            for key in keys_with_prefix(self._data, prefix):
+                self.size -= len(self._data.pop(key))
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
+# ---------------------------
+# Speculative prefetcher
+# ---------------------------
+class Prefetcher:
+    """
+    Warms the IssueStore and the LRU for projects the user is likely to open
+    next: the neighbours of the selected project and the most used ones.
+
+    - Runs on its own small pool (`max_workers`), apart from the TaskRunner.
+    - Yields to the user: while a user_request() is open, prefetches pause
+      between batches (unless they are loading that very project), and a
+      prefetch of the project being opened is not started at all.
+    - A new schedule() drops prefetches of the previous one that have not
+      started yet; projects synced within `fresh_for` seconds are skipped.
+    """
+
+    def __init__(self, store, get_token, cache=None, max_workers=2, neighbours=2, top=3,
+                 fresh_for=DEFAULT_FRESH_FOR, usage=None):
+        self.store = store
+        self.get_token = get_token
+        self.cache = cache if cache is not None else IssueLRU()
+        self.neighbours = neighbours
+        self.top = top
+        self.fresh_for = fresh_for
+        self.usage = Counter(usage or {})  # "site/project" -> times opened
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._idle = threading.Condition()
+        self._busy = 0
+        self._wanted = set()  # (site, project) of open user requests
+        self._pending = []    # futures of the current schedule
+        self._running = {}    # (site, project) -> CancelToken
+        self._closed = False
+
+    # ---- User requests ----
+    @contextmanager
+    def user_request(self, site, project):
+        """Mark a user-initiated load; prefetching yields until it finishes."""
+        with self._idle:
+            self._busy += 1
+            self._wanted.add((site, project))
+        try:
+            yield
+        finally:
+            with self._idle:
+                self._busy -= 1
+                self._wanted.discard((site, project))
+                self._idle.notify_all()
+
+    def wait_for(self, site, project):
+        """Block while a prefetch of this project is running, so it is not loaded twice."""
+        with self._idle:
+            while (site, project) in self._running:
+                self._idle.wait(0.1)
+
+    def _yield_to_user(self, site, project, token):
+        with self._idle:
+            while self._busy and (site, project) not in self._wanted and not token.cancelled:
+                self._idle.wait(0.1)
+
+    def record_use(self, site, project):
+        self.usage[f"{site}/{project}"] += 1
+
+    def is_fresh(self, site, project):
+        watermark = self.store.get_watermark(site, project)
+        return watermark is not None and time.time() - watermark < self.fresh_for
+
+    # ---- Scheduling ----
+    def candidates(self, site, project_keys, selected=None):
+        """Projects to warm, most likely first: neighbours of `selected`, then the most used."""
+        keys = []
+        if selected is not None and selected in project_keys:
+            i = project_keys.index(selected)
+            for d in range(1, self.neighbours + 1):
+                keys += [project_keys[j] for j in (i + d, i - d) if 0 <= j < len(project_keys)]
+        available = set(project_keys)
+        prefix = f"{site}/"
+        for name, _ in self.usage.most_common():
+            if len(keys) >= self.neighbours * 2 + self.top:
+                break
+            if name.startswith(prefix) and name[len(prefix):] in available:
+                keys.append(name[len(prefix):])
+        seen = {selected}
+        return [k for k in keys if not (k in seen or seen.add(k))]
+
+    def schedule(self, site, project_keys, selected=None):
+        """Replace pending prefetches with the candidates around `selected`."""
+        with self._idle:
+            if self._closed:
+                return
+            for future in self._pending:
+                future.cancel()
+            self._pending = [
+                self._executor.submit(self._warm, site, key)
+                for key in self.candidates(site, project_keys, selected)
+            ]
+
+    def _warm(self, site, project):
+        cache_key = (site, project, PROJECT_JQL)
+        if self.is_fresh(site, project) and cache_key in self.cache:
+            return
+        with self._idle:
+            # A user load of this project is open: it does the sync, a second one would race it
+            if (site, project) in self._running or (site, project) in self._wanted or self._closed:
+                return
+            token = self._running[(site, project)] = CancelToken()
+        try:
+            self._yield_to_user(site, project, token)
+            if not self.is_fresh(site, project):
+                sync_project(
+                    self.store, self.get_token(), site, project, cancel_token=token,
+                    on_batch=lambda batch: self._yield_to_user(site, project, token),
+                )
+            if not token.cancelled:
+                self.cache.put(cache_key, self.store.get_issues(site, project))
+        except Exception as e:
+            print(f"⚠️ Prefetch of {project} failed: {e}")
+        finally:
+            with self._idle:
+                self._running.pop((site, project), None)
+                self._idle.notify_all()
+
+    def shutdown(self):
+        with self._idle:
+            self._closed = True
+            for token in self._running.values():
+                token.cancel()
+            self._idle.notify_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,212 @@
+import asyncio
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from metrics import get_metrics
+
+DEFAULT_RATE = None          # requests per second; None = unpaced until Jira first throttles
+DEFAULT_MAX_CONCURRENCY = 64
+MIN_RATE = 1.0
+RETRY_STATUSES = {429, 502, 503, 504}
+BACKOFF_BASE = 0.25
+BACKOFF_MAX = 20
+MAX_PAUSE = 60               # never trust a header asking us to stop for longer than this
+POLL = 0.05                  # async waiters re-check this often for a free slot
+
+
+def retry_after(headers):
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), or None."""
+    value = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def rate_limit_reset(headers):
+    """Seconds until X-RateLimit-Reset (an ISO 8601 timestamp in Jira Cloud), or None."""
+    value = headers.get("X-RateLimit-Reset") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, datetime.fromisoformat(value.strip().replace("Z", "+00:00")).timestamp() - time.time())
+    except ValueError:
+        return None
+
+
+def backoff(attempt, cap=BACKOFF_MAX):
+    """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+    return random.uniform(0, min(cap, BACKOFF_BASE * 2 ** attempt))
+
+
+# ---------------------------
+# Process-wide request governor
+# ---------------------------
+class RateGovernor:
+    """
+    Admission control shared by every Jira request of the process, sync or
+    async, whatever thread it runs on.
+
+    - A token bucket paces requests to `rate` per second (bursts of `burst`,
+      default one second's worth). With rate=None nothing is paced until the
+      first throttled answer; the bucket then starts at half the rate that
+      was being sent.
+    - At most `limit` requests are in flight. Both the limit and the rate
+      follow AIMD: each success adds 1/limit (resp. 1/rate), so they grow by
+      about one per round; a throttled answer (429, or 503 with Retry-After)
+      halves them, once per round - answers to requests admitted before the
+      last cut do not cut again. Answers flagged X-RateLimit-NearLimit
+      stop the increase.
+    - Retry-After, and X-RateLimit-Remaining: 0 with X-RateLimit-Reset, pause
+      every caller until then, so a spent budget costs a wait, not errors.
+
+    Use acquire() / acquire_async() before sending and release(ticket, ...)
+    with the answer's status and headers afterwards.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=None, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self.max_rate = float(rate) if rate else math.inf
+        self.max_concurrency = max_concurrency
+        self.rate = self.max_rate
+        self.burst = burst
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.throttled = 0
+        self._tokens = 1.0
+        self._sent = deque()  # admission times of the last second, to seed the rate on the first cut
+        self._refilled = time.monotonic()
+        self._paused_until = 0.0
+        self._last_cut = 0.0
+        self._lock = threading.Lock()
+        self._freed = threading.Condition(self._lock)
+
+    def _try_acquire(self):
+        """Admit now (returns 0) or return seconds to wait. Caller holds the lock."""
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self.in_flight >= max(1, int(self.limit)):
+            return POLL  # sync callers are woken by release() earlier
+        if self.rate != math.inf:
+            capacity = self.burst or max(1.0, self.rate)
+            self._tokens = min(capacity, self._tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+            self._tokens -= 1
+        elif self.max_rate == math.inf:
+            self._sent.append(now)
+            while self._sent[0] < now - 1:
+                self._sent.popleft()
+        self.in_flight += 1
+        return 0
+
+    def acquire(self):
+        """Block until a request may be sent; returns the ticket to pass to release()."""
+        with self._freed:
+            while True:
+                wait = self._try_acquire()
+                if not wait:
+                    return time.monotonic()
+                self._freed.wait(wait)
+
+    async def acquire_async(self):
+        """acquire() for coroutines: waits with asyncio.sleep, never blocking the loop."""
+        while True:
+            with self._lock:
+                wait = self._try_acquire()
+            if not wait:
+                return time.monotonic()
+            await asyncio.sleep(min(wait, POLL))
+
+    def release(self, ticket, status=None, headers=None):
+        """Return the slot taken at `ticket` and learn from the answer (status None = no answer)."""
+        throttled = status == 429 or (status == 503 and retry_after(headers) is not None)
+        near_limit = headers is not None and headers.get("X-RateLimit-NearLimit", "").lower() == "true"
+        with self._freed:
+            self.in_flight -= 1
+            now = time.monotonic()
+            pause = None
+            if throttled:
+                self.throttled += 1
+                pause = retry_after(headers)
+                if ticket >= self._last_cut:
+                    self._cut(now)
+            elif status is not None and status < 500 and not near_limit:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                self.rate = min(self.max_rate, self.rate + 1 / self.rate)
+            if headers is not None and headers.get("X-RateLimit-Remaining", "").strip() == "0":
+                reset = rate_limit_reset(headers)
+                if reset:
+                    pause = max(pause or 0, reset)
+            if pause:
+                self._paused_until = max(self._paused_until, now + min(pause, MAX_PAUSE))
+            self._freed.notify_all()
+        if throttled:
+            get_metrics().inc("jira_rate_limited_total")
+
+    def _cut(self, now):
+        self._last_cut = now
+        self.limit = max(1.0, self.limit / 2)
+        if self.rate == math.inf:
+            while self._sent and self._sent[0] < now - 1:
+                self._sent.popleft()
+            self.rate = len(self._sent)
+            self._sent.clear()
+        self.rate = max(MIN_RATE, self.rate / 2)
+        self._tokens = min(self._tokens, 1.0)
+        self._refilled = now
+
+    def state(self):
+        with self._lock:
+            return {
+                "rate": None if self.rate == math.inf else round(self.rate, 2),
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 3),
+                "throttled": self.throttled,
+            }
+
+
+# ---------------------------
+# Shared governor
+# ---------------------------
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor():
+    """
+    Return the process-wide RateGovernor, creating it on first use.
+    JIRA_RATE_LIMIT (requests per second) and JIRA_MAX_CONCURRENCY in the
+    environment (or .jenv) override the defaults.
+    """
+    global _governor
+    if _governor is None:
+        with _governor_lock:
+            if _governor is None:
+                _governor = RateGovernor(
+                    rate=float(os.getenv("JIRA_RATE_LIMIT", 0)) or DEFAULT_RATE,
+                    max_concurrency=int(os.getenv("JIRA_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+                )
+    return _governor
+
+
+def set_governor(governor):
+    """Replace the shared governor (e.g. with another rate for a benchmark)."""
+    global _governor
+    with _governor_lock:
+        _governor = governor
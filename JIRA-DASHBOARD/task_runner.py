@@ -0,0 +1,129 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = 4
+
+
+class CancelToken:
+    """Cooperative cancellation flag handed to long-running tasks."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class _Job:
+    def __init__(self, key):
+        self.key = key
+        self.token = CancelToken()
+        self.future = None
+        self.holders = 0
+
+
+# ---------------------------
+# Bounded background executor
+# ---------------------------
+class TaskRunner:
+    """
+    One bounded thread pool for all dashboard background work.
+
+    - At most `max_workers` tasks (and so Jira calls) run at once.
+    - Tasks submitted with the same `key` while one is in flight share it.
+    - submit_latest() tracks a generation per channel (e.g. "issues"): a new
+      submission supersedes the previous one, whose callbacks are dropped and
+      whose job is cancelled (before it starts, or cooperatively through its
+      CancelToken) unless a newer submission coalesced onto it.
+
+    Callbacks run on the Tk main thread, handed over by `post(fn)` (e.g. a
+    UIQueue's post; defaults to widget.after(0, fn)).
+    """
+
+    def __init__(self, widget, max_workers=DEFAULT_WORKERS, post=None):
+        self.widget = widget
+        self.post = post or (lambda fn: widget.after(0, fn))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dashboard")
+        # re-entrant: cancelling a future runs its done-callbacks synchronously
+        self._lock = threading.RLock()
+        self._inflight = {}     # key -> _Job
+        self._generations = {}  # channel -> int
+        self._current = {}      # channel -> _Job
+
+    def _job_for(self, key, fn, args, pass_token):
+        """Return the in-flight job for `key`, or start a new one. Caller holds the lock."""
+        if key is not None:
+            job = self._inflight.get(key)
+            if job is not None and not job.future.done() and not job.token.cancelled:
+                return job
+
+        job = _Job(key)
+        call_args = (job.token,) + args if pass_token else args
+        job.future = self._executor.submit(fn, *call_args)
+        if key is not None:
+            self._inflight[key] = job
+            job.future.add_done_callback(lambda _f, j=job: self._forget(j))
+        return job
+
+    def _forget(self, job):
+        with self._lock:
+            if self._inflight.get(job.key) is job:
+                del self._inflight[job.key]
+
+    def _release(self, job):
+        job.holders -= 1
+        if job.holders <= 0:
+            job.token.cancel()
+            job.future.cancel()
+
+    def _deliver(self, future, on_done, on_error, is_current=lambda: True):
+        if future.cancelled() or not is_current():
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            if on_error:
+                self.post(lambda err=e: is_current() and on_error(err))
+            return
+        if on_done:
+            self.post(lambda: is_current() and on_done(result))
+
+    def submit(self, fn, *args, key=None, on_done=None, on_error=None):
+        """Run fn(*args) in the pool; identical in-flight keys are coalesced."""
+        with self._lock:
+            job = self._job_for(key, fn, args, pass_token=False)
+            job.holders += 1  # never released: plain submissions are not superseded
+        job.future.add_done_callback(lambda f: self._deliver(f, on_done, on_error))
+        return job.future
+
+    def submit_latest(self, channel, fn, *args, key=None, on_done=None, on_error=None):
+        """
+        Run fn(token, *args) as the newest request of `channel`. Only the
+        latest submission of a channel gets its callbacks; fn should check
+        token.cancelled between steps and stop early when it is set.
+        """
+        with self._lock:
+            generation = self._generations.get(channel, 0) + 1
+            self._generations[channel] = generation
+            job = self._job_for(key, fn, args, pass_token=True)
+            job.holders += 1
+            previous = self._current.get(channel)
+            self._current[channel] = job
+            if previous is not None:
+                self._release(previous)
+
+        def is_current():
+            return self._generations.get(channel) == generation
+
+        job.future.add_done_callback(lambda f: self._deliver(f, on_done, on_error, is_current))
+        return job.future
+
+    def shutdown(self):
+        with self._lock:
+            for job in self._current.values():
+                job.token.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,55 @@
+import json
+import unittest
+
+from json_stream import JSONArrayStream
+
+PAGE = {
+    "expand": "names,schema",
+    "startAt": 0,
+    "maxResults": 100,
+    "total": 12500.0,
+    "ratio": -1.5e-3,
+    "issues": [
+        {"id": "10001", "key": "ABC-1", "fields": {"summary": "Crash on \"save\"", "story_points": 3.25,
+                                                   "estimate": 1e3, "assignee": None, "flagged": True}},
+        {"id": "10002", "key": "ABC-2", "fields": {"summary": "Übersetzung – ✓", "story_points": -0.5,
+                                                   "labels": ["a", "b"], "flagged": False}},
+        [],
+        7,
+        -12.75E+2,
+    ],
+    "warnings": [],
+    "isLast": False,
+}
+
+
+class JSONArrayStreamTest(unittest.TestCase):
+    def decode(self, chunks):
+        meta = {}
+        items = list(JSONArrayStream("issues", meta).decode(chunks))
+        return meta, items
+
+    def test_split_at_every_offset(self):
+        for text in (json.dumps(PAGE), json.dumps(PAGE, indent=2, ensure_ascii=False)):
+            data = text.encode("utf-8")
+            expected_meta = {k: v for k, v in PAGE.items() if k != "issues"}
+            for cut in range(len(data) + 1):
+                with self.subTest(cut=cut, text=data[max(0, cut - 10):cut + 10]):
+                    meta, items = self.decode([data[:cut], data[cut:]])
+                    self.assertEqual(items, PAGE["issues"])
+                    self.assertEqual(meta, expected_meta)
+
+    def test_one_byte_chunks(self):
+        data = json.dumps(PAGE).encode("utf-8")
+        meta, items = self.decode([data[i:i + 1] for i in range(len(data))])
+        self.assertEqual(items, PAGE["issues"])
+        self.assertEqual(meta["total"], 12500.0)
+
+    def test_truncated_document(self):
+        data = json.dumps(PAGE).encode("utf-8")
+        with self.assertRaises(ValueError):
+            self.decode([data[:-1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+REFRESH_MARGIN = 300  # refresh this many seconds before expires_at
+EXPIRY_MARGIN = 30    # never hand out a token closer than this to expiry
+
+
+# ---------------------------
+# Cross-process file lock
+# ---------------------------
+class FileLock:
+    """
+    Exclusive lock on `<path>` shared by every process using the same file.
+    Re-entrant within a process, so a locked refresh can call save_tokens.
+    """
+
+    def __init__(self, path, poll=0.05):
+        self.path = path
+        self.poll = poll
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._fh = None
+
+    def acquire(self):
+        self._rlock.acquire()
+        self._depth += 1
+        if self._depth > 1:
+            return
+        try:
+            self._fh = open(self.path, "a+")
+            if fcntl:
+                fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        self._fh.seek(0)
+                        msvcrt.locking(self._fh.fileno(), msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(self.poll)
+        except Exception:
+            self._depth -= 1
+            if self._fh:
+                self._fh.close()
+                self._fh = None
+            self._rlock.release()
+            raise
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                if fcntl:
+                    fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+                else:
+                    self._fh.seek(0)
+                    msvcrt.locking(self._fh.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                self._fh.close()
+                self._fh = None
+        self._rlock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def atomic_write_json(path, data):
+    """Write JSON to a temp file in the same directory, then rename over `path`."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix="." + os.path.basename(path) + "-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# ---------------------------
+# Token manager
+# ---------------------------
+class TokenManager:
+    """
+    Keeps tokens.json in memory and hands out valid access tokens.
+
+    - The file is only re-parsed when its mtime changes (another process wrote it).
+    - Tokens are refreshed REFRESH_MARGIN seconds before they expire.
+    - Within a process only one caller refreshes; the others wait and reuse
+      its result (or keep using the current token while it is still valid).
+    - Across processes the refresh and every write happen under a file lock,
+      and the file is re-read inside the lock, so a rotating refresh token is
+      never spent twice.
+    """
+
+    def __init__(self, tokens_file, refresh_margin=REFRESH_MARGIN, expiry_margin=EXPIRY_MARGIN):
+        self.tokens_file = tokens_file
+        self.refresh_margin = refresh_margin
+        self.expiry_margin = expiry_margin
+        self.file_lock = FileLock(tokens_file + ".lock")
+        self._refresh_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._tokens = None
+        self._mtime = None
+
+    # ---- Storage ----
+    def load(self):
+        """Return the current tokens, re-reading the file only if it changed."""
+        try:
+            mtime = os.stat(self.tokens_file).st_mtime_ns
+        except FileNotFoundError:
+            return self._tokens
+        with self._cache_lock:
+            if mtime != self._mtime:
+                with open(self.tokens_file) as f:
+                    self._tokens = json.load(f)
+                self._mtime = mtime
+            return self._tokens
+
+    def store(self, tokens):
+        """Atomically persist tokens (adding expires_at) under the file lock."""
+        tokens = dict(tokens)
+        if "expires_in" in tokens:
+            tokens["expires_at"] = int(time.time()) + tokens["expires_in"]
+        with self.file_lock:
+            current = self.load()
+            # Non-rotating refresh responses omit refresh_token; keep the old one
+            if "refresh_token" not in tokens and current and current.get("refresh_token"):
+                tokens["refresh_token"] = current["refresh_token"]
+            atomic_write_json(self.tokens_file, tokens)
+            with self._cache_lock:
+                self._tokens = tokens
+                self._mtime = os.stat(self.tokens_file).st_mtime_ns
+        return tokens
+
+    # ---- Access ----
+    def _remaining(self, tokens):
+        return tokens.get("expires_at", 0) - time.time()
+
+    def get_access_token(self, refresh):
+        """
+        Return a valid access token. `refresh(refresh_token)` is called at most
+        once per expiry across threads and processes; it must return the new
+        tokens (already stored) or None on failure.
+        """
+        tokens = self.load()
+        if not tokens:
+            raise Exception("❌ No tokens found. Run the Flask login flow first.")
+        if self._remaining(tokens) > self.refresh_margin:
+            return tokens["access_token"]
+
+        # Someone else is refreshing and the current token still works: don't wait
+        if self._remaining(tokens) > self.expiry_margin and self._refresh_lock.locked():
+            return tokens["access_token"]
+
+        with self._refresh_lock:
+            tokens = self.load()
+            if self._remaining(tokens) > self.refresh_margin:
+                return tokens["access_token"]
+
+            with self.file_lock:
+                # Another process may have refreshed while we waited for the lock
+                tokens = self.load()
+                if self._remaining(tokens) > self.refresh_margin:
+                    return tokens["access_token"]
+
+                print("⚠️ Access token expired or near expiry. Refreshing...")
+                new_tokens = refresh(tokens.get("refresh_token"))
+                if not new_tokens:
+                    if self._remaining(tokens) > self.expiry_margin:
+                        return tokens["access_token"]
+                    raise Exception("❌ Could not refresh access token.")
+                return new_tokens["access_token"]
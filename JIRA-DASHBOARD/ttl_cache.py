@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+def keys_with_prefix(keys, prefix):
+    """The tuple keys that start with `prefix` (all of them for an empty prefix)."""
+    n = len(prefix)
+    return [k for k in keys if k[:n] == prefix]
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache whose entries expire after `ttl` seconds.
+    Keys are tuples; invalidate() drops every key starting with a prefix.
+    `on_lookup(key, hit)`, if given, is called after every get().
+    """
+
+    def __init__(self, ttl=300, maxsize=256, on_lookup=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.on_lookup = on_lookup
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            hit = entry is not None and entry[0] >= time.monotonic()
+            if hit:
+                self._data.move_to_end(key)
+                self.hits += 1
+            else:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+        if self.on_lookup:
+            self.on_lookup(key, hit)
+        return entry[1] if hit else default
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for key, calling loader() and caching on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, *prefix):
+        """Drop entries whose key starts with `prefix` (everything if no prefix)."""
+        with self._lock:
+            if not prefix:
+                self._data.clear()
+                return
+            for key in keys_with_prefix(self._data, prefix):
+                del self._data[key]
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,65 @@
+import threading
+import time
+
+DEFAULT_MAX_FPS = 30
+IDLE_INTERVAL = 0.1  # seconds between polls while nothing is being posted
+
+
+# ---------------------------
+# Coalescing UI update queue
+# ---------------------------
+class UIQueue:
+    """
+    The one channel through which background threads change the UI.
+
+    Workers call post() from any thread; nothing there touches Tk. The Tk
+    thread drains the queue on its own timer: at most `max_fps` times a
+    second while updates keep coming, every IDLE_INTERVAL when quiet. A
+    burst of posts therefore costs one redraw per frame, and an idle window
+    costs a few cheap timer ticks a second.
+
+    - post(fn) runs fn on the Tk thread, in posting order.
+    - post(fn, key=...) keeps only the latest fn per key until the next frame
+      (state such as a status line, where only the newest value matters).
+    """
+
+    def __init__(self, widget, max_fps=DEFAULT_MAX_FPS):
+        self.widget = widget
+        self.frame = 1.0 / max_fps
+        self._lock = threading.Lock()
+        self._pending = {}  # key -> fn, in posting order
+        self._seq = 0
+        self._closed = False
+        self._job = widget.after(int(IDLE_INTERVAL * 1000), self._drain)
+
+    def post(self, fn, key=None):
+        with self._lock:
+            if key is None:
+                self._seq += 1
+                key = ("seq", self._seq)
+            else:
+                # Re-posting moves the update to the end, behind anything posted in between
+                self._pending.pop(key, None)
+            self._pending[key] = fn
+
+    def _drain(self):
+        self._job = None
+        if self._closed:
+            return
+        started = time.perf_counter()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for fn in pending.values():
+            try:
+                fn()
+            except Exception as e:
+                print(f"⚠️ UI update failed: {e}")
+        # Busy: next frame, minus the time this one took. Quiet: slow poll.
+        interval = self.frame - (time.perf_counter() - started) if pending else IDLE_INTERVAL
+        self._job = self.widget.after(max(1, int(interval * 1000)), self._drain)
+
+    def close(self):
+        self._closed = True
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
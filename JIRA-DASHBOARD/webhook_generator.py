@@ -0,0 +1,132 @@
+"""
+Local Jira webhook event generator, for trying the Flask webhook receiver
+without a Jira site.
+
+    WEBHOOK_SECRET=s3cret python jira_oauth_flask.py
+    python webhook_generator.py --url http://localhost:8080/webhooks/jira/<cloudid> --secret s3cret
+    python webhook_generator.py --url ... --secret s3cret --count 500 --rate 50 --duplicates 0.1 --bad 0.05
+
+Posts signed issue created / updated / deleted events shaped like Jira's,
+for issues of one synthetic project (fake_atlassian data, so they line up
+with the fake API server). --duplicates re-sends deliveries with the same
+identifier and --bad sends ones with a wrong signature; both must be
+absorbed by the receiver. Prints the responses and delivery latency.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+
+import requests
+
+from fake_atlassian import FakeJiraData, STATUSES, ASSIGNEES, jira_time
+from webhooks import sign, SIGNATURE_HEADER, DELIVERY_HEADER
+
+
+class EventGenerator:
+    """Random but consistent event stream: only existing issues are updated or deleted."""
+
+    def __init__(self, project, issues, seed=None):
+        self.project = project
+        self.rng = random.Random(seed)
+        self.issues = {}
+        for raw in FakeJiraData(1, 1, issues).issues("P0X0"):
+            key = raw["key"].replace("P0X0", project, 1)
+            self.issues[key] = dict(raw, key=key)  # copies: updates replace "fields", never edit it
+        self.next_number = len(self.issues) + 1
+
+    def _payload(self, event, raw):
+        fields = dict(raw["fields"], project={"key": self.project})
+        return {
+            "timestamp": int(time.time() * 1000),
+            "webhookEvent": event,
+            "issue_event_type_name": event.split(":")[1],
+            "issue": dict(raw, fields=fields),
+        }
+
+    def next_event(self):
+        roll = self.rng.random()
+        now = time.time()
+        if roll < 0.2 or not self.issues:
+            key = f"{self.project}-{self.next_number}"
+            self.next_number += 1
+            raw = self.issues[key] = {
+                "id": str(self.next_number), "key": key,
+                "fields": {
+                    "summary": f"Pushed issue {key}",
+                    "status": {"name": STATUSES[0]},
+                    "assignee": None,
+                    "created": jira_time(now),
+                    "updated": jira_time(now),
+                },
+            }
+            return self._payload("jira:issue_created", raw)
+        key = self.rng.choice(list(self.issues))
+        if roll < 0.9:
+            raw = self.issues[key]
+            assignee = self.rng.choice(ASSIGNEES)
+            raw["fields"] = dict(
+                raw["fields"], status={"name": self.rng.choice(STATUSES)},
+                assignee=assignee and {"displayName": assignee}, updated=jira_time(now),
+            )
+            return self._payload("jira:issue_updated", raw)
+        return self._payload("jira:issue_deleted", self.issues.pop(key))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Post signed Jira issue webhook events to a local receiver.")
+    parser.add_argument("--url", required=True, help="receiver URL, e.g. http://localhost:8080/webhooks/jira/<cloudid>")
+    parser.add_argument("--secret", required=True, help="WEBHOOK_SECRET of the receiver")
+    parser.add_argument("--project", default="P0X0")
+    parser.add_argument("--issues", type=int, default=100, help="existing issues events may touch")
+    parser.add_argument("--count", type=int, default=100, help="events to send")
+    parser.add_argument("--rate", type=float, default=10, help="events per second (0 = as fast as possible)")
+    parser.add_argument("--duplicates", type=float, default=0.0, help="fraction of deliveries sent twice")
+    parser.add_argument("--bad", type=float, default=0.0, help="fraction of deliveries with a wrong signature")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    generator = EventGenerator(args.project, args.issues, args.seed)
+    session = requests.Session()
+    results = Counter()
+    latencies = []
+
+    def deliver(body, signature, delivery):
+        started = time.perf_counter()
+        resp = session.post(args.url, data=body, timeout=10, headers={
+            "Content-Type": "application/json", SIGNATURE_HEADER: signature, DELIVERY_HEADER: delivery,
+        })
+        latencies.append(time.perf_counter() - started)
+        status = resp.json().get("status", resp.status_code) if resp.ok else resp.status_code
+        results[status] += 1
+        return resp
+
+    print(f"📨 Sending {args.count} event(s) to {args.url}")
+    started = time.perf_counter()
+    for n in range(args.count):
+        payload = generator.next_event()
+        body = json.dumps(payload).encode()
+        delivery = str(uuid.uuid4())
+        if generator.rng.random() < args.bad:
+            deliver(body, sign(args.secret + "-wrong", body), delivery)
+        resp = deliver(body, sign(args.secret, body), delivery)
+        if not resp.ok:
+            print(f"⚠️ {payload['webhookEvent']} {payload['issue']['key']}: {resp.status_code} {resp.text[:200]}")
+        if generator.rng.random() < args.duplicates:
+            deliver(body, sign(args.secret, body), delivery)
+        if args.rate:
+            time.sleep(max(0.0, (n + 1) / args.rate - (time.perf_counter() - started)))
+
+    latencies.sort()
+    print(f"✅ {sum(results.values())} deliveries in {time.perf_counter() - started:.1f}s: "
+          + ", ".join(f"{k}={v}" for k, v in sorted(results.items(), key=str)))
+    if latencies:
+        print(f"⏱️ p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+    return 0 if results.keys() <= {"applied", "stale", "duplicate", 401} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+import hashlib
+import hmac
+import json
+import os
+import queue
+import threading
+from collections import deque
+
+from issue_store import SYNC_PROJECTION
+
+SIGNATURE_HEADER = "X-Hub-Signature"              # "sha256=<hex HMAC of the raw body>"
+DELIVERY_HEADER = "X-Atlassian-Webhook-Identifier"  # same value on every retry of a delivery
+ISSUE_EVENTS = {
+    "jira:issue_created": "created",
+    "jira:issue_updated": "updated",
+    "jira:issue_deleted": "deleted",
+}
+MAX_BODY = 1024 * 1024
+HEARTBEAT = 15  # seconds between SSE keep-alive comments
+
+
+def webhook_secret():
+    """Shared secret configured on the Jira webhook (WEBHOOK_SECRET); None if not set."""
+    return os.getenv("WEBHOOK_SECRET") or None
+
+
+# ---------------------------
+# Validation
+# ---------------------------
+def sign(secret, body):
+    """Signature header value for `body` (bytes), as Jira sends it."""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret, body, header):
+    """True if `header` is the HMAC-SHA256 of the raw body under `secret` (constant-time compare)."""
+    if not header or not header.startswith("sha256="):
+        return False
+    return hmac.compare_digest(sign(secret, body), header)
+
+
+def parse_event(payload):
+    """
+    Validate a Jira issue webhook payload and return (kind, project, Issue),
+    kind being "created", "updated" or "deleted". Raises ValueError for
+    anything else (other events, missing issue key or fields).
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Payload is not a JSON object")
+    kind = ISSUE_EVENTS.get(payload.get("webhookEvent"))
+    if kind is None:
+        raise ValueError(f"Unsupported webhook event: {payload.get('webhookEvent')!r}")
+    raw = payload.get("issue")
+    if not isinstance(raw, dict) or not isinstance(raw.get("key"), str) or "-" not in raw["key"]:
+        raise ValueError("Event has no valid issue key")
+    fields = raw.get("fields")
+    if not isinstance(fields, dict):
+        raise ValueError(f"Event for {raw['key']} has no issue fields")
+    project = (fields.get("project") or {}).get("key") or raw["key"].rsplit("-", 1)[0]
+    try:
+        issue = SYNC_PROJECTION(raw)
+    except (AttributeError, TypeError) as e:
+        raise ValueError(f"Malformed fields for {raw['key']}: {e}")
+    issue.project = project
+    return kind, project, issue
+
+
+def apply_event(store, site, kind, project, issue):
+    """Apply a parsed event to the IssueStore; False if it was older than what is stored."""
+    if kind == "deleted":
+        store.delete_issues(site, [issue.key])
+        return True
+    return store.upsert_if_newer(site, project, [issue]) > 0
+
+
+# ---------------------------
+# Server-sent events
+# ---------------------------
+class EventHub:
+    """
+    Fan-out of applied issue events to connected dashboards (SSE streams).
+
+    Every event gets an increasing id and is kept in a ring of `history`
+    events, so a client reconnecting with Last-Event-ID gets what it
+    missed. Each subscriber has a bounded queue: one that stops reading
+    gets disconnected instead of holding memory or slowing publish().
+    """
+
+    def __init__(self, history=1000, queue_size=1000):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._history = deque(maxlen=history)  # (id, event)
+        self._subscribers = set()
+        self._next_id = 1
+        self._deliveries = deque(maxlen=history)  # recent delivery ids, to drop Jira retries
+        self._delivery_set = set()
+
+    def seen_delivery(self, delivery):
+        """Remember a webhook delivery id; True if it was already handled."""
+        if not delivery:
+            return False
+        with self._lock:
+            if delivery in self._delivery_set:
+                return True
+            if len(self._deliveries) == self._deliveries.maxlen:
+                self._delivery_set.discard(self._deliveries[0])
+            self._deliveries.append(delivery)
+            self._delivery_set.add(delivery)
+            return False
+
+    def forget_delivery(self, delivery):
+        """Let a delivery that failed part way be processed again when Jira retries it."""
+        with self._lock:
+            self._delivery_set.discard(delivery)
+
+    def publish(self, event):
+        with self._lock:
+            event_id = self._next_id
+            self._next_id += 1
+            self._history.append((event_id, event))
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait((event_id, event))
+            except queue.Full:
+                self.unsubscribe(q)
+                with q.mutex:
+                    q.queue.clear()
+                q.put_nowait(None)  # tells the stream to close
+        return event_id
+
+    def subscribe(self, last_event_id=None):
+        """New subscriber queue, pre-filled with the events after `last_event_id`."""
+        q = queue.Queue(self.queue_size)
+        with self._lock:
+            if last_event_id is not None:
+                for event_id, event in self._history:
+                    if event_id > last_event_id and not q.full():
+                        q.put_nowait((event_id, event))
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def stream(self, q, site=None):
+        """Yield SSE text for a subscriber queue until it is closed; filters by `site` if given."""
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    item = q.get(timeout=HEARTBEAT)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    return
+                event_id, event = item
+                if site is None or event["site"] == site:
+                    yield format_sse(event_id, "issue", event)
+        finally:
+            self.unsubscribe(q)
+
+
+def format_sse(event_id, name, data):
+    return f"id: {event_id}\nevent: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def iter_events(url, last_event_id=None, read_timeout=HEARTBEAT * 2):
+    """
+    Client side: yield (id, event) from an SSE issue stream until the
+    connection drops (reconnecting, with the last id, is up to the caller).
+    """
+    import requests
+
+    headers = {"Accept": "text/event-stream"}
+    if last_event_id is not None:
+        headers["Last-Event-ID"] = str(last_event_id)
+    with requests.get(url, headers=headers, stream=True, timeout=(5, read_timeout)) as resp:
+        resp.raise_for_status()
+        event_id, name, data = None, None, []
+        for line in resp.iter_lines(decode_unicode=True):
+            if line:
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "id":
+                    event_id = int(value)
+                elif field == "event":
+                    name = value
+                elif field == "data":
+                    data.append(value)
+                continue
+            if name == "issue" and data:
+                yield event_id, json.loads("\n".join(data))
+            name, data = None, []